@@ -0,0 +1,5 @@
+"""Micro-benchmarks for the hot paths of ``logging2``. These are not part of the test suite or the distribution.
+
+Run the suite with ``python -m benchmarks``: it measures ``Logger`` calls and every handler against local sinks and
+prints a JSON report of ops/sec, p50/p99 per-call latency and allocations per call for each case.
+"""
@@ -0,0 +1,74 @@
+"""Runs the benchmark suite and prints the results as JSON.
+
+Run with ``python -m benchmarks [--number N] [--filter TEXT] [--output PATH]``. Progress goes to stderr, so the JSON
+on stdout can be redirected and compared between releases.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+from contextlib import ExitStack
+from typing import List, Optional
+
+from benchmarks import handlers, loggers
+from benchmarks.runner import measure
+
+SUITES = (loggers, handlers)
+
+
+def run(number: int, filter: Optional[str] = None) -> dict:
+    """Runs every case whose name contains ``filter``.
+
+    :param number: the number of calls per pass
+    :param filter: a substring of the names of the cases to run
+    :returns: the report -- the environment and one result per case
+    """
+    results = []
+    with ExitStack() as stack:
+        for suite in SUITES:
+            for name, case in suite.cases(stack):
+                if filter and filter not in name:
+                    continue
+                print(f"{name} ...", file=sys.stderr, flush=True)
+                results.append({"name": name, **measure(case, number)})
+
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "version": _version(),
+        "results": results,
+    }
+
+
+def _version() -> Optional[str]:
+    try:
+        from importlib.metadata import version
+
+        return version("logging2")
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "--number", type=int, default=20_000, help="calls per pass (default: 20000)"
+    )
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(run(args.number, args.filter), indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark cases for the handlers: each case writes a preformatted entry straight to a handler connected to a local
+sink -- files on tmpfs, a null stream and in-process servers."""
+
+import os
+import shutil
+from contextlib import ExitStack, closing
+from typing import Callable, Iterator, Tuple
+
+from benchmarks.sinks import NullStream, tcp_sink, tmpfs_dir, udp_sink, unix_sink
+from logging2.handlers.abc import Handler
+from logging2.handlers.files import FileHandler
+from logging2.handlers.queues import QueueHandler
+from logging2.handlers.sockets import (
+    ReconnectingTcpHandler,
+    SyslogHandler,
+    TcpHandler,
+    UdpHandler,
+    UnixSocketHandler,
+)
+from logging2.handlers.streaming import StreamingHandler
+from logging2.levels import LogLevel
+
+MESSAGE: str = "2017-04-29T17:08:23.156795+00:00 INFO app: Hello, world!\n"
+
+
+def _case(handler: Handler, message: object = MESSAGE) -> Callable[[], object]:
+    write = handler.write
+    level = LogLevel.info
+    return lambda: write(message, level=level)
+
+
+def cases(stack: ExitStack) -> Iterator[Tuple[str, Callable[[], object]]]:
+    """Yields the handler benchmark cases. Handlers and sinks are closed by ``stack``.
+
+    :param stack: collects the cleanup of the cases
+    :returns: ``(name, case)`` pairs
+    """
+    directory = tmpfs_dir()
+    stack.callback(shutil.rmtree, directory, ignore_errors=True)
+
+    streaming = StreamingHandler(stream=NullStream())
+    yield "streaming", _case(streaming)
+    yield "streaming-bytes", _case(streaming, MESSAGE.encode("utf8"))
+
+    file = stack.enter_context(closing(FileHandler(os.path.join(directory, "a.log"))))
+    yield "file", _case(file)
+
+    buffered = stack.enter_context(
+        closing(FileHandler(os.path.join(directory, "b.log"), buffer_size=64 * 1024))
+    )
+    yield "file-buffered", _case(buffered)
+
+    queued = stack.enter_context(
+        closing(QueueHandler(handler=StreamingHandler(stream=NullStream())))
+    )
+    yield "queue", _case(queued)
+
+    sink = stack.enter_context(closing(tcp_sink()))
+    tcp = stack.enter_context(closing(TcpHandler(*sink.address)))
+    yield "tcp", _case(tcp)
+
+    reconnecting = stack.enter_context(
+        closing(ReconnectingTcpHandler(*sink.address))
+    )
+    yield "tcp-reconnecting", _case(reconnecting)
+
+    sink = stack.enter_context(closing(udp_sink()))
+    udp = stack.enter_context(closing(UdpHandler(*sink.address)))
+    yield "udp", _case(udp)
+
+    syslog = stack.enter_context(
+        closing(SyslogHandler(host=sink.address[0], port=sink.address[1]))
+    )
+    yield "syslog", _case(syslog)
+
+    sink = stack.enter_context(closing(unix_sink(directory)))
+    unix = stack.enter_context(closing(UnixSocketHandler(sink.address)))
+    yield "unix", _case(unix)
+
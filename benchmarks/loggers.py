@@ -0,0 +1,65 @@
+"""Benchmark cases for ``Logger``: every case logs through a ``StreamingHandler`` writing to a null stream, so they
+measure building the entries rather than I/O."""
+
+import os
+from contextlib import ExitStack
+from typing import Callable, Iterator, Tuple
+
+from benchmarks.sinks import NullStream
+from logging2.handlers.streaming import StreamingHandler
+from logging2.levels import LogLevel
+from logging2.loggers import Logger
+
+EXEC_INFO_TEMPLATE: str = (
+    "{timestamp} {level} {name} {source}:{line} {function} [{process}]: {message}"
+)
+
+
+def _logger(name: str, **kwargs) -> Logger:
+    return Logger(
+        name=f"bench-{name}", handler=StreamingHandler(stream=NullStream()), **kwargs
+    )
+
+
+def _request_id() -> str:
+    return "5f0c6a3e"
+
+
+def _user() -> int:
+    return os.getpid()
+
+
+def cases(stack: ExitStack) -> Iterator[Tuple[str, Callable[[], object]]]:
+    """Yields the logger benchmark cases.
+
+    :param stack: collects the cleanup of the cases
+    :returns: ``(name, case)`` pairs
+    """
+    logger = _logger("default")
+    yield "logger.info", lambda: logger.info("Hello, world!")
+
+    disabled = _logger("disabled", level=LogLevel.info)
+    yield "logger.debug-disabled", lambda: disabled.debug("Hello, world!")
+
+    exec_info = _logger("exec-info", template=EXEC_INFO_TEMPLATE)
+    yield "logger.info-exec-info", lambda: exec_info.info("Hello, world!")
+
+    context = _logger(
+        "context",
+        template="{timestamp} {level} {name} [{request_id} {user}]: {message}",
+        additional_context={"request_id": _request_id, "user": _user},
+    )
+    yield "logger.info-context-callables", lambda: context.info("Hello, world!")
+
+    structured = _logger("structured", structured=True)
+    yield "logger.info-structured", lambda: structured.info("Hello, world!", user=42)
+
+    failing = _logger("exception")
+
+    def exception() -> None:
+        try:
+            {}["missing"]
+        except KeyError:
+            failing.exception("Lookup failed")
+
+    yield "logger.exception", exception
@@ -0,0 +1,105 @@
+"""Local sinks for the handler benchmarks: a null stream and in-process servers that read and discard everything
+they receive, so the benchmarks measure the handlers rather than a remote collector."""
+
+import os
+import socket
+import tempfile
+import threading
+from typing import List, Optional
+
+
+class NullStream:
+    """A text stream that discards everything written to it.
+    """
+
+    def write(self, data: str) -> int:
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def tmpfs_dir() -> str:
+    """Gets a scratch directory, on tmpfs when the system has one, so file benchmarks don't measure the disk.
+
+    :returns: the path to a new temporary directory
+    """
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    return tempfile.mkdtemp(prefix="logging2-bench-", dir=base)
+
+
+class Sink:
+    """A server socket read by daemon threads until the sink is closed.
+    """
+
+    TIMEOUT: float = 0.1
+
+    def __init__(self, family: int, type: int, address: object):
+        """Instantiates a new ``Sink`` and starts reading
+
+        :param family: the socket family
+        :param type: the socket type
+        :param address: the address to bind to
+        """
+        self.socket: socket.socket = socket.socket(family, type)
+        self.socket.bind(address)
+        self.socket.settimeout(self.TIMEOUT)
+        self.address = self.socket.getsockname()
+        self.received: int = 0
+
+        self._closed: threading.Event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        if type == socket.SOCK_STREAM:
+            self.socket.listen()
+            self._start(self._accept)
+        else:
+            self._start(self._read, self.socket)
+
+    def close(self) -> None:
+        """Stops reading and closes the server socket.
+        """
+        self._closed.set()
+        for thread in self._threads:
+            thread.join()
+        self.socket.close()
+
+    def _start(self, target, *args) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn, _ = self.socket.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(self.TIMEOUT)
+            self._start(self._read, conn)
+
+    def _read(self, sock: socket.socket) -> None:
+        while not self._closed.is_set():
+            try:
+                data = sock.recv(1 << 16)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if not data and sock.type == socket.SOCK_STREAM:
+                return
+            self.received += len(data)
+        if sock is not self.socket:
+            sock.close()
+
+
+def tcp_sink() -> Sink:
+    return Sink(socket.AF_INET, socket.SOCK_STREAM, ("127.0.0.1", 0))
+
+
+def udp_sink() -> Sink:
+    return Sink(socket.AF_INET, socket.SOCK_DGRAM, ("127.0.0.1", 0))
+
+
+def unix_sink(directory: Optional[str] = None) -> Sink:
+    path = os.path.join(directory or tmpfs_dir(), "sink.sock")
+    return Sink(socket.AF_UNIX, socket.SOCK_DGRAM, path)
@@ -0,0 +1,60 @@
+"""Compares rendering a log entry with a compiled ``Template`` against the previous ``str.format`` path.
+
+Run with ``python -m benchmarks.templates``.
+"""
+
+import timeit
+
+from logging2.levels import LogLevel
+from logging2.templates import Template
+
+TEMPLATES = {
+    "default": "{timestamp} {level} {name}: {message}",
+    "exec-info": "{timestamp} {level} {name} {source}:{line} {function} [{process}]: {message}",
+    "format-specs": "{timestamp} {level!s:>9} {name:<12} {message!r}",
+}
+
+PARAMS = {
+    "timestamp": "2017-04-29T17:08:23.156795+00:00",
+    "level": LogLevel.info,
+    "name": "app",
+    "message": "Hello, world!\n",
+    "source": "/srv/app/views.py",
+    "line": 42,
+    "function": "index",
+    "process": 4242,
+}
+
+
+def str_format(template: str) -> None:
+    params = {
+        "message": PARAMS["message"],
+        "level": PARAMS["level"],
+        "name": PARAMS["name"],
+    }
+    params.update(PARAMS)
+    template.format(**params)
+
+
+def compiled(template: Template) -> None:
+    template.render(PARAMS)
+
+
+def main(number: int = 200_000) -> None:
+    print(f"{'template':<14} {'str.format':>12} {'Template':>12} {'speedup':>8}")
+    for name, text in TEMPLATES.items():
+        template = Template(text)
+        assert template.render(PARAMS) == text.format(**PARAMS)
+
+        baseline = min(timeit.repeat(lambda: str_format(text), number=number, repeat=5))
+        candidate = min(
+            timeit.repeat(lambda: compiled(template), number=number, repeat=5)
+        )
+        print(
+            f"{name:<14} {baseline / number * 1e9:>10.0f}ns {candidate / number * 1e9:>10.0f}ns "
+            f"{baseline / candidate:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from typing import Union
+import threading
+from typing import Dict, List, Optional, Tuple, Union
 
 from logging2.utils import Singleton
 
@@ -8,10 +9,23 @@ class _LogRegister(metaclass=Singleton):
     where every instance shares state, loggers share state by name. That is, if a logger is named ``request_logger``
     and another is named ``response_logger``, they don't necessarily need to share the same state information -- just
     other instances with the same name do.
+
+    Names are dotted paths: ``app.db`` is a child of ``app``, and inherits its handlers, level and additional
+    context. Each logger caches its effective configuration, which the register recomputes for a whole subtree when a
+    logger in it is reconfigured -- logging calls never walk up the hierarchy.
+
+    The register is also the place to change levels at runtime: ``set_level`` reconfigures a subtree in one step, and
+    can revert the change on its own after a while.
     """
 
     def __init__(self):
         self._loggers = {}
+        self._lock: threading.RLock = threading.RLock()
+        # the pending ``set_level`` changes, by logger name: the revert timer, the time to live and the level of the
+        # logger from before the change
+        self._changes: Dict[
+            str, Tuple[Optional[threading.Timer], Optional[float], Optional["LogLevel"]]
+        ] = {}
 
     def __contains__(self, item) -> bool:
         return self._loggers.__contains__(item)
@@ -19,11 +33,20 @@ class _LogRegister(metaclass=Singleton):
     def register_logger(self, logger: "Logger") -> None:
         """Registers a named ``Logger``.
 
-        :param logger: the logger to be considered for registration
+        :param logger: the logger to be considered for registration -- its registered descendants inherit from it
+        """
+        with self._lock:
+            name = logger.name
+            if name not in self._loggers:
+                self._loggers[name] = logger
+                self.refresh(name)
+
+    def get_loggers(self) -> List["Logger"]:
+        """Gets every registered ``Logger``.
+
+        :returns: the registered loggers
         """
-        name = logger.name
-        if name not in self._loggers:
-            self._loggers[name] = logger
+        return list(self._loggers.values())
 
     def get_logger(self, name) -> Union["Logger", None]:
         """Gets a ``Logger`` from the register if it exists.
@@ -33,6 +56,131 @@ class _LogRegister(metaclass=Singleton):
         """
         return self._loggers.get(name)
 
+    def get_parent(self, name: str) -> Union["Logger", None]:
+        """Gets the closest registered ancestor of a ``Logger`` -- ``app`` is the parent of ``app.db.pool`` if
+        ``app.db`` isn't registered.
+
+        :param name: the name of the logger
+        :returns: the parent logger, if any
+        """
+        while "." in name:
+            name = name.rpartition(".")[0]
+            parent = self._loggers.get(name)
+            if parent is not None:
+                return parent
+        return None
+
+    def refresh(self, name: str) -> None:
+        """Recomputes the cached effective configuration of a ``Logger`` and all of its registered descendants,
+        parents first -- called whenever the handlers, level or context of the logger change.
+
+        :param name: the name of the logger at the top of the subtree
+        """
+        prefix = f"{name}."
+        with self._lock:
+            subtree = [
+                logger
+                for key, logger in self._loggers.items()
+                if key == name or key.startswith(prefix)
+            ]
+            subtree.sort(key=lambda logger: logger.name.count("."))
+            for logger in subtree:
+                logger._refresh()
+
+    def set_level(
+        self, name: str, level: Optional["LogLevel"], ttl: Optional[float] = None
+    ) -> None:
+        """Sets the level of a ``Logger``, and so of its subtree, at runtime. The subtree's level then decides alone
+        which entries are logged: entries below the level of a handler it writes to are passed to that handler with
+        ``force=True``, so it writes them anyway, at their own level. Custom handlers must accept ``force`` to be used
+        in such a subtree. The handlers themselves are left as they are, so loggers outside the subtree log to them as
+        before. Everything changes under the register's lock, so no other reconfiguration sees
+        half of it.
+
+        Changes can be reverted with ``reset_level``. Changing the same logger again keeps the levels from before the
+        first change, so a reset always goes back to the configured levels.
+
+        :param name: the name of the logger at the top of the subtree
+        :param level: the new level -- ``None`` inherits the level of the closest ancestor that sets one
+        :param ttl: the number of seconds after which the change is reverted on its own
+        """
+        with self._lock:
+            logger = self._loggers.get(name)
+            if logger is None:
+                raise ValueError(f"There is no logger named `{name}`")
+            previous = self._changes.pop(name, None)
+            if previous is None:
+                saved = logger.level
+            else:
+                if previous[0] is not None:
+                    previous[0].cancel()
+                saved = previous[2]
+            # recorded before the level is set, so the refresh of the subtree sees the change
+            self._changes[name] = (self._start_timer(name, ttl), ttl, saved)
+            logger.level = level
+
+    def reset_level(self, name: str) -> None:
+        """Reverts the change ``set_level`` made to a ``Logger`` and its subtree -- a no-op if there is none.
+
+        :param name: the name of the logger the levels were set on
+        """
+        with self._lock:
+            change = self._changes.pop(name, None)
+            if change is None:
+                return
+            timer, _, level = change
+            if timer is not None:
+                timer.cancel()
+            self._loggers[name].level = level
+
+    def get_levels(self) -> Dict[str, Tuple[Optional["LogLevel"], "LogLevel"]]:
+        """Gets the level of every registered ``Logger``.
+
+        :returns: the level set on each logger, if any, and the minimum level it logs, by logger name
+        """
+        with self._lock:
+            return {
+                name: (logger.level, logger._min_level)
+                for name, logger in sorted(self._loggers.items())
+            }
+
+    def _start_timer(
+        self, name: str, ttl: Optional[float]
+    ) -> Optional[threading.Timer]:
+        """Starts the timer that reverts a ``set_level`` change -- must be called with the lock held.
+
+        :param name: the name of the logger the levels were set on
+        :param ttl: the number of seconds until the change is reverted, if it expires at all
+        :returns: the started timer
+        """
+        if not ttl:
+            return None
+        timer = threading.Timer(ttl, self._expire)
+        timer.args = (name, timer)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _expire(self, name: str, timer: threading.Timer) -> None:
+        """Reverts a ``set_level`` change once its time to live has passed -- unless it was changed again while the
+        timer was waiting for the lock.
+
+        :param name: the name of the logger the levels were set on
+        :param timer: the timer that expired
+        """
+        with self._lock:
+            change = self._changes.get(name)
+            if change is not None and change[0] is timer:
+                self.reset_level(name)
+
+    def _after_fork(self) -> None:  # pragma: no cover
+        """Replaces the lock, which another thread of the parent may have been holding when the process forked, and
+        restarts the revert timers, whose threads didn't survive the fork, with their full time to live.
+        """
+        self._lock = threading.RLock()
+        for name, (timer, ttl, saved) in self._changes.items():
+            self._changes[name] = (self._start_timer(name, ttl), ttl, saved)
+
 
 LogRegister = _LogRegister()
 
@@ -42,4 +190,4 @@ LogRegister = _LogRegister()
 from logging2.handlers.files import FileHandler
 from logging2.handlers.streaming import StdErrHandler, StdOutHandler
 from logging2.levels import LogLevel
-from logging2.loggers import Logger
+from logging2.loggers import AsyncLogger, Logger
@@ -0,0 +1,211 @@
+import atexit
+import os
+import signal
+import socket
+import stat
+import threading
+from typing import Iterable, Optional
+
+from logging2 import LogRegister
+from logging2.handlers.files import FileHandler
+from logging2.levels import LogLevel
+from logging2.stats import format_prometheus
+
+DEFAULT_TTL: float = 300.0
+
+
+def install_signal_handlers(
+    names: Iterable[str],
+    level: Optional[LogLevel] = LogLevel.debug,
+    ttl: Optional[float] = DEFAULT_TTL,
+    set_signal: Optional[signal.Signals] = signal.SIGUSR1,
+    reset_signal: Optional[signal.Signals] = signal.SIGUSR2,
+) -> None:
+    """Installs signal handlers that change the level of some loggers at runtime: ``kill -USR1 <pid>`` sets their
+    level with ``LogRegister.set_level`` for ``ttl`` seconds, and ``kill -USR2 <pid>`` reverts it right away. Loggers
+    that aren't registered when the signal arrives are skipped. Like any signal handler, they must be installed from
+    the main thread.
+
+    The levels are changed from a new thread, since the signal may arrive while the main thread holds the register's
+    lock.
+
+    :param names: the names of the loggers at the top of the subtrees to change
+    :param level: the level to set
+    :param ttl: the number of seconds after which the change is reverted on its own -- ``None`` keeps it until reset
+    :param set_signal: the signal that sets the level
+    :param reset_signal: the signal that reverts it
+    """
+    names = tuple(names)
+
+    def set_levels() -> None:
+        for name in names:
+            if name in LogRegister:
+                LogRegister.set_level(name, level, ttl)
+
+    def reset_levels() -> None:
+        for name in names:
+            LogRegister.reset_level(name)
+
+    signal.signal(set_signal, lambda signum, frame: _run_in_thread(set_levels))
+    signal.signal(reset_signal, lambda signum, frame: _run_in_thread(reset_levels))
+
+
+def install_reopen_handler(
+    handlers: Iterable[FileHandler],
+    reopen_signal: Optional[signal.Signals] = signal.SIGHUP,
+) -> None:
+    """Installs a signal handler that reopens the files of some file handlers, for ``logrotate``'s ``create`` method:
+    its ``postrotate`` script runs ``kill -HUP <pid>`` once it has renamed the files, and each handler starts a new
+    file. Like any signal handler, it must be installed from the main thread.
+
+    The files are reopened from a new thread, since the signal may arrive while the main thread holds a handler's
+    lock.
+
+    :param handlers: the file handlers to reopen
+    :param reopen_signal: the signal that reopens the files
+    """
+    handlers = tuple(handlers)
+
+    def reopen() -> None:
+        for handler in handlers:
+            handler.reopen()
+
+    signal.signal(reopen_signal, lambda signum, frame: _run_in_thread(reopen))
+
+
+def _run_in_thread(function) -> None:
+    """Runs a function in a new daemon thread.
+
+    :param function: the callable to run
+    """
+    threading.Thread(target=function, name="logging2-control", daemon=True).start()
+
+
+class ControlServer:
+    """Changes levels at runtime on commands sent to a local UNIX stream socket. Each line sent is a command, and is
+    answered with a line starting with ``ok`` or ``error``:
+
+    * ``set <logger> <level> [<ttl>]`` sets the level of a logger's subtree with ``LogRegister.set_level`` -- a level
+      of ``none`` inherits it
+    * ``reset <logger>`` reverts it with ``LogRegister.reset_level``
+    * ``levels`` lists every logger, the level set on it (``-`` if none) and the minimum level it logs, before the
+      ``ok``
+    * ``stats`` sends the stats of the instrumented loggers and their handlers in the Prometheus text format, before
+      the ``ok``
+
+    e.g. ``echo 'set app.db debug 300' | socat - UNIX-CONNECT:/run/app/logging.sock``. The socket node is only
+    accessible to the owner by default. Connections are served one at a time from a background thread, which a forked
+    child doesn't inherit.
+    """
+
+    DEFAULT_TIMEOUT: float = 5.0
+
+    def __init__(
+        self, path: str, mode: Optional[int] = 0o600, timeout: Optional[float] = None
+    ):
+        """Instantiates a new ``ControlServer`` and binds its socket
+
+        :param path: the path of the socket node -- a stale node left behind at this path is replaced
+        :param mode: the permissions of the socket node
+        :param timeout: the number of seconds a connection may stay idle before it is closed
+        """
+        self.path: str = path
+        self.timeout: float = timeout or self.DEFAULT_TIMEOUT
+        self.thread: Optional[threading.Thread] = None
+        self._running: bool = False
+
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        self.socket: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.bind(path)
+        os.chmod(path, mode)
+        self.socket.listen()
+
+    def start(self) -> None:
+        """Starts serving from a background thread. It is stopped automatically at interpreter exit.
+        """
+        self._running = True
+        self.thread = threading.Thread(
+            target=self.serve, name=f"logging2-control {self.path}", daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stops serving, waits for the background thread to finish and removes the socket node.
+        """
+        if not self._running:
+            return
+        self._running = False
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)  # wakes up ``accept``
+        self.thread.join()
+        atexit.unregister(self.stop)
+
+    def serve(self) -> None:
+        """Serves connections until the server is stopped, then closes the socket and removes its node.
+        """
+        while self._running:
+            conn, _ = self.socket.accept()
+            with conn:
+                if self._running:
+                    self._serve_connection(conn)
+        self.socket.close()
+        os.unlink(self.path)
+
+    def handle(self, command: str) -> str:
+        """Runs a single command.
+
+        :param command: the command line, e.g. ``set app.db debug 300``
+        :returns: the response, ending with a line starting with ``ok`` or ``error``
+        """
+        words = command.split()
+        try:
+            if len(words) in (3, 4) and words[0] == "set":
+                level = None if words[2] == "none" else _parse_level(words[2])
+                ttl = float(words[3]) if len(words) == 4 else None
+                LogRegister.set_level(words[1], level, ttl)
+            elif len(words) == 2 and words[0] == "reset":
+                LogRegister.reset_level(words[1])
+            elif words == ["levels"]:
+                lines = [
+                    f"{name} {'-' if level is None else level} {min_level}\n"
+                    for name, (level, min_level) in LogRegister.get_levels().items()
+                ]
+                return "".join(lines) + "ok\n"
+            elif words == ["stats"]:
+                return format_prometheus() + "ok\n"
+            else:
+                raise ValueError(f"Unknown command `{command.strip()}`")
+        except ValueError as error:
+            return f"error: {error}\n"
+        return "ok\n"
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        """Answers the commands sent over a connection until the client closes it or stays idle too long.
+
+        :param conn: the accepted connection
+        """
+        conn.settimeout(self.timeout)
+        try:
+            with conn.makefile("rwb") as stream:
+                for line in stream:
+                    stream.write(self.handle(line.decode("utf8", "replace")).encode())
+                    stream.flush()
+        except OSError:
+            pass  # timed out or disconnected
+
+
+def _parse_level(name: str) -> LogLevel:
+    """Gets a ``LogLevel`` from its name, in any case.
+
+    :param name: the name of the level
+    :returns: the level
+    """
+    try:
+        return LogLevel[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown level `{name}`") from None
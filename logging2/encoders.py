@@ -0,0 +1,100 @@
+import json
+from json.encoder import encode_basestring
+from math import isfinite
+from typing import Callable, Dict, FrozenSet, Iterable, Mapping, Tuple
+
+from logging2.levels import UPPER_NAMES, LogLevel
+
+
+def _encode_float(value: float) -> str:
+    """Encodes a float -- NaN and infinities aren't valid JSON, so they become ``null``.
+
+    :param value: the float to be encoded
+    :returns: the JSON representation
+    """
+    return float.__repr__(value) if isfinite(value) else "null"
+
+
+def _encode_other(value: object) -> str:
+    """Encodes any value without a specialized encoder, falling back to its ``str`` for unserializable objects.
+
+    :param value: the value to be encoded
+    :returns: the JSON representation
+    """
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+_LEVELS: Tuple[str, ...] = tuple(encode_basestring(name) for name in UPPER_NAMES)
+
+
+class JsonEncoder:
+    """Encodes log entries as single line JSON objects, straight to UTF-8 bytes. The encoder is specialized for the
+    values ``Logger`` produces: the escaped ``"key":`` prefixes of the known fields and the encoded level names are
+    computed once, and strings, numbers and levels are encoded without going through ``json.dumps``.
+    """
+
+    ENCODERS: Dict[type, Callable[[object], str]] = {
+        str: encode_basestring,
+        int: int.__repr__,
+        float: _encode_float,
+        bool: lambda value: "true" if value else "false",
+        type(None): lambda value: "null",
+        LogLevel: _LEVELS.__getitem__,
+    }
+
+    MAX_CACHED_KEYS: int = 1024
+
+    def __init__(self, keys: Iterable[str], ensure_new_line: bool = True):
+        """Instantiates a new ``JsonEncoder``
+
+        :param keys: the fields that lead every entry, in order -- any other values are appended after them
+        :param ensure_new_line: should each entry end with a new line character, i.e. produce NDJSON
+        """
+        self.keys: Tuple[str, ...] = tuple(dict.fromkeys(keys))
+        if not self.keys:
+            raise ValueError("JsonEncoder needs at least one leading key")
+        self.ensure_new_line: bool = ensure_new_line
+
+        self._prefixes = tuple(
+            (key, ("{" if i == 0 else ",") + encode_basestring(key) + ":")
+            for i, key in enumerate(self.keys)
+        )
+        self._leading: FrozenSet[str] = frozenset(self.keys)
+        self._extra_prefixes: Dict[str, str] = {}
+        self._suffix: str = "}\n" if ensure_new_line else "}"
+
+    def encode(self, params: Mapping[str, object]) -> bytes:
+        """Encodes an entry's values. A value missing for one of the leading keys raises a ``KeyError``, just like
+        a missing template key.
+
+        :param params: the values of the entry
+        :returns: the UTF-8 encoded JSON object
+        """
+        encode_value = self._encode_value
+        parts = [prefix + encode_value(params[key]) for key, prefix in self._prefixes]
+
+        if len(params) > len(self._prefixes):
+            leading = self._leading
+            extra_prefixes = self._extra_prefixes
+            for key, value in params.items():
+                if key not in leading:
+                    prefix = extra_prefixes.get(key)
+                    if prefix is None:
+                        prefix = "," + encode_basestring(key) + ":"
+                        if len(extra_prefixes) < self.MAX_CACHED_KEYS:
+                            extra_prefixes[key] = prefix
+                    parts.append(prefix + encode_value(value))
+
+        parts.append(self._suffix)
+        return "".join(parts).encode("utf8")
+
+    def _encode_value(self, value: object) -> str:
+        """Encodes a single value with the encoder specialized for its type.
+
+        :param value: the value to be encoded
+        :returns: the JSON representation
+        """
+        encoder = self.ENCODERS.get(value.__class__)
+        if encoder is not None:
+            return encoder(value)
+        return _encode_other(value)
@@ -0,0 +1,239 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from types import CodeType
+from typing import Mapping, Optional, Tuple
+
+from logging2.levels import LogLevel
+
+# a call site is the code object of the calling function and the line number of the logging call
+CallSite = Tuple[CodeType, int]
+
+
+class Filter:
+    """``Filter`` is the interface that all filters must implement. A logger with filters asks each of them, in
+    order, whether to ``allow`` an entry before any of the entry is formatted, and drops the entry as soon as one of
+    them doesn't. Filters count the entries they suppress in ``suppressed``; the logger periodically reports and
+    resets the ``unreported`` count in a summary entry.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        """Instantiates a new ``Filter``
+
+        :param name: the name of the filter, used in the summary entries
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self.name: str = name or self._create_name()
+        self.suppressed: int = 0
+        self.unreported: int = 0
+
+    def filter(self, level: LogLevel, site: CallSite) -> bool:
+        """Decides whether an entry is logged, counting it if it is suppressed.
+
+        :param level: the priority level of the entry
+        :param site: the call site of the logging call
+        :returns: whether the entry is logged
+        """
+        if self.allow(level, site):
+            return True
+        with self._lock:
+            self.suppressed += 1
+            self.unreported += 1
+        return False
+
+    def allow(self, level: LogLevel, site: CallSite) -> bool:
+        """Decides whether an entry is logged.
+
+        :param level: the priority level of the entry
+        :param site: the call site of the logging call
+        :returns: whether the entry is logged
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def take_unreported(self) -> int:
+        """Gets the number of entries suppressed since the last call, and resets it.
+
+        :returns: the number of suppressed entries
+        """
+        with self._lock:
+            unreported, self.unreported = self.unreported, 0
+        return unreported
+
+    def _after_fork(self) -> None:
+        """Replaces the lock, which another thread of the parent may have been holding when the process forked.
+        """
+        self._lock = threading.Lock()
+
+    def _create_name(self) -> str:
+        """Creates the name for the filter - called from ``__init__`` if a name is not given.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+
+class CallSiteFilter(Filter):
+    """A ``Filter`` that keeps state for each call site. The state of at most ``max_sites`` call sites is kept, in
+    least recently used order -- a call site that was evicted starts over with fresh state.
+    """
+
+    DEFAULT_MAX_SITES: int = 1024
+
+    def __init__(self, max_sites: Optional[int] = None, name: Optional[str] = None):
+        """Instantiates a new ``CallSiteFilter``
+
+        :param max_sites: the maximum number of call sites to keep state for
+        :param name: the name of the filter, used in the summary entries
+        """
+        self.max_sites: int = max_sites or self.DEFAULT_MAX_SITES
+        self._sites: OrderedDict = OrderedDict()
+        super().__init__(name=name)
+
+    def allow(self, level: LogLevel, site: CallSite) -> bool:
+        """Decides whether an entry is logged, from the state of its call site.
+
+        :param level: the priority level of the entry
+        :param site: the call site of the logging call
+        :returns: whether the entry is logged
+        """
+        sites = self._sites
+        with self._lock:
+            state = sites.get(site)
+            if state is None:
+                state = sites[site] = self._new_state()
+                if len(sites) > self.max_sites:
+                    sites.popitem(last=False)
+            else:
+                sites.move_to_end(site)
+            return self._allow(state)
+
+    def _new_state(self) -> list:
+        """Creates the state of a call site that hasn't been seen -- or was evicted.
+
+        :returns: the mutable state
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def _allow(self, state: list) -> bool:
+        """Decides whether an entry is logged, updating the state of its call site -- called with the lock held.
+
+        :param state: the state of the call site
+        :returns: whether the entry is logged
+        """
+        raise NotImplementedError  # pragma: no cover
+
+
+class RateLimitFilter(CallSiteFilter):
+    """Limits each call site to ``rate`` entries per second with a token bucket: a call site can log a burst of up to
+    ``burst`` entries at once, and regains tokens at ``rate`` per second.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        max_sites: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        """Instantiates a new ``RateLimitFilter``
+
+        :param rate: the number of entries per second each call site may log
+        :param burst: the number of entries a call site may log at once -- defaults to one second's worth
+        :param max_sites: the maximum number of call sites to keep state for
+        :param name: the name of the filter, used in the summary entries
+        """
+        self.rate: float = rate
+        self.burst: float = burst or max(rate, 1)
+        super().__init__(max_sites=max_sites, name=name)
+
+    def _new_state(self) -> list:
+        return [self.burst, time.monotonic()]
+
+    def _allow(self, state: list) -> bool:
+        now = time.monotonic()
+        tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+        state[1] = now
+        if tokens >= 1:
+            state[0] = tokens - 1
+            return True
+        state[0] = tokens
+        return False
+
+    def _create_name(self) -> str:
+        """Creates the name for the filter - called from ``__init__`` if a name is not given.
+
+        :returns: the template `rate-limit {rate}/s`
+        """
+        return f"rate-limit {self.rate:g}/s"
+
+
+class EveryNthFilter(CallSiteFilter):
+    """Lets the first ``first`` entries of each call site through, then only every ``every``-th one.
+    """
+
+    def __init__(
+        self,
+        first: int,
+        every: int,
+        max_sites: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        """Instantiates a new ``EveryNthFilter``
+
+        :param first: the number of entries each call site logs before it is thinned out
+        :param every: then log one of every this many entries
+        :param max_sites: the maximum number of call sites to keep state for
+        :param name: the name of the filter, used in the summary entries
+        """
+        if every < 1:
+            raise ValueError("EveryNthFilter needs `every` to be at least 1")
+        self.first: int = first
+        self.every: int = every
+        super().__init__(max_sites=max_sites, name=name)
+
+    def _new_state(self) -> list:
+        return [0]
+
+    def _allow(self, state: list) -> bool:
+        count = state[0]
+        state[0] = count + 1
+        return count < self.first or (count - self.first) % self.every == 0
+
+    def _create_name(self) -> str:
+        """Creates the name for the filter - called from ``__init__`` if a name is not given.
+
+        :returns: the template `first {first} then every {every}`
+        """
+        return f"first {self.first} then every {self.every}"
+
+
+class SamplingFilter(Filter):
+    """Logs a random sample of the entries of each level. Levels without a sampling rate are always logged.
+    """
+
+    def __init__(self, rates: Mapping[LogLevel, float], name: Optional[str] = None):
+        """Instantiates a new ``SamplingFilter``
+
+        :param rates: the fraction of entries to log, between 0 and 1, for each level that is sampled
+        :param name: the name of the filter, used in the summary entries
+        """
+        self.rates: Tuple[float, ...] = tuple(
+            rates.get(level, 1.0) for level in LogLevel
+        )
+        super().__init__(name=name)
+
+    def allow(self, level: LogLevel, site: CallSite) -> bool:
+        """Decides whether an entry is logged, at random.
+
+        :param level: the priority level of the entry
+        :param site: the call site of the logging call
+        :returns: whether the entry is logged
+        """
+        rate = self.rates[level]
+        return rate >= 1.0 or random.random() < rate
+
+    def _create_name(self) -> str:
+        """Creates the name for the filter - called from ``__init__`` if a name is not given.
+
+        :returns: the template `sampling`
+        """
+        return "sampling"
@@ -0,0 +1,218 @@
+import inspect
+import socket
+import syslog
+import time
+from datetime import timezone
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+from logging2.levels import SYSLOG_SEVERITIES, LogLevel
+from logging2.timestamps import TimestampProvider, get_timestamp_provider
+from logging2.utils import get_pid
+
+# RFC 3164 timestamps always use the English month abbreviations, whatever the locale
+_MONTHS: Tuple[str, ...] = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+# RFC 5424 PARAM-VALUEs must escape these characters with a backslash
+_SD_ESCAPES: Dict[int, str] = {ord("\\"): "\\\\", ord('"'): '\\"', ord("]"): "\\]"}
+
+
+def _header_field(value: Optional[str], max_length: int) -> str:
+    """Sanitizes a header field: only printable US-ASCII characters are allowed, and an empty field is ``-``.
+
+    :param value: the value of the field
+    :param max_length: the maximum length of the field
+    :returns: the sanitized value
+    """
+    value = "".join(c if 33 <= ord(c) <= 126 else "_" for c in str(value or ""))
+    return value[:max_length] or "-"
+
+
+def _sd_name(name: str) -> str:
+    """Sanitizes an SD-ID or PARAM-NAME: printable US-ASCII characters other than ``=``, ``]`` and ``"``.
+
+    :param name: the name
+    :returns: the sanitized name
+    """
+    name = "".join(c if 33 <= ord(c) <= 126 and c not in '=]"' else "_" for c in name)
+    return name[:32]
+
+
+class SyslogFormatter:
+    """Formats log entries as RFC 5424 or RFC 3164 syslog messages. The parts of the header that don't change between
+    entries -- the priority for each level, the hostname, app name, process id and message id, and the structured
+    data of static values -- are assembled once, so formatting an entry only adds its timestamp and message. RFC 5424
+    timestamps come from the shared ``TimestampProvider`` and RFC 3164 timestamps are formatted once per second.
+
+    Structured data is built from key-value pairs such as a logger's ``additional_context``. As with the logger,
+    values that are functions are called for every entry. The others are escaped once, when the formatter is made.
+
+    With ``octet_counting``, every message is prefixed with its length in bytes, as described by RFC 6587 for stream
+    transports such as TCP. Entries containing new lines -- e.g. tracebacks -- can't break the framing.
+    """
+
+    RFC5424: str = "5424"
+    RFC3164: str = "3164"
+    DEFAULT_SD_ID: str = "context@32473"
+
+    def __init__(
+        self,
+        facility: Optional[int] = syslog.LOG_USER,
+        rfc: Optional[str] = RFC5424,
+        hostname: Optional[str] = None,
+        app_name: Optional[str] = None,
+        procid: Optional[str] = None,
+        msgid: Optional[str] = None,
+        structured_data: Optional[Mapping[str, Union[object, Callable]]] = None,
+        sd_id: Optional[str] = None,
+        octet_counting: Optional[bool] = False,
+        encoding: Optional[str] = "utf8",
+    ):
+        """Instantiates a new ``SyslogFormatter``
+
+        :param facility: the syslog facility -- one of the ``syslog.LOG_*`` facility constants
+        :param rfc: the message format -- ``SyslogFormatter.RFC5424`` or ``SyslogFormatter.RFC3164``
+        :param hostname: the HOSTNAME field -- defaults to the host's name
+        :param app_name: the APP-NAME field, or the TAG of RFC 3164 messages
+        :param procid: the PROCID field -- defaults to the id of the (current) process
+        :param msgid: the MSGID field of RFC 5424 messages
+        :param structured_data: key-value pairs sent as the parameters of an RFC 5424 structured data element
+        :param sd_id: the SD-ID of the structured data element
+        :param octet_counting: prefix each message with its length, for stream transports
+        :param encoding: the message encoding
+        """
+        if rfc not in (self.RFC5424, self.RFC3164):
+            raise ValueError(
+                f"Unknown syslog format `{rfc}`, expected one of {(self.RFC5424, self.RFC3164)}"
+            )
+        if structured_data and rfc == self.RFC3164:
+            raise ValueError("RFC 3164 messages can't carry structured data")
+
+        self.facility: int = facility
+        self.rfc: str = rfc
+        self.hostname: str = hostname or socket.gethostname()
+        self.app_name: Optional[str] = app_name
+        self.procid: Optional[str] = procid
+        self.msgid: Optional[str] = msgid
+        self.sd_id: str = _sd_name(sd_id or self.DEFAULT_SD_ID)
+        self.octet_counting: bool = octet_counting
+        self.encoding: str = encoding
+
+        static = []
+        dynamic = []
+        for key, value in (structured_data or {}).items():
+            if inspect.isfunction(value):
+                dynamic.append((f" {_sd_name(key)}=", value))
+            else:
+                static.append(f" {_sd_name(key)}={self._sd_value(value)}")
+        self._static_sd: str = "".join(static)
+        self._dynamic_sd: Tuple[Tuple[str, Callable], ...] = tuple(dynamic)
+
+        self._timestamps: TimestampProvider = get_timestamp_provider(timezone.utc)
+        self._bsd_timestamp: Tuple[int, str] = (-1, "")
+        self._pid: int = -1
+        self._prefixes: Tuple[str, ...] = ()
+        self._header: str = ""
+        self._build_header()
+
+    def format(self, message: Union[str, bytes], level: LogLevel) -> bytes:
+        """Formats a log entry as a syslog message. The trailing new line of the entry is dropped.
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :returns: the encoded, and possibly framed, syslog message
+        """
+        if self._pid != get_pid():
+            self._build_header()  # the PROCID of a forked child
+
+        if self.rfc == self.RFC5424:
+            header = f"{self._prefixes[level]}{self._timestamps.now()}{self._header}"
+            if self._dynamic_sd:
+                header = f"{header}{self._structured_data()} "
+        else:
+            header = f"{self._prefixes[level]}{self._bsd_now()}{self._header}"
+
+        if message.__class__ is bytes:
+            data = header.encode(self.encoding) + message.rstrip(b"\n")
+        else:
+            data = (header + message.rstrip("\n")).encode(self.encoding)
+
+        if self.octet_counting:
+            return b"%d %b" % (len(data), data)
+        return data
+
+    def _build_header(self) -> None:
+        """Assembles the parts of the header that are the same for every entry.
+        """
+        self._pid = get_pid()
+        procid = self.procid or str(self._pid)
+
+        if self.rfc == self.RFC5424:
+            self._prefixes = tuple(
+                f"<{self.facility | SYSLOG_SEVERITIES[level]}>1 "
+                for level in LogLevel
+            )
+            hostname = _header_field(self.hostname, 255)
+            app_name = _header_field(self.app_name, 48)
+            header = f" {hostname} {app_name} {_header_field(procid, 128)} {_header_field(self.msgid, 32)} "
+            if self._dynamic_sd:
+                # the element is closed for every entry, after the values of the functions
+                self._header = f"{header}[{self.sd_id}{self._static_sd}"
+            elif self._static_sd:
+                self._header = f"{header}[{self.sd_id}{self._static_sd}] "
+            else:
+                self._header = f"{header}- "
+        else:
+            self._prefixes = tuple(
+                f"<{self.facility | SYSLOG_SEVERITIES[level]}>"
+                for level in LogLevel
+            )
+            tag = "".join(c for c in self.app_name or "" if c.isalnum())[:32]
+            hostname = _header_field(self.hostname, 255)
+            self._header = f" {hostname} {tag}[{procid}]: " if tag else f" {hostname} "
+
+    def _structured_data(self) -> str:
+        """Gets the values of the dynamic structured data parameters, and closes the element.
+
+        :returns: the parameters and the closing ``]``
+        """
+        params = "".join(
+            f"{name}{self._sd_value(function())}" for name, function in self._dynamic_sd
+        )
+        return f"{params}]"
+
+    @staticmethod
+    def _sd_value(value: object) -> str:
+        """Quotes and escapes a structured data PARAM-VALUE.
+
+        :param value: the value
+        :returns: the quoted value
+        """
+        return f'"{str(value).translate(_SD_ESCAPES)}"'
+
+    def _bsd_now(self) -> str:
+        """Gets the RFC 3164 ``Mmm dd hh:mm:ss`` timestamp for the current local time, formatted once per second.
+
+        :returns: the timestamp
+        """
+        second = time.time_ns() // 1_000_000_000
+        cached = self._bsd_timestamp
+        if cached[0] != second:
+            t = time.localtime(second)
+            cached = self._bsd_timestamp = (
+                second,
+                f"{_MONTHS[t.tm_mon - 1]} {t.tm_mday:2d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}",
+            )
+        return cached[1]
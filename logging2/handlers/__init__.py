@@ -1,6 +1,23 @@
-from logging2.handlers.files import FileHandler
+from logging2.handlers.aio import (
+    AsyncFileHandler,
+    AsyncHandler,
+    AsyncSyslogHandler,
+    AsyncTcpHandler,
+    AsyncUdpHandler,
+    AsyncUnixSocketHandler,
+)
+from logging2.handlers.collectors import Collector, CollectorHandler
+from logging2.handlers.dedupe import DedupeHandler
+from logging2.handlers.files import (
+    FileHandler,
+    GzipFileHandler,
+    MappedFileHandler,
+    RotatingFileHandler,
+)
+from logging2.handlers.queues import OverflowPolicy, QueueHandler
 from logging2.handlers.streaming import StdErrHandler, StdOutHandler, StreamingHandler
 from logging2.handlers.sockets import (
+    ReconnectingTcpHandler,
     SocketHandler,
     SyslogHandler,
     TcpIPv6Handler,
@@ -1,11 +1,25 @@
-from typing import Optional
+import os
+import threading
+import traceback
+import weakref
+from typing import Dict, Optional, Union
 
+from logging2 import LogRegister
 from logging2.levels import LogLevel
+from logging2.stats import HANDLER_COUNTERS, HANDLER_HISTOGRAMS, Stats
 
 
 class Handler:
     """``Handler`` is the interface that all handlers must implement. It defines the API for handlers - namely the
     ``write`` method of each that produces the log entries.
+
+    Each handler has its own I/O lock, ``_lock``, that implementations hold while writing so entries written from
+    concurrent threads never interleave.
+
+    Handlers are fork-aware: after ``os.fork`` the child calls ``_after_fork`` on every handler, which replaces locks,
+    connections, threads and buffers that belong to the parent.
+
+    Instrumented loggers keep stats of the handlers they write to -- see ``stats``.
     """
 
     DEFAULT_LOG_LEVEL: LogLevel = LogLevel.info
@@ -16,20 +30,116 @@ class Handler:
         :param name: the name of the handler
         :param level: the minimum level of verbosity/priority of the messages this will log
         """
+        self._lock: threading.Lock = threading.Lock()
+        self._loggers: weakref.WeakSet = weakref.WeakSet()
+        self._stats: Optional[Stats] = None
         self.name = name or self._create_name()
         self.min_level: LogLevel = level or self.DEFAULT_LOG_LEVEL
+        _handlers.add(self)
+
+    @property
+    def min_level(self) -> LogLevel:
+        return self._min_level
 
-    def write(self, message: str, level: LogLevel) -> None:
+    @min_level.setter
+    def min_level(self, level: LogLevel) -> None:
+        """Sets the minimum level and tells every ``Logger`` this handler is registered to recompute the effective
+        minimum level of its subtree. This holds the register's lock, under which loggers add and remove handlers.
+
+        :param level: the new minimum level of verbosity/priority
+        """
+        with LogRegister._lock:
+            self._min_level = level
+            for logger in self._loggers:
+                logger._refresh_subtree()
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
         """Writes the full log entry to a configured stream
 
-        :param message: the entire message to be written, full formatted
+        :param message: the entire message to be written, full formatted -- structured loggers pass already encoded
+            bytes, which are written as they are
         :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level`` -- loggers pass it within a subtree
+            whose level was set with ``LogRegister.set_level``
         """
         raise NotImplementedError  # pragma: no cover
 
+    def flush(self) -> None:
+        """Pushes any entries the handler is holding on to out to its stream -- a no-op for unbuffered handlers.
+        """
+
+    def close(self) -> None:
+        """Flushes the handler and releases the resources it holds.
+        """
+        self.flush()
+
+    def stats(self) -> Optional[Dict[str, object]]:
+        """Gets the stats instrumented loggers kept of the entries they passed to this handler: how many were
+        ``emitted`` at or above its minimum level and how many ``filtered`` below it, the ``bytes`` of the emitted
+        entries, the ``errors`` raised by ``write``, and a ``write_seconds`` latency histogram.
+
+        :returns: the counters and histogram -- ``None`` if no instrumented logger wrote to the handler
+        """
+        if self._stats is None:
+            return None
+        return self._stats.snapshot()
+
+    def _instrument(self) -> Stats:
+        """Gets the handler's stats, creating them the first time an instrumented logger writes to it.
+
+        :returns: the stats
+        """
+        with self._lock:
+            if self._stats is None:
+                self._stats = Stats(HANDLER_COUNTERS, HANDLER_HISTOGRAMS)
+        return self._stats
+
+    def _before_fork(self) -> None:
+        """Gets the handler ready for the process to fork -- most handlers have nothing to do.
+        """
+
+    def _after_fork(self) -> None:
+        """Reinitializes the handler in a forked child process. The I/O lock is replaced, since another thread of the
+        parent may have been holding it when the process forked, and the stats start over -- subclasses also reopen
+        whatever else can't be shared with the parent.
+        """
+        self._lock = threading.Lock()
+        if self._stats is not None:
+            self._stats._after_fork()
+
     def _create_name(self) -> str:
         """Creates the name for the handler - called from ``__init__`` if a name is not given.
 
         :returns: an appropriate name for the handler
         """
         raise NotImplementedError  # pragma: no cover
+
+
+# every live handler, so they can be reinitialized in forked children
+_handlers: weakref.WeakSet = weakref.WeakSet()
+
+
+def _before_fork() -> None:
+    """Gets every handler ready for the process to fork -- registered to run in the parent before every ``os.fork``.
+    """
+    for handler in list(_handlers):
+        try:
+            handler._before_fork()
+        except Exception:
+            traceback.print_exc()
+
+
+def _after_fork_in_child() -> None:  # pragma: no cover
+    """Reinitializes every handler -- registered to run in the child after every ``os.fork``.
+    """
+    for handler in list(_handlers):
+        try:
+            handler._after_fork()
+        except Exception:
+            # one handler that can't reconnect shouldn't keep the others from being reinitialized
+            traceback.print_exc()
+
+
+os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
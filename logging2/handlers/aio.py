@@ -0,0 +1,452 @@
+import asyncio
+import os
+import socket
+import syslog
+from typing import List, Optional, Union
+
+from logging2.handlers.abc import Handler
+from logging2.levels import SYSLOG_SEVERITIES, LogLevel
+
+
+class AsyncHandler(Handler):
+    """The base for handlers meant to be used from inside an ``asyncio`` event loop. ``write`` never does any I/O:
+    the encoded entry is appended to a pending buffer and a background task on the running loop sends it. While the
+    sink is slow the pending buffer grows up to ``max_buffer`` bytes, after which new entries are dropped and counted
+    in ``dropped``. Use ``await handler.aflush()`` to wait until every pending entry is sent and
+    ``await handler.aclose()`` to release the connection.
+    """
+
+    DEFAULT_MAX_BUFFER: int = 1024 * 1024
+
+    def __init__(
+        self,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncHandler``
+
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.encoding: str = encoding
+        self.max_buffer: int = max_buffer or self.DEFAULT_MAX_BUFFER
+        self.dropped: int = 0
+        self.errors: int = 0
+
+        self._pending: List[bytes] = []
+        self._pending_size: int = 0
+        self._task: Optional[asyncio.Task] = None
+        super().__init__(name=name, level=level)
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Queues the full log entry to be sent by the event loop. If no loop is running, the entry is held until
+        the next ``aflush``.
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if message.__class__ is bytes:
+                data = message
+            else:
+                data = message.encode(self.encoding)
+            if self._pending_size + len(data) > self.max_buffer:
+                self.dropped += 1
+                return
+            self._pending.append(data)
+            self._pending_size += len(data)
+
+            if self._task is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    return
+                self._task = loop.create_task(self._drain())
+
+    async def aflush(self) -> None:
+        """Waits until every pending entry has been handed to the sink.
+        """
+        while self._pending or self._task is not None:
+            if self._task is not None:
+                await self._task
+            else:
+                self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def aclose(self) -> None:
+        """Flushes the pending entries and closes the connection to the sink.
+        """
+        await self.aflush()
+        await self._disconnect()
+
+    def _after_fork(self) -> None:
+        """Discards the entries the parent had pending and forgets the parent's drain task -- event loops don't carry
+        over into a forked child.
+        """
+        super()._after_fork()
+        self._pending = []
+        self._pending_size = 0
+        self._task = None
+
+    async def _drain(self) -> None:
+        """Sends pending entries in batches until none are left. Errors are counted in ``errors`` and the failed batch
+        is discarded; the connection is reestablished for the next batch.
+        """
+        try:
+            while self._pending:
+                entries, self._pending, self._pending_size = self._pending, [], 0
+                try:
+                    await self._send(entries)
+                except (OSError, EOFError):
+                    self.errors += 1
+                    await self._disconnect()
+        finally:
+            self._task = None
+
+    async def _send(self, entries: List[bytes]) -> None:
+        """Sends a batch of encoded entries to the sink.
+
+        :param entries: the encoded entries, in order
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    async def _disconnect(self) -> None:
+        """Closes the connection to the sink, if there is one.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+
+class AsyncStreamHandler(AsyncHandler):
+    """A generic ``AsyncHandler`` for stream sockets. Each batch of pending entries is joined and written to an
+    ``asyncio`` stream, and the writer is drained before the next batch is sent.
+    """
+
+    def __init__(
+        self,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncStreamHandler``
+
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self._writer: Optional[asyncio.StreamWriter] = None
+        super().__init__(
+            encoding=encoding, max_buffer=max_buffer, name=name, level=level
+        )
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        """Opens the stream to the sink.
+
+        :returns: the stream writer
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    async def _send(self, entries: List[bytes]) -> None:
+        """Writes a batch of encoded entries to the stream and waits for it to drain.
+
+        :param entries: the encoded entries, in order
+        """
+        if self._writer is None:
+            self._writer = await self._connect()
+        self._writer.write(b"".join(entries))
+        await self._writer.drain()
+
+    def _after_fork(self) -> None:
+        """Forgets the parent's stream, which belongs to the parent's event loop -- the child connects again.
+        """
+        super()._after_fork()
+        self._writer = None
+
+    async def _disconnect(self) -> None:
+        """Closes the stream, if it is open.
+        """
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:  # pragma: no cover
+                pass
+
+
+class AsyncTcpHandler(AsyncStreamHandler):
+    """An ``AsyncStreamHandler`` that sends entries over a TCP connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncTcpHandler``
+
+        :param host: the server's hostname -- an FQDN, an IP address, anything that can be resolved
+        :param port: the server's port
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.host: str = host
+        self.port: int = port
+        super().__init__(
+            encoding=encoding, max_buffer=max_buffer, name=name, level=level
+        )
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        """Opens the TCP connection.
+
+        :returns: the stream writer
+        """
+        _, writer = await asyncio.open_connection(self.host, self.port)
+        return writer
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `TCP {host}:{port}`
+        """
+        return f"TCP {self.host}:{self.port}"
+
+
+class AsyncUnixSocketHandler(AsyncStreamHandler):
+    """An ``AsyncStreamHandler`` that sends entries over a stream connection to a local UNIX socket.
+    """
+
+    def __init__(
+        self,
+        node: str,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncUnixSocketHandler``
+
+        :param node: the path to the socket node on the system
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.node: str = node
+        super().__init__(
+            encoding=encoding, max_buffer=max_buffer, name=name, level=level
+        )
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        """Opens the UNIX socket connection.
+
+        :returns: the stream writer
+        """
+        _, writer = await asyncio.open_unix_connection(self.node)
+        return writer
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `UNIX {node}`
+        """
+        return f"UNIX {self.node}"
+
+
+class AsyncUdpHandler(AsyncHandler):
+    """An ``AsyncHandler`` that sends each entry as a UDP datagram through an ``asyncio`` datagram endpoint.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncUdpHandler``
+
+        :param host: the server's hostname -- an FQDN, an IP address, anything that can be resolved
+        :param port: the server's port
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.host: str = host
+        self.port: int = port
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        super().__init__(
+            encoding=encoding, max_buffer=max_buffer, name=name, level=level
+        )
+
+    async def _send(self, entries: List[bytes]) -> None:
+        """Sends each encoded entry as its own datagram.
+
+        :param entries: the encoded entries, in order
+        """
+        if self._transport is None:
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol,
+                remote_addr=(self.host, self.port),
+                family=socket.AF_INET,
+            )
+        for data in entries:
+            self._transport.sendto(data)
+
+    def _after_fork(self) -> None:
+        """Forgets the parent's endpoint, which belongs to the parent's event loop -- the child opens its own.
+        """
+        super()._after_fork()
+        self._transport = None
+
+    async def _disconnect(self) -> None:
+        """Closes the datagram endpoint, if it is open.
+        """
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            transport.close()
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `UDP {host}:{port}`
+        """
+        return f"UDP {self.host}:{self.port}"
+
+
+class AsyncSyslogHandler(AsyncUdpHandler):
+    """An ``AsyncUdpHandler`` preconfigured to send messages as datagrams to a syslog service.
+    """
+
+    def __init__(
+        self,
+        facility: Optional[int] = syslog.LOG_USER,
+        host: Optional[str] = "localhost",
+        port: Optional[int] = 514,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncSyslogHandler``
+
+        :param facility: the syslog facility
+        :param host: the hostname of the syslog server
+        :param port: the port of the syslog server
+        :param encoding: the message encoding
+        :param max_buffer: the maximum number of bytes waiting to be sent before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.facility: int = facility
+        super().__init__(
+            host=host,
+            port=port,
+            encoding=encoding,
+            max_buffer=max_buffer,
+            name=name,
+            level=level,
+        )
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Queues the full log entry, prefixed with its syslog priority, to be sent by the event loop
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            priority = self.facility | SYSLOG_SEVERITIES[level]
+            if message.__class__ is bytes:
+                super().write(b"<%d>%b\000" % (priority, message), level, force)
+            else:
+                super().write(f"<{priority}>{message}\000", level, force)
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `syslog-{facility}`
+        """
+        return f"syslog-{self.facility}"
+
+
+class AsyncFileHandler(AsyncHandler):
+    """An ``AsyncHandler`` that appends entries to a file on the local system. Each batch of pending entries is
+    written with a single ``write`` call run in the loop's default executor, so the loop never waits on the disk.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        encoding: Optional[str] = "utf8",
+        max_buffer: Optional[int] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``AsyncFileHandler``
+
+        :param file_path: the path (full or relative) to the log file
+        :param encoding: the file encoding
+        :param max_buffer: the maximum number of bytes waiting to be written before new entries are dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.file_path: str = file_path
+        self.fd: Optional[int] = None
+        super().__init__(
+            encoding=encoding, max_buffer=max_buffer, name=name, level=level
+        )
+
+    async def _send(self, entries: List[bytes]) -> None:
+        """Writes a batch of encoded entries to the file from the default executor.
+
+        :param entries: the encoded entries, in order
+        """
+        if self.fd is None:
+            self.fd = os.open(
+                self.file_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666
+            )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_all, b"".join(entries))
+
+    def _write_all(self, data: bytes) -> None:
+        """Writes all of ``data`` to the file descriptor, retrying on short writes.
+
+        :param data: the bytes to be written
+        """
+        written = os.write(self.fd, data)
+        while written < len(data):  # pragma: no cover
+            written += os.write(self.fd, data[written:])
+
+    async def _disconnect(self) -> None:
+        """Closes the file, if it is open.
+        """
+        fd, self.fd = self.fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the name of the file
+        """
+        return os.path.basename(self.file_path)
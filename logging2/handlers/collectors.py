@@ -0,0 +1,220 @@
+import atexit
+import multiprocessing
+import os
+import socket
+import stat
+from typing import Iterable, List, Optional, Tuple, Union
+
+from logging2.handlers.abc import Handler
+from logging2.levels import LogLevel
+
+# each datagram starts with a single byte holding the level of the entry
+_LEVEL_PREFIXES: Tuple[bytes, ...] = tuple(bytes([level]) for level in LogLevel)
+_LEVELS: Tuple[LogLevel, ...] = tuple(LogLevel)
+
+
+class CollectorHandler(Handler):
+    """A ``Handler`` for worker processes that leaves the I/O to a ``Collector``. Each entry is sent, already
+    formatted, as a single datagram over the collector's local UNIX socket -- datagrams are never interleaved, so any
+    number of processes and threads can share the collector. When the collector falls behind, sending blocks until
+    there is room in its socket buffer.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        encoding: Optional[str] = "utf8",
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``CollectorHandler``
+
+        :param path: the path to the collector's socket node
+        :param encoding: the message encoding
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.path: str = path
+        self.encoding: str = encoding
+        super().__init__(name=name, level=level)
+        self.socket: Optional[socket.socket] = self._connect()
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Sends the full log entry to the collector
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if message.__class__ is not bytes:
+                message = message.encode(self.encoding)
+            sock = self.socket
+            if sock is None:
+                with self._lock:
+                    if self.socket is None:
+                        self.socket = self._connect()
+                    sock = self.socket
+            sock.sendmsg((_LEVEL_PREFIXES[level], message))
+
+    def close(self) -> None:
+        """Closes the socket.
+        """
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def _connect(self) -> socket.socket:
+        """Opens a datagram socket connected to the collector.
+
+        :returns: the connected socket
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.connect(self.path)
+        return sock
+
+    def _after_fork(self) -> None:
+        """Drops the child's copy of the parent's socket -- the child connects on its own the first time it writes.
+        """
+        super()._after_fork()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `collector {path}`
+        """
+        return f"collector {self.path}"
+
+
+class Collector:
+    """Writes the entries of many processes from a single one. Worker processes log through ``CollectorHandler``s;
+    the collector receives their entries on a local UNIX datagram socket and writes them to its own handlers. Whatever
+    entries have arrived are written together: consecutive entries of the same level, up to ``batch_size`` bytes, are
+    joined into a single ``write`` on each handler, so the disk or network sees a few large writes instead of many
+    small ones. Joining entries suits stream-like handlers such as files and TCP connections -- datagram handlers
+    would send each batch as one datagram.
+
+    ``start`` runs the collector in a forked child process, and ``stop`` makes it write out what it has received and
+    exit. ``serve`` runs the collector in the calling process instead.
+    """
+
+    DEFAULT_BATCH_SIZE: int = 64 * 1024
+    MAX_ENTRY_SIZE: int = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        handler: Optional[Handler] = None,
+        handlers: Optional[Iterable[Handler]] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """Instantiates a new ``Collector`` and binds its socket, so handlers can connect to it right away
+
+        :param path: the path of the socket node -- a stale node left behind at this path is replaced
+        :param handler: a handler to write the collected entries to
+        :param handlers: a group of handlers to write the collected entries to
+        :param batch_size: the maximum number of bytes joined into a single write
+        """
+        self.path: str = path
+        self.handlers: Tuple[Handler, ...] = tuple(
+            ([handler] if handler else []) + list(handlers or [])
+        )
+        if not self.handlers:
+            raise ValueError("Collector needs at least one handler to write entries to")
+        self.batch_size: int = batch_size or self.DEFAULT_BATCH_SIZE
+        self.errors: int = 0
+        self.process: Optional[multiprocessing.Process] = None
+
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        self.socket: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(path)
+
+    def start(self) -> None:
+        """Forks the collector process. It is stopped automatically at interpreter exit.
+        """
+        context = multiprocessing.get_context("fork")
+        self.process = context.Process(
+            target=self.serve, name=f"logging2-collector {self.path}"
+        )
+        self.process.start()
+        # only the collector process reads from the socket
+        self.socket.close()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Tells the collector to write out every entry it has received and exit, then waits for the process to
+        finish if it was started with ``start``.
+
+        :param timeout: the maximum number of seconds to wait for the process
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            try:
+                sock.sendto(b"", self.path)  # entries are never empty, so this is the stop signal
+            except OSError:
+                pass  # already stopped
+        if self.process is not None:
+            atexit.unregister(self.stop)
+            self.process.join(timeout)
+
+    def serve(self) -> None:
+        """Receives and writes entries until the collector is stopped, then flushes and closes the handlers and
+        removes the socket node.
+        """
+        sock = self.socket
+        buffer = bytearray(self.MAX_ENTRY_SIZE)
+        view = memoryview(buffer)
+        running = True
+        while running:
+            size = sock.recv_into(buffer)
+            entries: List[Tuple[LogLevel, bytes]] = []
+            batched = 0
+            while True:
+                if size == 0:
+                    running = False
+                    break
+                entries.append((_LEVELS[buffer[0]], bytes(view[1:size])))
+                batched += size
+                if batched >= self.batch_size:
+                    break
+                try:
+                    size = sock.recv_into(buffer, 0, socket.MSG_DONTWAIT)
+                except BlockingIOError:
+                    break
+            self._write(entries)
+
+        for handler in self.handlers:
+            try:
+                handler.close()
+            except Exception:
+                self.errors += 1
+        sock.close()
+        os.unlink(self.path)
+
+    def _write(self, entries: List[Tuple[LogLevel, bytes]]) -> None:
+        """Writes received entries to the handlers, joining runs of entries with the same level.
+
+        :param entries: the levels and encoded entries, in the order they were received
+        """
+        start = 0
+        for i in range(1, len(entries) + 1):
+            if i == len(entries) or entries[i][0] is not entries[start][0]:
+                level = entries[start][0]
+                if i - start == 1:
+                    data = entries[start][1]
+                else:
+                    data = b"".join(entry for _, entry in entries[start:i])
+                for handler in self.handlers:
+                    try:
+                        handler.write(data, level=level)
+                    except Exception:
+                        self.errors += 1
+                start = i
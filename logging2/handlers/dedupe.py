@@ -0,0 +1,182 @@
+import re
+from typing import Iterable, Optional, Tuple, Union
+
+from logging2.handlers.abc import Handler
+from logging2.levels import LogLevel
+from logging2.utils import FlushTimer
+
+# ISO 8601 timestamps, as rendered by loggers, with any precision and UTC offset
+ISO_TIMESTAMP_PATTERN: str = (
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[+-]\d{2}:\d{2}|Z)?"
+)
+
+
+class DedupeHandler(Handler):
+    """A ``Handler`` that collapses runs of identical entries before passing them on to other handlers. The first
+    entry of a run is written right away and the identical entries that follow are only counted. When a different
+    entry comes in, or ``window`` seconds after the first repeat, a single summary entry reporting the count is written
+    instead, at the level of the repeated entry. After a window expires, the next identical entry starts a new run.
+
+    Entries are compared without their timestamp: the parts of each entry before and after the first match of
+    ``timestamp_pattern`` are compared to those of the previous one. Only the previous entry is kept, so each entry
+    costs a search and a comparison. The summaries of ``bytes`` entries, written by structured loggers, are JSON
+    objects by default.
+    """
+
+    DEFAULT_WINDOW: float = 30.0
+    DEFAULT_SUMMARY: str = "Last entry repeated {count} times\n"
+    DEFAULT_STRUCTURED_SUMMARY: str = (
+        '{{"message":"Last entry repeated {count} times"}}\n'
+    )
+
+    def __init__(
+        self,
+        handler: Optional[Handler] = None,
+        handlers: Optional[Iterable[Handler]] = None,
+        window: Optional[float] = None,
+        timestamp_pattern: Optional[str] = ISO_TIMESTAMP_PATTERN,
+        summary: Optional[str] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``DedupeHandler``
+
+        :param handler: a handler to pass the entries to
+        :param handlers: a group of handlers to pass the entries to
+        :param window: the maximum number of seconds repeats are counted before a summary is written
+        :param timestamp_pattern: a regular expression matching the part of an entry that is ignored when comparing
+            entries -- ``None`` compares whole entries
+        :param summary: the template of the summary entries, with a ``{count}`` field -- defaults to
+            ``DEFAULT_SUMMARY``, or to the JSON object ``DEFAULT_STRUCTURED_SUMMARY`` for ``bytes`` entries
+        :param name: the name of the handler
+        :param level: the minimum level of verbosity/priority of the messages this will log -- defaults to the
+            lowest level accepted by the wrapped handlers
+        """
+        self.handlers: Tuple[Handler, ...] = tuple(
+            ([handler] if handler else []) + list(handlers or [])
+        )
+        if not self.handlers:
+            raise ValueError(
+                "DedupeHandler needs at least one handler to pass entries to"
+            )
+
+        if level is None:
+            level = min(handler.min_level for handler in self.handlers)
+        super().__init__(name=name, level=level)
+
+        self.summary: Optional[str] = summary
+        self.suppressed: int = 0
+        self._patterns: Optional[Tuple[re.Pattern, re.Pattern]] = None
+        if timestamp_pattern is not None:
+            self._patterns = (
+                re.compile(timestamp_pattern),
+                re.compile(timestamp_pattern.encode()),
+            )
+
+        # the previous entry, or the parts of it around its timestamp
+        self._last: Union[str, bytes, tuple, None] = None
+        self._last_bytes: bool = False
+        self._last_level: Optional[LogLevel] = None
+        self._last_force: bool = False
+        self._repeats: int = 0
+        self._timer: FlushTimer = FlushTimer(
+            window or self.DEFAULT_WINDOW, self._expire
+        )
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Passes the full log entry on to the wrapped handlers, unless it repeats the previous one
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            key = message
+            if self._patterns is not None:
+                match = self._patterns[message.__class__ is bytes].search(message)
+                if match is not None:
+                    key = (message[: match.start()], message[match.end() :])
+            with self._lock:
+                if (
+                    key == self._last
+                    and level is self._last_level
+                    and force is self._last_force
+                ):
+                    self._repeats += 1
+                    self.suppressed += 1
+                    self._timer.arm()
+                    return
+                self._end_run()
+                self._last = key
+                self._last_level = level
+                self._last_force = force
+                self._last_bytes = message.__class__ is bytes
+                self._write(message, level, force)
+
+    def flush(self) -> None:
+        """Flushes the wrapped handlers -- a run that is still being counted carries on.
+        """
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        """Writes the summary of the current run, if any, and closes the wrapped handlers.
+        """
+        with self._lock:
+            self._end_run()
+            self._last = None
+        for handler in self.handlers:
+            handler.close()
+
+    def _expire(self) -> None:
+        """Writes the summary of the current run once its window has passed -- called from the timer.
+        """
+        with self._lock:
+            self._end_run()
+            self._last = None
+
+    def _end_run(self) -> None:
+        """Writes the summary of the current run if there were repeats -- must be called with the lock held.
+        """
+        self._timer.cancel()
+        if self._repeats:
+            if self._last_bytes:
+                summary = self.summary or self.DEFAULT_STRUCTURED_SUMMARY
+                summary = summary.format(count=self._repeats).encode()
+            else:
+                summary = (self.summary or self.DEFAULT_SUMMARY).format(
+                    count=self._repeats
+                )
+            self._repeats = 0
+            self._write(summary, self._last_level, self._last_force)
+
+    def _write(self, message: Union[str, bytes], level: LogLevel, force: bool) -> None:
+        """Writes an entry to each of the wrapped handlers.
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below the wrapped handlers' ``min_level``
+        """
+        for handler in self.handlers:
+            if force:
+                handler.write(message, level=level, force=True)
+            else:
+                handler.write(message, level=level)
+
+    def _after_fork(self) -> None:
+        """Forgets the parent's current run -- the parent writes its summary itself -- and replaces the timer, whose
+        thread did not survive the fork. The wrapped handlers are reinitialized on their own.
+        """
+        super()._after_fork()
+        self._last = None
+        self._repeats = 0
+        self._timer = FlushTimer(self._timer.interval, self._expire)
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `dedupe-{handler names}`
+        """
+        return "dedupe-{}".format(",".join(handler.name for handler in self.handlers))
@@ -1,25 +1,47 @@
+import atexit
 import codecs
+import gzip
+import mmap
+import os
+import queue
 import re
+import shutil
+import threading
+import time
+import zlib
 from codecs import StreamReaderWriter
-from typing import Optional
+from typing import Optional, Union
 
 from logging2.handlers.abc import Handler
 from logging2.levels import LogLevel
+from logging2.utils import FlushTimer
 
 
-# NOTE: This module does not provide handlers for rotating log files. The rationale behind that is that all *NIX systems
-# have software specifically designed to do that, and it's much faster and reliable. Let's separate
-# concerns here: this logging software is meant to be both Pythonic and fast. There's nothing Pythonic or fast about
-# reinventing the wheel. A great utility is ``logrotate``, which is available for Debian, Red Hat, and BSD systems.
+# NOTE: Where ``logrotate`` is available, prefer its ``create`` method and have it send a signal that calls
+# ``FileHandler.reopen`` (see ``logging2.control.install_reopen_handler``). Its ``copytruncate`` method loses the entries
+# written between the copy and the truncation. Where there is no ``logrotate``, e.g. in containers, use
+# ``RotatingFileHandler``.
 
 # Linux Manpage: https://linux.die.net/man/8/logrotate
 # FreeBSD Manpage: https://www.freebsd.org/cgi/man.cgi?query=logrotate&manpath=SuSE+Linux/i386+11.3
 
 
 class FileHandler(Handler):
-    """A type of ``Handler`` that writes messages to a file on the local system
+    """A type of ``Handler`` that writes messages to a file on the local system. By default every entry is written
+    and flushed as it comes in. Setting ``buffer_size`` switches to buffered mode: encoded entries are collected in a
+    preallocated buffer and written to the file descriptor with a single ``write`` when the buffer is full, when
+    ``flush_interval`` seconds have passed since the first buffered entry, or as soon as an entry at or above
+    ``flush_level`` comes in.
     """
 
+    DEFAULT_FLUSH_INTERVAL: float = 1.0
+    DEFAULT_FLUSH_LEVEL: LogLevel = LogLevel.error
+
+    _OPEN_FLAGS = {
+        "a": os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+        "w": os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+    }
+
     def __init__(
         self,
         file_path: str,
@@ -29,37 +51,755 @@ class FileHandler(Handler):
         buffering: Optional[int] = 1,
         name: Optional[str] = None,
         level: Optional[LogLevel] = None,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_level: Optional[LogLevel] = None,
     ):
         """Instantiates a new ``FileHandler``
 
         :param file_path: the path (full or relative) to the log file
-        :param mode: the file mode
+        :param mode: the file mode -- only ``a`` and ``w`` are supported in buffered mode
         :param encoding: the file encoding
         :param errors: how should errors be handled
-        :param buffering: should the line be buffered
+        :param buffering: should the line be buffered -- ignored in buffered mode
         :param name: the name of the handler
         :param level: the minimum level of verbosity/priority of the messages this will log
+        :param buffer_size: enables buffered mode with a buffer of this many bytes
+        :param flush_interval: in buffered mode, the maximum number of seconds an entry is held in the buffer
+        :param flush_level: in buffered mode, entries at or above this level flush the buffer immediately
         """
-        self.fh: StreamReaderWriter = codecs.open(
-            file_path, mode=mode, encoding=encoding, errors=errors, buffering=buffering
-        )
-        super().__init__(name=name, level=level)
+        self.file_path: str = file_path
         self.encoding: str = encoding
+        self.errors: str = errors
+        self.fh: Optional[StreamReaderWriter] = None
+        self.fd: Optional[int] = None
+        self._buffering: int = buffering
+        self._closed: bool = False
+
+        self._buffer: Optional[bytearray] = None
+        if buffer_size:
+            if mode not in self._OPEN_FLAGS:
+                raise ValueError(f"Mode `{mode}` is not supported in buffered mode")
+            self._open_fd(mode)
+            self._buffer = bytearray(buffer_size)
+            self._offset: int = 0
+            self._timer: FlushTimer = FlushTimer(
+                flush_interval or self.DEFAULT_FLUSH_INTERVAL, self.flush
+            )
+            self.flush_level: LogLevel = flush_level or self.DEFAULT_FLUSH_LEVEL
+            atexit.register(self.flush)
+        else:
+            self.fh = codecs.open(
+                file_path,
+                mode=mode,
+                encoding=encoding,
+                errors=errors,
+                buffering=buffering,
+            )
+        super().__init__(name=name, level=level)
 
-    def write(self, message: str, level: LogLevel) -> None:
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
         """Writes the full log entry to the configured file
 
         :param message: the entire message to be written, full formatted
         :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if self._buffer is None:
+                with self._lock:
+                    if message.__class__ is bytes:
+                        self.fh.stream.write(message)
+                    else:
+                        self.fh.write(message)
+                    self.fh.flush()
+                return
+
+            if message.__class__ is bytes:
+                data = message
+            else:
+                data = message.encode(self.encoding, self.errors)
+            with self._lock:
+                if self.fd is None:
+                    return  # closed
+                end = self._offset + len(data)
+                if end > len(self._buffer):
+                    self._flush_buffer()
+                    if len(data) > len(self._buffer):
+                        self._write_fd(data)
+                        return
+                    end = len(data)
+                self._buffer[self._offset : end] = data
+                self._offset = end
+                if level >= self.flush_level:
+                    self._flush_buffer()
+                else:
+                    self._timer.arm()
+
+    def flush(self) -> None:
+        """Writes out any buffered entries -- a no-op once the handler is closed.
+        """
+        with self._lock:
+            if self._buffer is None:
+                self.fh.flush()
+            elif self.fd is not None:
+                self._flush_buffer()
+
+    def close(self) -> None:
+        """Flushes the handler and closes the file. Closing more than once is a no-op. In buffered mode, entries
+        written after the handler is closed are dropped.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._close()
+
+    def reopen(self) -> None:
+        """Closes the file and opens ``file_path`` again, appending to it. After an external tool such as
+        ``logrotate`` renamed the file, this starts a new one. Buffered entries are written to the old file first.
+        A closed handler stays closed.
+        """
+        with self._lock:
+            if not self._closed:
+                self._reopen()
+
+    def _close(self) -> None:
+        """Flushes the handler and closes the file -- called once, by ``close``.
+        """
+        self.flush()
+        with self._lock:
+            if self._buffer is None:
+                self.fh.close()
+            else:
+                atexit.unregister(self.flush)
+                self._timer.cancel()
+                os.close(self.fd)
+                self.fd = None
+
+    def _after_fork(self) -> None:
+        """Discards the entries the parent had buffered -- the parent writes those itself -- and replaces the flush
+        timer, whose thread did not survive the fork. The unbuffered file object is flushed after every entry, so it
+        never holds anything the child could write twice.
+        """
+        super()._after_fork()
+        if self._buffer is not None:
+            self._offset = 0
+            self._timer = FlushTimer(self._timer.interval, self.flush)
+
+    def _reopen(self) -> None:
+        """Closes the file and opens it again in append mode -- must be called with the lock held.
+        """
+        if self._buffer is None:
+            self.fh.close()
+            self.fh = codecs.open(
+                self.file_path,
+                mode="a",
+                encoding=self.encoding,
+                errors=self.errors,
+                buffering=self._buffering,
+            )
+        else:
+            self._flush_buffer()
+            os.close(self.fd)
+            self._open_fd("a")
+
+    def _open_fd(self, mode: str) -> None:
+        """Opens the file descriptor used in buffered mode.
+
+        :param mode: the file mode -- ``a`` or ``w``
+        """
+        self.fd = os.open(self.file_path, self._OPEN_FLAGS[mode], 0o666)
+
+    def _flush_buffer(self) -> None:
+        """Writes the buffered bytes to the file descriptor -- must be called with the lock held.
         """
-        if level >= self.min_level:
-            self.fh.write(bytes(message, self.encoding).decode(self.encoding))
-            self.fh.flush()
+        self._timer.cancel()
+        if self._offset:
+            with memoryview(self._buffer) as view:
+                self._write_fd(view[: self._offset])
+            self._offset = 0
+
+    def _write_fd(self, data: bytes) -> None:
+        """Writes all of ``data`` to the file descriptor, retrying on short writes.
+
+        :param data: the bytes to be written
+        """
+        written = os.write(self.fd, data)
+        while written < len(data):  # pragma: no cover
+            written += os.write(self.fd, data[written:])
 
     def _create_name(self) -> str:
         """Creates the name for the handler - called from ``__init__`` if a name is not given.
 
         :returns: the name of the file
         """
-        fname = self.fh.name.split("/")[-1]
-        return re.sub("[^\w.]", "", str(fname))
+        return _file_name(self.file_path)
+
+
+class GzipFileHandler(FileHandler):
+    """A ``FileHandler`` that writes a gzip compressed file, always in buffered mode. Each time the buffer is flushed
+    -- when it is full, ``flush_interval`` seconds after the first buffered entry, or for an entry at or above
+    ``flush_level`` -- its contents are compressed and ended with a sync flush. The file always ends on a block
+    boundary, so ``zcat`` can read every flushed entry while the file is still being written. Closing the handler,
+    which happens automatically at interpreter exit, writes the gzip trailer.
+
+    With ``background``, the buffered chunks are compressed and written by a background thread instead, so the
+    logging threads only pay for copying the chunk. Up to ``max_pending`` chunks wait for it; after that, flushing the
+    buffer blocks. Chunks the thread fails to write are counted in ``write_errors``.
+
+    Appending to an existing file adds a new gzip member, which ``gzip`` tools read as a continuation. ``reopen`` ends
+    the current member before closing the file, so a file renamed by ``logrotate`` is complete. The compressed
+    stream can't be shared between processes: the current member is ended before the process forks, and the parent
+    and the child each start a new one with their next entries. Members written at the same time would interleave,
+    so only one process may keep writing, such as the process of a ``Collector``.
+    """
+
+    DEFAULT_BUFFER_SIZE: int = 64 * 1024
+    DEFAULT_COMPRESS_LEVEL: int = 6
+    DEFAULT_MAX_PENDING: int = 64
+
+    def __init__(
+        self,
+        file_path: str,
+        mode: Optional[str] = "a",
+        encoding: Optional[str] = "utf8",
+        errors: Optional[str] = "strict",
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_level: Optional[LogLevel] = None,
+        compress_level: Optional[int] = None,
+        background: Optional[bool] = False,
+        max_pending: Optional[int] = None,
+    ):
+        """Instantiates a new ``GzipFileHandler``
+
+        :param file_path: the path (full or relative) to the log file
+        :param mode: the file mode -- ``a`` or ``w``
+        :param encoding: the file encoding
+        :param errors: how should errors be handled
+        :param name: the name of the handler
+        :param level: the minimum level of verbosity/priority of the messages this will log
+        :param buffer_size: the number of bytes of entries compressed at a time
+        :param flush_interval: the maximum number of seconds an entry is held in the buffer
+        :param flush_level: entries at or above this level are compressed and flushed immediately
+        :param compress_level: the compression level, from ``0`` (stored) to ``9`` (smallest)
+        :param background: compress and write from a background thread
+        :param max_pending: with ``background``, the maximum number of chunks waiting to be compressed
+        """
+        if compress_level is None:
+            compress_level = self.DEFAULT_COMPRESS_LEVEL
+        self.compress_level: int = compress_level
+        self.write_errors: int = 0
+        self._compressor: "zlib._Compress" = self._new_compressor()
+        # whether entries were compressed into the current member, which must then be ended before a fork
+        self._started: bool = False
+        super().__init__(
+            file_path,
+            mode=mode,
+            encoding=encoding,
+            errors=errors,
+            name=name,
+            level=level,
+            buffer_size=buffer_size or self.DEFAULT_BUFFER_SIZE,
+            flush_interval=flush_interval,
+            flush_level=flush_level,
+        )
+
+        self._chunks: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        if background:
+            self._chunks = queue.Queue(max_pending or self.DEFAULT_MAX_PENDING)
+            self._start_worker()
+        atexit.register(self.close)
+
+    def flush(self) -> None:
+        """Compresses and writes out any buffered entries, ending the compressed stream on a block boundary. With
+        ``background``, blocks until the background thread has written them.
+        """
+        super().flush()
+        if self._chunks is not None:
+            self._chunks.join()
+
+    def _close(self) -> None:
+        """Flushes the handler, writes the gzip trailer and closes the file -- called once, by ``close``.
+        """
+        atexit.unregister(self.close)
+        self.flush()
+        if self._worker is not None:
+            self._chunks.put(None)
+            self._worker.join()
+        with self._lock:
+            super()._write_fd(self._compressor.flush(zlib.Z_FINISH))
+        super()._close()
+
+    def _reopen(self) -> None:
+        """Ends the gzip member in the old file, then opens the file again and starts a new member in it -- must be
+        called with the lock held.
+        """
+        self._end_member()
+        super()._reopen()
+
+    def _end_member(self) -> None:
+        """Writes out the buffered entries and the gzip trailer, and starts a new member with the next entries -- must
+        be called with the lock held.
+        """
+        self._flush_buffer()
+        if self._chunks is not None:
+            self._chunks.join()
+        super()._write_fd(self._compressor.flush(zlib.Z_FINISH))
+        self._compressor = self._new_compressor()
+        self._started = False
+
+    def _write_fd(self, data: bytes) -> None:
+        """Compresses a chunk of entries and writes it, or hands it to the background thread -- called with the lock
+        held.
+
+        :param data: the encoded entries
+        """
+        self._started = True
+        if self._chunks is None:
+            self._compress(data)
+        else:
+            self._chunks.put(bytes(data))
+
+    def _compress(self, data: bytes) -> None:
+        """Compresses a chunk of entries, ends it on a block boundary and writes it to the file.
+
+        :param data: the encoded entries
+        """
+        compressor = self._compressor
+        super()._write_fd(
+            compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        )
+
+    def _start_worker(self) -> None:
+        """Starts the background thread.
+        """
+        self._worker = threading.Thread(
+            target=self._work, name=f"logging2-{self.name}", daemon=True
+        )
+        self._worker.start()
+
+    def _work(self) -> None:
+        """Runs in the background thread: compresses and writes chunks until ``None`` is received.
+        """
+        chunks = self._chunks
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                chunks.task_done()
+                return
+            try:
+                self._compress(chunk)
+            except Exception:
+                self.write_errors += 1
+            chunks.task_done()
+
+    def _new_compressor(self) -> "zlib._Compress":
+        """Creates a compressor that writes a gzip member.
+
+        :returns: the compressor
+        """
+        return zlib.compressobj(self.compress_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _before_fork(self) -> None:
+        """Writes out the buffered entries and ends the current gzip member, if it has entries, so the parent and the
+        child each start a new one.
+        """
+        with self._lock:
+            if (self._started or self._offset) and not self._closed:
+                self._end_member()
+
+    def _after_fork(self) -> None:
+        """Starts a new gzip member in the child, and restarts the background thread, which did not survive the fork.
+        """
+        super()._after_fork()
+        self._compressor = self._new_compressor()
+        self._started = False
+        if self._chunks is not None:
+            self._chunks = queue.Queue(self._chunks.maxsize)
+            self._start_worker()
+
+
+class RotatingFileHandler(FileHandler):
+    """A ``FileHandler`` that rotates its own file. When writing the next chunk would take the file past
+    ``max_bytes``, or once the current ``interval`` has ended, the file is renamed to ``<file_path>.<timestamp>`` --
+    the UTC time of the rotation, as ``YYYYmmdd-HHMMSS`` -- and a new file is opened in its place. Rotating only costs a
+    rename and an open on the write path, since older segments keep their names. Like ``GzipFileHandler`` it is always
+    buffered, so the size is checked per chunk and an entry is never split across segments. Intervals are aligned to
+    the epoch: an ``interval`` of ``3600`` rotates on the hour.
+
+    Compressing the rotated segments with gzip and removing all but the newest ``backup_count`` of them is done by a
+    background thread. Failures there are counted in ``maintenance_errors``.
+
+    Each process rotates on its own counters, so several processes must not write to the same file through this
+    handler -- use a ``Collector`` to write it from a single process.
+    """
+
+    DEFAULT_BUFFER_SIZE: int = 64 * 1024
+
+    def __init__(
+        self,
+        file_path: str,
+        mode: Optional[str] = "a",
+        encoding: Optional[str] = "utf8",
+        errors: Optional[str] = "strict",
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_level: Optional[LogLevel] = None,
+        max_bytes: Optional[int] = None,
+        interval: Optional[float] = None,
+        backup_count: Optional[int] = None,
+        compress: Optional[bool] = False,
+    ):
+        """Instantiates a new ``RotatingFileHandler``
+
+        :param file_path: the path (full or relative) to the log file
+        :param mode: the file mode -- ``a`` or ``w``
+        :param encoding: the file encoding
+        :param errors: how should errors be handled
+        :param name: the name of the handler
+        :param level: the minimum level of verbosity/priority of the messages this will log
+        :param buffer_size: the number of bytes of entries written at a time
+        :param flush_interval: the maximum number of seconds an entry is held in the buffer
+        :param flush_level: entries at or above this level flush the buffer immediately
+        :param max_bytes: the size in bytes after which the file is rotated
+        :param interval: the number of seconds after which the file is rotated
+        :param backup_count: the number of rotated segments kept -- ``None`` keeps them all
+        :param compress: compress the rotated segments with gzip
+        """
+        self.max_bytes: Optional[int] = max_bytes
+        self.interval: Optional[float] = interval
+        self.backup_count: Optional[int] = backup_count
+        self.compress: bool = compress
+        self.rotations: int = 0
+        self.maintenance_errors: int = 0
+        self._size: int = 0
+        self._rollover_at: Optional[float] = None
+        if interval:
+            self._rollover_at = self._next_rollover(time.time())
+        super().__init__(
+            file_path,
+            mode=mode,
+            encoding=encoding,
+            errors=errors,
+            name=name,
+            level=level,
+            buffer_size=buffer_size or self.DEFAULT_BUFFER_SIZE,
+            flush_interval=flush_interval,
+            flush_level=flush_level,
+        )
+
+        directory, basename = os.path.split(os.path.abspath(file_path))
+        self._directory: str = directory
+        self._segment_pattern: re.Pattern = re.compile(
+            re.escape(basename) + r"\.(\d{8}-\d{6})(?:-(\d+))?(?:\.gz)?$"
+        )
+        self._segments: Optional[queue.SimpleQueue] = None
+        self._worker: Optional[threading.Thread] = None
+        if compress or backup_count is not None:
+            self._segments = queue.SimpleQueue()
+            self._start_worker()
+        atexit.register(self.close)
+
+    def _close(self) -> None:
+        """Flushes the handler and closes the file, then waits for the background thread to finish with the rotated
+        segments -- called once, by ``close``.
+        """
+        atexit.unregister(self.close)
+        super()._close()
+        if self._worker is not None:
+            self._segments.put(None)
+            self._worker.join()
+
+    def _write_fd(self, data: bytes) -> None:
+        """Rotates the file if it is due, then writes ``data`` to it -- called with the lock held.
+
+        :param data: the bytes to be written
+        """
+        rotate = self.max_bytes and self._size + len(data) > self.max_bytes
+        if self._rollover_at is not None:
+            now = time.time()
+            if now >= self._rollover_at:
+                self._rollover_at = self._next_rollover(now)
+                rotate = True
+        if rotate and self._size:
+            self._rotate()
+        super()._write_fd(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        """Renames the file to a new segment, opens a new file in its place and hands the segment to the background
+        thread -- must be called with the lock held.
+        """
+        os.close(self.fd)
+        segment = self._segment_path()
+        os.rename(self.file_path, segment)
+        self._open_fd("a")
+        self.rotations += 1
+        if self._segments is not None:
+            self._segments.put(segment)
+
+    def _open_fd(self, mode: str) -> None:
+        """Opens the file descriptor and reads the size of the file, which counts towards ``max_bytes``.
+
+        :param mode: the file mode -- ``a`` or ``w``
+        """
+        super()._open_fd(mode)
+        self._size = os.fstat(self.fd).st_size
+
+    def _segment_path(self) -> str:
+        """Gets the path the file is renamed to, adding a sequence number if it rotated more than once that second.
+
+        :returns: the path of the new segment
+        """
+        path = prefix = "{}.{}".format(
+            self.file_path, time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        )
+        sequence = 0
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            sequence += 1
+            path = f"{prefix}-{sequence}"
+        return path
+
+    def _next_rollover(self, now: float) -> float:
+        """Gets the end of the interval ``now`` is in.
+
+        :param now: the current time as a UNIX timestamp
+        :returns: the time the file should be rotated at
+        """
+        return now - now % self.interval + self.interval
+
+    def _start_worker(self) -> None:
+        """Starts the background thread.
+        """
+        self._worker = threading.Thread(
+            target=self._maintain, name=f"logging2-{self.name}", daemon=True
+        )
+        self._worker.start()
+
+    def _maintain(self) -> None:
+        """Runs in the background thread: compresses and prunes the rotated segments until ``None`` is received.
+        """
+        segments = self._segments
+        while True:
+            segment = segments.get()
+            if segment is None:
+                return
+            try:
+                # a segment that is gone was pruned while it waited, along with older ones
+                if self.compress and os.path.exists(segment):
+                    _gzip_file(segment)
+                if self.backup_count is not None:
+                    self._prune()
+            except Exception:
+                self.maintenance_errors += 1
+
+    def _prune(self) -> None:
+        """Removes all but the newest ``backup_count`` rotated segments.
+        """
+        found = []
+        for entry in os.listdir(self._directory):
+            match = self._segment_pattern.match(entry)
+            if match:
+                found.append(((match[1], int(match[2] or 0)), entry))
+        found.sort()
+        for _, entry in found[: max(len(found) - self.backup_count, 0)]:
+            os.remove(os.path.join(self._directory, entry))
+
+    def _after_fork(self) -> None:
+        """Discards the entries the parent had buffered and replaces the background thread, which did not survive the
+        fork. Segments the parent rotated are left to the parent.
+        """
+        super()._after_fork()
+        if self._worker is not None:
+            self._segments = queue.SimpleQueue()
+            self._start_worker()
+
+
+class MappedFileHandler(Handler):
+    """A type of ``Handler`` that appends messages to a memory-mapped file. A segment of ``segment_size`` bytes at
+    the end of the file is preallocated and mapped, and each entry is copied into the map -- there is no syscall per
+    entry. When the segment is full the file is extended and the next segment is mapped. Closing the handler
+    truncates the file to the size of the entries written.
+
+    Entries reach the page cache as soon as they are copied, so they survive the process crashing but not the
+    machine. With a ``sync_interval``, the map is synced to disk (``msync``) at most that many seconds after an
+    entry is written. If the process dies before the handler is closed, the file ends with the zeroed, unused part
+    of the segment.
+
+    The map is shared with forked child processes, so a child carries on writing after the parent's entries -- only
+    one process may keep writing, such as the process of a ``Collector``, which writes one file for many processes.
+    Closing the handler leaves the file as it is once another process has written past this one's entries.
+    """
+
+    DEFAULT_SEGMENT_SIZE: int = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        file_path: str,
+        encoding: Optional[str] = "utf8",
+        errors: Optional[str] = "strict",
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+        segment_size: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+    ):
+        """Instantiates a new ``MappedFileHandler``
+
+        :param file_path: the path (full or relative) to the log file -- entries are appended to an existing file
+        :param encoding: the file encoding
+        :param errors: how should encoding errors be handled
+        :param name: the name of the handler
+        :param level: the minimum level of verbosity/priority of the messages this will log
+        :param segment_size: the number of bytes mapped at a time, rounded up to the system's allocation granularity
+        :param sync_interval: the maximum number of seconds an entry waits to be synced to disk -- by default the
+            kernel writes the pages back on its own schedule
+        """
+        self.file_path: str = file_path
+        self.encoding: str = encoding
+        self.errors: str = errors
+        self.segment_size: int = _round_up(segment_size or self.DEFAULT_SEGMENT_SIZE)
+        self.sync_interval: Optional[float] = sync_interval
+        self.dropped: int = 0
+
+        self.fd: Optional[int] = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._map: Optional[mmap.mmap] = None
+        self._base: int = 0
+        self._offset: int = 0
+        self._map_segment(os.fstat(self.fd).st_size, 0)
+        self._timer: Optional[FlushTimer] = None
+        if sync_interval:
+            self._timer = FlushTimer(sync_interval, self.flush)
+        super().__init__(name=name, level=level)
+        atexit.register(self.close)
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Copies the full log entry into the mapped file
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if message.__class__ is bytes:
+                data = message
+            else:
+                data = message.encode(self.encoding, self.errors)
+            with self._lock:
+                if self._map is None:
+                    self.dropped += 1
+                    return
+                end = self._offset + len(data)
+                if end > len(self._map):
+                    self._map_segment(self._base + self._offset, len(data))
+                    end = self._offset + len(data)
+                self._map[self._offset : end] = data
+                self._offset = end
+                if self._timer is not None:
+                    self._timer.arm()
+
+    def flush(self) -> None:
+        """Syncs the mapped entries to disk.
+        """
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self) -> None:
+        """Syncs the mapped entries, unmaps the file and truncates it to the size of the entries.
+        """
+        with self._lock:
+            if self._map is None:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._map.flush()
+            if self._is_last_writer():
+                os.ftruncate(self.fd, self._base + self._offset)
+            self._map.close()
+            self._map = None
+            os.close(self.fd)
+            self.fd = None
+        atexit.unregister(self.close)
+
+    def _map_segment(self, end: int, size: int) -> None:
+        """Maps a new segment of the file, starting at the allocation boundary before ``end``, and extends the file to
+        cover it -- must be called with the lock held.
+
+        :param end: the offset in the file the next entry is written at
+        :param size: the size of the next entry, which the segment must fit
+        """
+        if self._map is not None:
+            if self.sync_interval:
+                self._map.flush()
+            self._map.close()
+        base = end - end % mmap.ALLOCATIONGRANULARITY
+        length = max(self.segment_size, _round_up(end - base + size))
+        os.ftruncate(self.fd, base + length)
+        self._map = mmap.mmap(self.fd, length, offset=base)
+        self._base = base
+        self._offset = end - base
+
+    def _is_last_writer(self) -> bool:
+        """Checks that no other process sharing the file wrote past this one's entries -- it would have extended or
+        truncated the file, or written to the unused part of this segment. Must be called with the lock held.
+
+        :returns: whether the file may be truncated to this process' entries
+        """
+        if os.fstat(self.fd).st_size != self._base + len(self._map):
+            return False
+        return self._offset == len(self._map) or self._map[self._offset] == 0
+
+    def _after_fork(self) -> None:
+        """Replaces the timer, whose thread did not survive the fork -- the child keeps writing to the shared map,
+        after the parent's entries.
+        """
+        super()._after_fork()
+        if self._timer is not None:
+            self._timer = FlushTimer(self._timer.interval, self.flush)
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the name of the file
+        """
+        return _file_name(self.file_path)
+
+
+def _gzip_file(path: str) -> None:
+    """Compresses a file to ``<path>.gz`` and removes the original.
+
+    :param path: the path to the file
+    """
+    with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.remove(path)
+
+
+def _round_up(size: int) -> int:
+    """Rounds a size up to a multiple of the allocation granularity, which offsets of mapped segments must be aligned
+    to.
+
+    :param size: the size in bytes
+    :returns: the rounded size
+    """
+    return -(-size // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+
+
+def _file_name(file_path: str) -> str:
+    """Gets the name of a file handler from the path of its file.
+
+    :param file_path: the path to the file
+    :returns: the name of the file, without any characters other than word characters and dots
+    """
+    fname = file_path.split("/")[-1]
+    return re.sub(r"[^\w.]", "", str(fname))
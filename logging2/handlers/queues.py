@@ -0,0 +1,243 @@
+import atexit
+import queue
+import threading
+from enum import Enum
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from logging2.handlers.abc import Handler
+from logging2.levels import LogLevel
+
+
+class OverflowPolicy(Enum):
+    """What a ``QueueHandler`` does with a new entry when its queue is full.
+    """
+
+    block: str = "block"
+    drop_newest: str = "drop_newest"
+    drop_oldest: str = "drop_oldest"
+    drop_below_level: str = "drop_below_level"
+
+
+class QueueHandler(Handler):
+    """A ``Handler`` that moves the I/O of other handlers off the calling thread. Entries are put on a bounded queue
+    and a background listener thread passes them on to the wrapped handlers. The queue is drained when the handler
+    is closed, which happens automatically at interpreter exit. Entries written after the handler is closed, or queued
+    while it was closing, are written synchronously.
+    """
+
+    DEFAULT_MAX_SIZE: int = 10_000
+
+    _SENTINEL: object = object()
+
+    def __init__(
+        self,
+        handler: Optional[Handler] = None,
+        handlers: Optional[Iterable[Handler]] = None,
+        max_size: Optional[int] = None,
+        overflow: Optional[OverflowPolicy] = OverflowPolicy.block,
+        overflow_level: Optional[LogLevel] = LogLevel.error,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``QueueHandler``
+
+        :param handler: a handler to pass the queued entries to
+        :param handlers: a group of handlers to pass the queued entries to
+        :param max_size: the maximum number of entries waiting in the queue
+        :param overflow: what to do with a new entry when the queue is full
+        :param overflow_level: with ``OverflowPolicy.drop_below_level``, entries at or above this level block until
+            there is room in the queue; entries below it are dropped
+        :param name: the name of the handler
+        :param level: the minimum level of verbosity/priority of the messages this will log -- defaults to the
+            lowest level accepted by the wrapped handlers
+        """
+        self.handlers: Tuple[Handler, ...] = tuple(
+            ([handler] if handler else []) + list(handlers or [])
+        )
+        if not self.handlers:
+            raise ValueError(
+                "QueueHandler needs at least one handler to pass entries to"
+            )
+
+        if level is None:
+            level = min(handler.min_level for handler in self.handlers)
+        super().__init__(name=name, level=level)
+
+        self.queue: queue.Queue = queue.Queue(max_size or self.DEFAULT_MAX_SIZE)
+        self.overflow: OverflowPolicy = overflow
+        self.overflow_level: LogLevel = overflow_level
+        self.dropped: int = 0
+        self.dropped_by_level: Dict[LogLevel, int] = dict.fromkeys(LogLevel, 0)
+        self.errors: int = 0
+
+        self._closed: bool = False
+        self._counter_lock: threading.Lock = threading.Lock()
+        self._listener: threading.Thread = None
+        self._start_listener()
+        atexit.register(self.close)
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Puts the full log entry on the queue for the listener thread
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if self._closed:
+                # the listener is gone -- late entries (e.g. from other exit hooks) are written synchronously
+                for handler in self.handlers:
+                    if force:
+                        handler.write(message, level=level, force=True)
+                    else:
+                        handler.write(message, level=level)
+                return
+            try:
+                self.queue.put_nowait((message, level, force))
+            except queue.Full:
+                self._overflow(message, level, force)
+            if self._closed:
+                # the handler was closed while the entry was being queued, so it may be behind the sentinel
+                self._drain()
+
+    def flush(self) -> None:
+        """Blocks until every queued entry has been written and the wrapped handlers have been flushed.
+        """
+        if self._listener.is_alive():
+            self.queue.join()
+
+    def close(self) -> None:
+        """Drains the queue, flushes the wrapped handlers and stops the listener thread. Closing more than once is a
+        no-op.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self.queue.put(self._SENTINEL)
+        self._drain()
+
+    def _overflow(self, message: str, level: LogLevel, force: bool = False) -> None:
+        """Applies the overflow policy to an entry that did not fit in the queue.
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below the wrapped handlers' ``min_level``
+        """
+        entry = (message, level, force)
+        if self.overflow is OverflowPolicy.block or (
+            self.overflow is OverflowPolicy.drop_below_level
+            and level >= self.overflow_level
+        ):
+            self.queue.put(entry)
+        elif self.overflow is OverflowPolicy.drop_oldest:
+            while True:
+                try:
+                    oldest = self.queue.get_nowait()
+                except queue.Empty:  # pragma: no cover
+                    pass
+                else:
+                    self.queue.task_done()
+                    if oldest is self._SENTINEL:
+                        # the handler is closing: the sentinel is put back, and the entry waits behind it to be drained
+                        self.queue.put(oldest)
+                        self.queue.put(entry)
+                        return
+                    self._count_drop(oldest[1])
+                try:
+                    self.queue.put_nowait(entry)
+                    return
+                except queue.Full:  # pragma: no cover
+                    continue
+        else:
+            self._count_drop(level)
+
+    def _count_drop(self, level: LogLevel) -> None:
+        """Records a dropped entry.
+
+        :param level: the priority level of the dropped entry
+        """
+        with self._counter_lock:
+            self.dropped += 1
+            self.dropped_by_level[level] += 1
+
+    def _drain(self) -> None:
+        """Waits for the listener thread to stop, then writes the entries left in the queue, which were queued behind
+        the sentinel while the handler was closing.
+        """
+        self._listener.join()
+        while True:
+            try:
+                message, level, force = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+            for handler in self.handlers:
+                try:
+                    if force:
+                        handler.write(message, level=level, force=True)
+                    else:
+                        handler.write(message, level=level)
+                except Exception:
+                    self.errors += 1
+
+    def _start_listener(self) -> None:
+        """Starts the listener thread.
+        """
+        self._listener = threading.Thread(
+            target=self._listen, name=f"logging2-{self.name}", daemon=True
+        )
+        self._listener.start()
+
+    def _after_fork(self) -> None:
+        """Discards the entries the parent had queued -- the parent writes those itself -- and gives the child its
+        own queue and listener thread. The wrapped handlers are reinitialized on their own.
+        """
+        super()._after_fork()
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._counter_lock = threading.Lock()
+        if not self._closed:
+            self._start_listener()
+
+    def _listen(self) -> None:
+        """Runs in the listener thread: writes queued entries to the wrapped handlers until the sentinel is received,
+        flushing the handlers whenever the queue runs empty.
+        """
+        entries = self.queue
+        while True:
+            entry = entries.get()
+            if entry is self._SENTINEL:
+                self._flush_handlers()
+                entries.task_done()
+                return
+
+            message, level, force = entry
+            for handler in self.handlers:
+                try:
+                    if force:
+                        handler.write(message, level=level, force=True)
+                    else:
+                        handler.write(message, level=level)
+                except Exception:
+                    self.errors += 1
+            if entries.empty():
+                self._flush_handlers()
+            entries.task_done()
+
+    def _flush_handlers(self) -> None:
+        """Flushes each of the wrapped handlers.
+        """
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                self.errors += 1
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `queue-{handler names}`
+        """
+        return "queue-{}".format(",".join(handler.name for handler in self.handlers))
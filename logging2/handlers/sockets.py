@@ -1,15 +1,33 @@
+import atexit
 import socket
 import syslog
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Mapping, Optional, Tuple, Union
 
+from logging2.formatters import SyslogFormatter
 from logging2.handlers.abc import Handler
-from logging2.levels import LogLevel
+from logging2.levels import SYSLOG_SEVERITIES, LogLevel
+from logging2.utils import FlushTimer
 
 
 class SocketHandler(Handler):
     """A generic ``Handler`` for writing messages to sockets.
+
+    Datagram sockets can pack entries: with a ``packet_size``, consecutive entries are joined, newline-delimited,
+    into datagrams of up to that many bytes, which are sent when the next entry wouldn't fit or ``linger`` seconds
+    after the first entry of the packet. Each packet is sent with a single scatter/gather ``sendmsg``, so joining the
+    entries doesn't copy them. An entry is never split across datagrams -- an entry longer than ``packet_size`` is
+    truncated to fit, on a character boundary and keeping its trailing new line, and counted in ``truncated``. Send
+    errors of packed datagrams are counted in ``errors`` rather than raised, as packets are usually sent from the
+    timer thread.
     """
 
+    ETHERNET_UDP_PAYLOAD: int = 1472  # a 1500 byte MTU, less the IPv4 and UDP headers
+    ETHERNET_UDP6_PAYLOAD: int = 1452  # a 1500 byte MTU, less the IPv6 and UDP headers
+    DEFAULT_LINGER: float = 0.05
+
     def __init__(
         self, name: Optional[str] = None, level: Optional[LogLevel] = None, **kwargs
     ):
@@ -22,42 +40,153 @@ class SocketHandler(Handler):
         :keyword encoding: the message encoding
         :keyword family: the socket family -- for example AF_UNIX or AF_INET
         :keyword type: the socket type -- for example SOCK_STREAM or SOCK_DGRAM
+        :keyword packet_size: for datagram sockets, pack entries into datagrams of up to this many bytes
+        :keyword linger: when packing, the maximum number of seconds an entry waits for others to join its packet
         """
         self.host: str = kwargs.get("host")
         self.port: str = kwargs.get("port")
         self.encoding: str = kwargs.get("encoding", "utf8")
         self.family: int = kwargs.get("family")
         self.type: int = kwargs.get("type")
+        self.packet_size: Optional[int] = kwargs.get("packet_size")
+        self.truncated: int = 0
+        self.errors: int = 0
+        if self.packet_size and self.type != socket.SOCK_DGRAM:
+            raise ValueError("Only datagram sockets can pack entries")
 
         super().__init__(name=name, level=level)
-
-        if self.port is not None and self.type != socket.SOCK_DGRAM:
-            sock = socket.create_connection((self.host, self.port))
-        else:
-            if self.port:
-                address = (self.host, self.port)
-            else:
-                address = self.host
-            if self.family and self.type:
-                sock = socket.socket(self.family, self.type)
-            elif self.type:  # pragma: no cover
-                sock = socket.socket(socket.AF_UNIX, self.type)
-                self.family = socket.AF_UNIX
-            else:  # pragma: no cover
-                sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-                self.family = socket.AF_UNIX
-                self.type = socket.SOCK_DGRAM
-            sock.connect(address)
-        self.socket: socket.socket = sock
-
-    def write(self, message: str, level: LogLevel) -> None:
+        self.socket: Optional[socket.socket] = self._connect()
+
+        if self.packet_size:
+            self._packet: List[bytes] = []
+            self._packet_bytes: int = 0
+            self._timer: FlushTimer = FlushTimer(
+                kwargs.get("linger") or self.DEFAULT_LINGER, self.flush
+            )
+            atexit.register(self.flush)
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
         """Writes the full log entry to the configured socket
 
         :param message: the entire message to be written, full formatted
         :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if message.__class__ is not bytes:
+                message = bytes(message, self.encoding)
+            if self.packet_size:
+                self._pack(message)
+                return
+            with self._lock:
+                if self.socket is None:
+                    self.socket = self._connect()
+                self.socket.sendall(message)
+
+    def flush(self) -> None:
+        """Sends the packet being packed, if there is one.
+        """
+        if self.packet_size:
+            with self._lock:
+                self._send_packet()
+
+    def close(self) -> None:
+        """Sends the packet being packed and closes the socket.
+        """
+        self.flush()
+        if self.packet_size:
+            atexit.unregister(self.flush)
+            self._timer.cancel()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def _pack(self, data: bytes) -> None:
+        """Adds an encoded entry to the packet being packed, sending the packet first if the entry doesn't fit.
+
+        :param data: the encoded entry
+        """
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        if len(data) > self.packet_size:
+            data = self._truncate(data)
+
+        with self._lock:
+            if self._packet_bytes + len(data) > self.packet_size:
+                self._send_packet()
+            self._packet.append(data)
+            self._packet_bytes += len(data)
+            if self._packet_bytes == self.packet_size:
+                self._send_packet()
+            else:
+                self._timer.arm()
+
+    def _truncate(self, data: bytes) -> bytes:
+        """Shortens an entry to ``packet_size`` bytes, without cutting a multi-byte character in two.
+
+        :param data: the encoded entry, ending in a new line
+        :returns: the truncated entry, ending in a new line
+        """
+        self.truncated += 1
+        end = self.packet_size - 1
+        if self.encoding.replace("-", "").lower() == "utf8":
+            while end and data[end] & 0xC0 == 0x80:  # a continuation byte
+                end -= 1
+        return data[:end] + b"\n"
+
+    def _send_packet(self) -> None:
+        """Sends the packed entries as a single datagram -- must be called with the lock held.
+        """
+        self._timer.cancel()
+        if not self._packet:
+            return
+        packet, self._packet, self._packet_bytes = self._packet, [], 0
+        try:
+            if self.socket is None:
+                self.socket = self._connect()
+            self.socket.sendmsg(packet)
+        except OSError:
+            self.errors += 1
+
+    def _connect(self) -> socket.socket:
+        """Opens a socket connected to the configured endpoint.
+
+        :returns: the connected socket
+        """
+        if self.port is not None and self.type != socket.SOCK_DGRAM:
+            return socket.create_connection((self.host, self.port))
+
+        if self.port:
+            address = (self.host, self.port)
+        else:
+            address = self.host
+        if self.family and self.type:
+            sock = socket.socket(self.family, self.type)
+        elif self.type:  # pragma: no cover
+            sock = socket.socket(socket.AF_UNIX, self.type)
+            self.family = socket.AF_UNIX
+        else:  # pragma: no cover
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.family = socket.AF_UNIX
+            self.type = socket.SOCK_DGRAM
+        sock.connect(address)
+        return sock
+
+    def _after_fork(self) -> None:
+        """Drops the child's copy of the parent's socket -- closing it leaves the parent's connection open -- and the
+        entries the parent was packing. The child connects on its own the first time it writes, so children that
+        never log don't connect at all.
         """
-        if level >= self.min_level:
-            self.socket.sendall(bytes(message, self.encoding))
+        super()._after_fork()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        if self.packet_size:
+            self._packet = []
+            self._packet_bytes = 0
+            self._timer = FlushTimer(self._timer.interval, self.flush)
 
     def _create_name(self) -> str:
         """Creates the name for the handler - called from ``__init__`` if a name is not given.
@@ -159,6 +288,8 @@ class UdpHandler(SocketHandler):
         encoding: Optional[str] = "utf8",
         name: Optional[str] = None,
         level: Optional[LogLevel] = None,
+        packet_size: Optional[int] = None,
+        linger: Optional[float] = None,
     ):
         """Instantiates a new ``UdpHandler``
 
@@ -167,6 +298,9 @@ class UdpHandler(SocketHandler):
         :param encoding: the message encoding
         :param name: the name of the handler
         :param level: the minimum verbosity level to write log entries
+        :param packet_size: pack entries into datagrams of up to this many bytes -- ``ETHERNET_UDP_PAYLOAD`` fits
+            an unfragmented datagram on ethernet
+        :param linger: when packing, the maximum number of seconds an entry waits for others to join its packet
         """
         super().__init__(
             name=name,
@@ -176,6 +310,8 @@ class UdpHandler(SocketHandler):
             family=socket.AF_INET,
             type=socket.SOCK_DGRAM,
             encoding=encoding,
+            packet_size=packet_size,
+            linger=linger,
         )
 
 
@@ -190,6 +326,8 @@ class UdpIPv6Handler(SocketHandler):
         encoding: Optional[str] = "utf8",
         name: Optional[str] = None,
         level: Optional[LogLevel] = None,
+        packet_size: Optional[int] = None,
+        linger: Optional[float] = None,
     ):
         """Instantiates a new ``UdpIPv6Handler``
 
@@ -198,6 +336,9 @@ class UdpIPv6Handler(SocketHandler):
         :param encoding: the message encoding
         :param name: the name of the handler
         :param level: the minimum verbosity level to write log entries
+        :param packet_size: pack entries into datagrams of up to this many bytes -- ``ETHERNET_UDP6_PAYLOAD``
+            fits an unfragmented datagram on ethernet
+        :param linger: when packing, the maximum number of seconds an entry waits for others to join its packet
         """
         super().__init__(
             name=name,
@@ -207,6 +348,8 @@ class UdpIPv6Handler(SocketHandler):
             family=socket.AF_INET6,
             type=socket.SOCK_DGRAM,
             encoding=encoding,
+            packet_size=packet_size,
+            linger=linger,
         )
 
 
@@ -220,6 +363,8 @@ class UnixSocketHandler(SocketHandler):
         encoding: Optional[str] = "utf8",
         name: Optional[str] = None,
         level: Optional[LogLevel] = None,
+        packet_size: Optional[int] = None,
+        linger: Optional[float] = None,
     ):
         """Instantiates a new ``UnixHandler``
 
@@ -227,6 +372,8 @@ class UnixSocketHandler(SocketHandler):
         :param encoding: the message encoding
         :param name: the name of the handler
         :param level: the minimum verbosity level to write log entries
+        :param packet_size: pack entries into datagrams of up to this many bytes
+        :param linger: when packing, the maximum number of seconds an entry waits for others to join its packet
         """
         super().__init__(
             name=name,
@@ -235,11 +382,17 @@ class UnixSocketHandler(SocketHandler):
             family=socket.AF_UNIX,
             type=socket.SOCK_DGRAM,
             encoding=encoding,
+            packet_size=packet_size,
+            linger=linger,
         )
 
 
 class SyslogHandler(SocketHandler):
-    """A ``SocketHandler`` preconfigured to send messages as datagrams to a syslog service
+    """A ``SocketHandler`` preconfigured to send messages to a syslog service
+
+    By default each entry is sent as a datagram of its priority and the entry itself. Given an ``rfc``, entries are
+    formatted as RFC 5424 or RFC 3164 messages by a ``SyslogFormatter`` instead. Over a stream transport -- a
+    ``socket_type`` of ``SOCK_STREAM`` -- messages are framed by octet counting.
     """
 
     def __init__(
@@ -250,6 +403,13 @@ class SyslogHandler(SocketHandler):
         encoding: Optional[str] = "utf8",
         name: Optional[str] = None,
         level: Optional[LogLevel] = None,
+        rfc: Optional[str] = None,
+        hostname: Optional[str] = None,
+        app_name: Optional[str] = None,
+        procid: Optional[str] = None,
+        msgid: Optional[str] = None,
+        structured_data: Optional[Mapping[str, Union[object, Callable]]] = None,
+        socket_type: Optional[int] = socket.SOCK_DGRAM,
     ):
         """Instantiates a new ``SyslogHandler``
 
@@ -259,28 +419,62 @@ class SyslogHandler(SocketHandler):
         :param encoding: the message encoding
         :param name: the name of the handler
         :param level: the minimum verbosity level to write log entries
+        :param rfc: format messages as ``SyslogFormatter.RFC5424`` or ``SyslogFormatter.RFC3164``
+        :param hostname: the HOSTNAME field of formatted messages -- defaults to the host's name
+        :param app_name: the APP-NAME field of formatted messages
+        :param procid: the PROCID field of formatted messages -- defaults to the process id
+        :param msgid: the MSGID field of RFC 5424 messages
+        :param structured_data: key-value pairs sent as RFC 5424 structured data, e.g. a logger's
+            ``additional_context``
+        :param socket_type: ``SOCK_DGRAM`` for UDP, or ``SOCK_STREAM`` for TCP with octet counting framing
         """
         self.facility = facility
+        self.formatter: Optional[SyslogFormatter] = None
+        if rfc or socket_type == socket.SOCK_STREAM:
+            self.formatter = SyslogFormatter(
+                facility=facility,
+                rfc=rfc or SyslogFormatter.RFC5424,
+                hostname=hostname,
+                app_name=app_name,
+                procid=procid,
+                msgid=msgid,
+                structured_data=structured_data,
+                octet_counting=socket_type == socket.SOCK_STREAM,
+                encoding=encoding,
+            )
+        self._prefixes: Tuple[str, ...] = tuple(
+            f"<{self._get_priority(level)}>" for level in LogLevel
+        )
         super().__init__(
             name=name,
             level=level,
             host=host,
             port=port,
             family=socket.AF_INET,
-            type=socket.SOCK_DGRAM,
+            type=socket_type,
             encoding=encoding,
         )
 
-    def write(self, message: str, level: LogLevel) -> None:
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
         """Writes the full log entry to the configured syslog endpoint
 
         :param message: the entire message to be written, full formatted
         :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
         """
-        if level >= self.min_level:
-            priority = self._get_priority(level)
-            message = f"<{priority}>{message}\000"
-            self.socket.sendall(bytes(message, self.encoding))
+        if force or level >= self.min_level:
+            if self.formatter is not None:
+                data = self.formatter.format(message, level)
+            elif message.__class__ is bytes:
+                data = b"%b%b\000" % (self._prefixes[level].encode(), message)
+            else:
+                data = bytes(f"{self._prefixes[level]}{message}\000", self.encoding)
+            with self._lock:
+                if self.socket is None:
+                    self.socket = self._connect()
+                self.socket.sendall(data)
 
     def _get_priority(self, level: LogLevel) -> int:
         """Gets the computed syslog priority value for the priority level
@@ -291,7 +485,7 @@ class SyslogHandler(SocketHandler):
         .. seealso:: https://tools.ietf.org/html/rfc5424
         .. seealso:: http://www.kiwisyslog.com/help/syslog/index.html?protocol_levels.htm
         """
-        priority = (self.facility * 8) + level.as_syslog
+        priority = self.facility | SYSLOG_SEVERITIES[level]
         return priority
 
     def _create_name(self) -> str:
@@ -300,3 +494,253 @@ class SyslogHandler(SocketHandler):
         :returns: the template `syslog-{facility}`
         """
         return f"syslog-{self.facility}"
+
+
+class ReconnectingTcpHandler(Handler):
+    """A ``Handler`` for TCP collectors that survives connection loss. ``write`` only appends the encoded entry to a
+    bounded spool; a background sender thread coalesces spooled entries into a single ``sendall`` once
+    ``batch_size`` bytes are waiting or ``linger`` seconds have passed since the first one. If the connection fails,
+    the sender reconnects with exponential backoff while new entries keep filling the spool -- when it is full the
+    oldest entries are dropped. A send that does not finish within ``send_timeout`` seconds -- a collector that stops
+    reading -- counts as a failure too. A batch that fails mid-send is sent again in full after reconnecting, so a
+    collector may see part of it twice.
+
+    ``bytes_sent``, ``reconnects`` and ``dropped`` count what happened on the link.
+    """
+
+    DEFAULT_BATCH_SIZE: int = 64 * 1024
+    DEFAULT_LINGER: float = 0.05
+    DEFAULT_SPOOL_SIZE: int = 10_000
+    DEFAULT_BACKOFF: float = 0.1
+    DEFAULT_MAX_BACKOFF: float = 30.0
+    DEFAULT_CONNECT_TIMEOUT: float = 5.0
+    DEFAULT_SEND_TIMEOUT: float = 10.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        encoding: Optional[str] = "utf8",
+        batch_size: Optional[int] = None,
+        linger: Optional[float] = None,
+        spool_size: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        send_timeout: Optional[float] = None,
+        name: Optional[str] = None,
+        level: Optional[LogLevel] = None,
+    ):
+        """Instantiates a new ``ReconnectingTcpHandler``
+
+        :param host: the server's hostname -- an FQDN, an IP address, anything that can be resolved
+        :param port: the server's port
+        :param encoding: the message encoding
+        :param batch_size: the number of spooled bytes that triggers a send without waiting for ``linger``
+        :param linger: the maximum number of seconds an entry waits for others to join its batch
+        :param spool_size: the maximum number of entries held while waiting to be sent
+        :param backoff: the number of seconds to wait before the first reconnection attempt
+        :param max_backoff: the maximum number of seconds between reconnection attempts
+        :param send_timeout: the maximum number of seconds a batch may take to send before the connection is dropped
+        :param name: the name of the handler
+        :param level: the minimum verbosity level to write log entries
+        """
+        self.host: str = host
+        self.port: int = port
+        self.encoding: str = encoding
+        self.batch_size: int = batch_size or self.DEFAULT_BATCH_SIZE
+        self.linger: float = self.DEFAULT_LINGER if linger is None else linger
+        self.backoff: float = backoff or self.DEFAULT_BACKOFF
+        self.max_backoff: float = max_backoff or self.DEFAULT_MAX_BACKOFF
+        self.send_timeout: float = send_timeout or self.DEFAULT_SEND_TIMEOUT
+        super().__init__(name=name, level=level)
+
+        self.bytes_sent: int = 0
+        self.reconnects: int = 0
+        self.dropped: int = 0
+
+        self.socket: Optional[socket.socket] = None
+        self._spool: Deque[bytes] = deque(maxlen=spool_size or self.DEFAULT_SPOOL_SIZE)
+        self._spool_bytes: int = 0
+        self._in_flight: Optional[List[bytes]] = None
+        self._failures: int = 0
+        self._connected_once: bool = False
+        self._delay: float = self.backoff
+        self._closing: bool = False
+        self._cond: threading.Condition = threading.Condition()
+        self._wakeup: threading.Event = threading.Event()
+        self._sender: threading.Thread = None
+        self._start_sender()
+        atexit.register(self.close)
+
+    @property
+    def connected(self) -> bool:
+        return self.socket is not None
+
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
+        """Spools the full log entry for the sender thread
+
+        :param message: the entire message to be written, full formatted
+        :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
+        """
+        if force or level >= self.min_level:
+            if message.__class__ is bytes:
+                data = message
+            else:
+                data = bytes(message, self.encoding)
+            with self._cond:
+                spool = self._spool
+                if len(spool) == spool.maxlen:
+                    self._spool_bytes -= len(spool[0])
+                    self.dropped += 1
+                spool.append(data)
+                self._spool_bytes += len(data)
+                if len(spool) == 1 or self._spool_bytes >= self.batch_size:
+                    self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Sends everything that is spooled right away and waits until it is sent, or until the next attempt to send
+        it fails.
+        """
+        with self._cond:
+            failures = self._failures
+            self._cond.notify_all()
+            self._wakeup.set()
+            while (
+                (self._spool or self._in_flight)
+                and self._failures == failures
+                and self._sender.is_alive()
+            ):
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Makes a last attempt to send everything that is spooled, then closes the connection and stops the sender
+        thread. Entries that could not be sent are counted as dropped. The wait is bounded by one connection attempt
+        and one send -- whatever is still spooled after that is dropped and the sender finishes on its own.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        atexit.unregister(self.close)
+        self._wakeup.set()
+        self._sender.join(self.DEFAULT_CONNECT_TIMEOUT + self.send_timeout)
+        if self._sender.is_alive():
+            # -- the sender counts its in-flight batch as dropped when its send fails
+            with self._cond:
+                self.dropped += len(self._spool)
+                self._spool.clear()
+                self._spool_bytes = 0
+                self._cond.notify_all()
+        elif self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def _start_sender(self) -> None:
+        """Starts the sender thread.
+        """
+        self._sender = threading.Thread(
+            target=self._run, name=f"logging2-{self.name}", daemon=True
+        )
+        self._sender.start()
+
+    def _after_fork(self) -> None:
+        """Discards the entries the parent had spooled -- the parent sends those itself -- and gives the child its
+        own connection and sender thread.
+        """
+        super()._after_fork()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        self._spool.clear()
+        self._spool_bytes = 0
+        self._in_flight = None
+        self._delay = self.backoff
+        self._cond = threading.Condition()
+        self._wakeup = threading.Event()
+        if not self._closing:
+            self._start_sender()
+
+    def _run(self) -> None:
+        """Runs in the sender thread: collects batches from the spool and sends them until the handler is closed.
+        """
+        while True:
+            with self._cond:
+                if self._in_flight is None:
+                    while not self._spool and not self._closing:
+                        self._cond.wait()
+                    if not self._spool:
+                        return
+                    if self._spool_bytes < self.batch_size and not self._closing:
+                        self._cond.wait(self.linger)
+                    self._in_flight = self._take_batch()
+                batch = self._in_flight
+
+            sent = self._send(b"".join(batch))
+            with self._cond:
+                if sent:
+                    self._in_flight = None
+                else:
+                    self._failures += 1
+                    if self._closing:
+                        self.dropped += len(self._in_flight) + len(self._spool)
+                        self._in_flight = None
+                        self._spool.clear()
+                        self._spool_bytes = 0
+                self._cond.notify_all()
+
+            if not sent and not self._closing:
+                self._wakeup.wait(self._delay)
+                self._wakeup.clear()
+                self._delay = min(self._delay * 2, self.max_backoff)
+
+    def _take_batch(self) -> List[bytes]:
+        """Removes up to ``batch_size`` bytes of entries from the spool -- must be called with the lock held.
+
+        :returns: the entries of the batch, in order
+        """
+        spool = self._spool
+        batch = [spool.popleft()]
+        size = len(batch[0])
+        while spool and size + len(spool[0]) <= self.batch_size:
+            data = spool.popleft()
+            batch.append(data)
+            size += len(data)
+        self._spool_bytes -= size
+        return batch
+
+    def _send(self, data: bytes) -> bool:
+        """Sends a batch, connecting first if needed. Any socket error, or a send that times out, drops the
+        connection.
+
+        :param data: the joined entries of the batch
+        :returns: whether the batch was sent
+        """
+        try:
+            if self.socket is None:
+                self.socket = socket.create_connection(
+                    (self.host, self.port), timeout=self.DEFAULT_CONNECT_TIMEOUT
+                )
+                self.socket.settimeout(self.send_timeout)
+                if self._connected_once:
+                    self.reconnects += 1
+                self._connected_once = True
+            self.socket.sendall(data)
+        except OSError:
+            if self.socket is not None:
+                self.socket.close()
+                self.socket = None
+            return False
+        self.bytes_sent += len(data)
+        self._delay = self.backoff
+        return True
+
+    def _create_name(self) -> str:
+        """Creates the name for the handler - called from ``__init__`` if a name is not given.
+
+        :returns: the template `TCP {host}:{port}`
+        """
+        return f"TCP {self.host}:{self.port}"
@@ -1,6 +1,6 @@
 from io import TextIOWrapper
 from sys import stderr, stdout
-from typing import Optional
+from typing import Optional, Union
 
 from logging2.handlers.abc import Handler
 from logging2.levels import LogLevel
@@ -25,14 +25,20 @@ class StreamingHandler(Handler):
         self.stream: TextIOWrapper = stream
         super().__init__(name=name, level=level)
 
-    def write(self, message: str, level: LogLevel) -> None:
+    def write(
+        self, message: Union[str, bytes], level: LogLevel, force: bool = False
+    ) -> None:
         """Writes the full log entry to a configured stream
 
         :param message: the entire message to be written, full formatted
         :param level: the priority level of the message
+        :param force: write the entry even if it is below ``min_level``
         """
-        if level >= self.min_level:
-            self.stream.write(message)
+        if force or level >= self.min_level:
+            if message.__class__ is bytes:
+                message = message.decode("utf8")
+            with self._lock:
+                self.stream.write(message)
 
     def _create_name(self) -> str:
         """Creates the name for the handler - called from ``__init__`` if a name is not given.
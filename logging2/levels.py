@@ -1,9 +1,13 @@
 import syslog
-from enum import Enum
+from enum import IntEnum
+from typing import Tuple
 
 
-class LogLevel(Enum):
+class LogLevel(IntEnum):
     """A workflow control construct that enables setting a minimum level of verbosity for log entries.
+
+    Levels are integers, so comparing and hashing them runs at C speed and they can be used as dictionary keys or to
+    index the precomputed ``UPPER_NAMES``, ``PADDED_NAMES`` and ``SYSLOG_SEVERITIES`` tables.
     """
 
     debug: int = 0
@@ -17,47 +21,22 @@ class LogLevel(Enum):
 
         :returns: the name of the level in upper case
         """
-        return self.name.upper()
-
-    def __lt__(self, other: "LogLevel") -> bool:
-        """Checks if this ``LogLevel`` is less than another
-
-        :param other: the other level to test against
-        :returns: is this level is less than the other
-        """
-        return self.value < other.value
-
-    def __le__(self, other: "LogLevel") -> bool:
-        """Checks if this ``LogLevel`` is less than or equal to another
-
-        :param other: the other level to test against
-        :returns: is this level is less than or equal to the other
-        """
-        return self.value <= other.value
+        return UPPER_NAMES[self]
 
-    def __eq__(self, other: "LogLevel") -> bool:
-        """Checks if this ``LogLevel`` is equal to another
+    def __format__(self, format_spec: str) -> str:
+        """Formats the upper case name of the level, so ``{level}`` in a template renders the same as ``str(level)``
 
-        :param other: the other level to test against
-        :returns: is this level is equal to the other
+        :param format_spec: the format spec, applied to the name
+        :returns: the formatted name of the level
         """
-        return self.value == other.value
+        return UPPER_NAMES[self].__format__(format_spec)
 
-    def __ge__(self, other: "LogLevel") -> bool:
-        """Checks if this ``LogLevel`` is greater than or equal to another
+    def __bool__(self) -> bool:
+        """Levels are always truthy -- ``debug`` is ``0``, but ``level or default`` should still pick ``debug``.
 
-        :param other: the other level to test against
-        :returns: is this level is greater than or equal to the other
+        :returns: ``True``
         """
-        return self.value >= other.value
-
-    def __gt__(self, other: "LogLevel") -> bool:
-        """Checks if this ``LogLevel`` is greater than another
-
-        :param other: the other level to test against
-        :returns: is this level is greater than the other
-        """
-        return self.value > other.value
+        return True
 
     @property
     def as_syslog(self) -> int:
@@ -65,11 +44,19 @@ class LogLevel(Enum):
 
         :returns: the corresponding Syslog value
         """
-        if self == LogLevel.debug:
-            return syslog.LOG_DEBUG
-        elif self == LogLevel.info:
-            return syslog.LOG_INFO
-        elif self == LogLevel.warning:
-            return syslog.LOG_WARNING
-        else:
-            return syslog.LOG_ERR
+        return SYSLOG_SEVERITIES[self]
+
+
+UPPER_NAMES: Tuple[str, ...] = tuple(level.name.upper() for level in LogLevel)
+
+PADDED_NAMES: Tuple[str, ...] = tuple(
+    name.ljust(max(map(len, UPPER_NAMES))) for name in UPPER_NAMES
+)
+
+SYSLOG_SEVERITIES: Tuple[int, ...] = (
+    syslog.LOG_DEBUG,
+    syslog.LOG_INFO,
+    syslog.LOG_WARNING,
+    syslog.LOG_ERR,
+    syslog.LOG_ERR,
+)
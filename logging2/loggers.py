@@ -1,23 +1,40 @@
 import inspect
 import os
-import re
 import sys
-import traceback
-from datetime import datetime, tzinfo
+from datetime import tzinfo
 from datetime import timezone as _tz
-from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+from string import Formatter
+from time import perf_counter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from logging2 import LogRegister
+from logging2.encoders import JsonEncoder
+from logging2.filters import Filter
 from logging2.handlers.abc import Handler
+from logging2.handlers.aio import AsyncHandler
 from logging2.handlers.streaming import StdOutHandler
 from logging2.levels import LogLevel
+from logging2.stats import (
+    BYTES,
+    EMITTED,
+    ERRORS,
+    FILTERED,
+    LATENCY,
+    LOGGER_COUNTERS,
+    LOGGER_HISTOGRAMS,
+    SUPPRESSED,
+    Stats,
+)
+from logging2.templates import Template
+from logging2.timestamps import TimestampProvider, get_timestamp_provider
+from logging2.tracebacks import ExcInfo, TracebackRenderer
+from logging2.utils import FlushTimer, get_code_info, get_pid
 
 
 class Logger:
     """`A ``Logger`` is the main interface to passing user messages and assembling metadata for log entries.
     """
 
-    TEMPLATE_KEYS_REGEX = re.compile("\{(?P<key>\w+)\}")
     BASE_TEMPLATE_KEYS = {
         "timestamp",
         "level",
@@ -31,8 +48,11 @@ class Logger:
 
     DEFAULT_TEMPLATE: str = "{timestamp} {level} {name}: {message}"
     DEFAULT_TIMEZONE: tzinfo = _tz.utc
+    DEFAULT_TIMESTAMP_PRECISION: str = "us"
     DEFAULT_HANDLER_CLASS: type = StdOutHandler
     DEFAULT_LOG_LEVEL: LogLevel = LogLevel.info
+    DEFAULT_FILTER_SUMMARY_INTERVAL: float = 60.0
+    DEFAULT_TRACEBACK_RENDERER: TracebackRenderer = TracebackRenderer()
 
     def __init__(
         self,
@@ -44,6 +64,14 @@ class Logger:
         handler: Optional[Handler] = None,
         handlers: Optional[Iterable[Handler]] = None,
         level: Optional[LogLevel] = None,
+        structured: Optional[bool] = False,
+        timestamp_precision: Optional[str] = None,
+        epoch_timestamps: Optional[bool] = False,
+        filters: Optional[Iterable[Filter]] = None,
+        filter_summary_interval: Optional[float] = None,
+        propagate: Optional[bool] = True,
+        traceback_renderer: Optional[TracebackRenderer] = None,
+        instrumented: Optional[bool] = False,
     ):
         """Instantiates a new ``Logger``
 
@@ -51,30 +79,73 @@ class Logger:
         :param template: the template used to create log entries
         :param ensure_new_line: should the log entry always end with a new line character
         :param timezone: timezone for ISO 8601 timestamp formatting
-        :param additional_context: key-value pairs used to provide context to template interpolation
+        :param additional_context: key-value pairs used to provide context to template interpolation -- merged over
+            the context of the logger's ancestors
         :param handler: a handler to be registered to this logger
         :param handlers: a group of handlers to be registered to this logger
-        :param level: sets the log level for the default handler
+        :param level: the minimum level of the entries this logger and its descendants log, also given to the default
+            handler -- by default the level is inherited from the closest ancestor that sets one
+        :param structured: emit each entry as a JSON object encoded to bytes instead of rendering the template -- the
+            template's keys lead the object, followed by the additional and per-call context
+        :param timestamp_precision: the precision of the timestamps -- one of ``s``, ``ms`` or ``us``
+        :param epoch_timestamps: use the number of seconds since the epoch as timestamps instead of ISO 8601
+        :param filters: filters that decide, before an entry is formatted, whether it is logged
+        :param filter_summary_interval: the number of seconds between the summary entries reporting how many entries
+            the filters suppressed
+        :param propagate: should entries also be written to the handlers of the logger's ancestors
+        :param traceback_renderer: renders the tracebacks of logged exceptions -- by default one shared by every
+            logger, which renders them like ``traceback.format_exc``
+        :param instrumented: keep stats of the entries logged and of the handlers' writes -- see ``stats``
         """
         if name not in LogRegister:
             self.name: str = name
             self.ensure_new_line: bool = ensure_new_line
-            self.timezone: tzinfo = timezone or self.DEFAULT_TIMEZONE
-            self.additional_context: Optional[
-                Dict[str, Union[object, Callable]]
-            ] = additional_context or {}
-
-            self._level: LogLevel = level
-            self._template: str = None
-            self._keys: Set[str] = None
+            self.structured: bool = structured
+            self.traceback_renderer: TracebackRenderer = (
+                traceback_renderer or self.DEFAULT_TRACEBACK_RENDERER
+            )
+            self._timestamp_precision: str = (
+                timestamp_precision or self.DEFAULT_TIMESTAMP_PRECISION
+            )
+            self._epoch_timestamps: bool = epoch_timestamps
+            self._timestamps: TimestampProvider = None
+            self.timezone = timezone or self.DEFAULT_TIMEZONE
+            self._additional_context: Dict[str, Union[object, Callable]] = (
+                additional_context or {}
+            )
+            self._propagate: bool = propagate
+            self._stats: Optional[Stats] = None
+            if instrumented:
+                self._stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+
+            self._level: Optional[LogLevel] = level
+            self._min_level: LogLevel = level or self.DEFAULT_LOG_LEVEL
+            self._template: Template = None
+            self._render: Callable[[Dict[str, object]], Union[str, bytes]] = None
             self._setup_template(template=template or self.DEFAULT_TEMPLATE)
 
+            # ``_handlers`` holds the logger's own handlers. It is replaced, never mutated, under the register's lock,
+            # which also recomputes the cached effective configuration: ``_dispatch`` (the own and inherited handlers),
+            # ``_effective_level``, ``_min_level`` and ``_inherited_context``. Logging calls read whichever snapshot
+            # they find, without taking any lock.
             self._handlers: Dict[str, Handler] = {}
-            if handler:
-                self.add_handler(handler)
-            if handlers:
-                for handler in handlers:
-                    self.add_handler(handler)
+            for new_handler in ([handler] if handler else []) + list(handlers or ()):
+                if new_handler.name not in self._handlers:
+                    self._handlers[new_handler.name] = new_handler
+                    new_handler._loggers.add(self)
+            self._dispatch: Tuple[Handler, ...] = ()
+            self._effective_level: Optional[LogLevel] = level
+            # set within a subtree whose level was changed with ``LogRegister.set_level``
+            self._overridden: bool = False
+            # the ancestors' ``additional_context`` dicts themselves, closest first, so in-place changes reach it
+            self._inherited_context: Tuple[Dict[str, Union[object, Callable]], ...] = ()
+
+            # like the handlers, ``_filters`` is replaced rather than mutated
+            self._filters: Tuple[Filter, ...] = tuple(filters or ())
+            self._summary_timer: FlushTimer = FlushTimer(
+                filter_summary_interval or self.DEFAULT_FILTER_SUMMARY_INTERVAL,
+                self._summarize_filters,
+            )
 
             LogRegister.register_logger(self)
 
@@ -82,160 +153,590 @@ class Logger:
             registered = LogRegister.get_logger(name=name)
             self.__dict__ = registered.__dict__
 
+    @property
+    def timezone(self) -> tzinfo:
+        return self._timestamps.timezone
+
+    @timezone.setter
+    def timezone(self, new_timezone: tzinfo) -> None:
+        self._timestamps = get_timestamp_provider(
+            new_timezone,
+            precision=self._timestamp_precision,
+            epoch=self._epoch_timestamps,
+        )
+
     @property
     def template(self) -> str:
-        return self._template
+        return self._template.template
 
     @template.setter
     def template(self, new_template: str) -> None:
         self._setup_template(template=new_template)
 
     @property
-    def keys(self) -> Set[str]:
-        return self._keys
+    def keys(self) -> FrozenSet[str]:
+        return self._template.keys
+
+    @property
+    def level(self) -> Optional[LogLevel]:
+        return self._level
+
+    @level.setter
+    def level(self, new_level: Optional[LogLevel]) -> None:
+        """Sets the level of the logger and of the descendants that don't set their own -- ``None`` inherits the
+        level of the closest ancestor that sets one.
+
+        :param new_level: the new minimum level of verbosity/priority
+        """
+        with LogRegister._lock:
+            self._level = new_level
+            self._refresh_subtree()
+
+    @property
+    def additional_context(self) -> Dict[str, Union[object, Callable]]:
+        return self._additional_context
+
+    @additional_context.setter
+    def additional_context(
+        self, new_context: Dict[str, Union[object, Callable]]
+    ) -> None:
+        """Replaces the additional context of the logger, which its descendants inherit. Changing the dict in place
+        reaches them too, since they keep a reference to it rather than a copy.
+
+        :param new_context: the new key-value pairs
+        """
+        with LogRegister._lock:
+            self._additional_context = new_context or {}
+            self._refresh_subtree()
+
+    @property
+    def propagate(self) -> bool:
+        return self._propagate
+
+    @propagate.setter
+    def propagate(self, propagate: bool) -> None:
+        """Sets whether entries are also written to the handlers of the logger's ancestors.
+
+        :param propagate: should the ancestors' handlers be used
+        """
+        with LogRegister._lock:
+            self._propagate = propagate
+            self._refresh_subtree()
 
     @property
     def handlers(self) -> List[Handler]:
-        return [handler for handler in self._handlers.values()]
+        return list(self._dispatch)
+
+    @property
+    def instrumented(self) -> bool:
+        return self._stats is not None
+
+    @instrumented.setter
+    def instrumented(self, instrumented: bool) -> None:
+        """Turns the stats on or off -- turning them off drops them.
+
+        :param instrumented: should stats be kept
+        """
+        if not instrumented:
+            self._stats = None
+        elif self._stats is None:
+            self._stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+
+    def stats(self) -> Optional[Dict[str, object]]:
+        """Gets the stats of an instrumented logger: how many entries were ``emitted`` to the handlers, ``filtered``
+        below the minimum level and ``suppressed`` by the filters, the UTF-8 ``bytes`` of the emitted entries, the
+        entries whose handlers raised ``errors``, and a ``log_seconds`` histogram of the time spent assembling and
+        writing the emitted entries. The stats of the handlers it wrote to are under ``handlers``, by name -- see
+        ``Handler.stats``.
+
+        :returns: the counters and histograms -- ``None`` if the logger isn't instrumented
+        """
+        if self._stats is None:
+            return None
+        stats = self._stats.snapshot()
+        stats["handlers"] = {
+            handler.name: handler.stats()
+            for handler in self._dispatch
+            if handler._stats is not None
+        }
+        return stats
 
     def add_handler(self, handler: Handler) -> None:
         """Adds a new ``Handler`` to the list of handlers.
 
         :param handler: the new handler
         """
-        name = handler.name
-        if name not in self._handlers:
-            self._handlers[name] = handler
+        with LogRegister._lock:
+            if handler.name in self._handlers:
+                return
+            handlers = dict(self._handlers)
+            handlers[handler.name] = handler
+            handler._loggers.add(LogRegister.get_logger(self.name) or self)
+            self._handlers = handlers
+            self._refresh_subtree()
 
     def remove_handler(self, name: str) -> None:
         """Removes a ``Handler`` from the list of handlers.
 
         :param name: the name of the handler to be removed
         """
-        if name in self._handlers:
-            del self._handlers[name]
+        with LogRegister._lock:
+            if name not in self._handlers:
+                return
+            handlers = dict(self._handlers)
+            handler = handlers.pop(name)
+            handler._loggers.discard(LogRegister.get_logger(self.name) or self)
+            self._handlers = handlers
+            self._refresh_subtree()
+
+    @property
+    def filters(self) -> List[Filter]:
+        return list(self._filters)
+
+    def add_filter(self, entry_filter: Filter) -> None:
+        """Adds a new ``Filter`` after the existing ones.
 
-    def debug(self, message: str, **context) -> None:
+        :param entry_filter: the new filter
+        """
+        with LogRegister._lock:
+            if entry_filter.name not in (f.name for f in self._filters):
+                self._filters = self._filters + (entry_filter,)
+
+    def remove_filter(self, name: str) -> None:
+        """Removes a ``Filter``.
+
+        :param name: the name of the filter to be removed
+        """
+        with LogRegister._lock:
+            self._filters = tuple(f for f in self._filters if f.name != name)
+
+    def debug(self, message: Union[str, Callable[[], str]], **context) -> None:
         """Calls each registered ``Handler``'s ``write`` method to produce a debug log entry.
 
-        :param message: the user message to be written
-        :param context: additional key-value pairs to override template context during interpolation
+        :param message: the user message to be written, or a function returning it
+        :param context: additional key-value pairs to override template context during interpolation, which the
+            message is formatted with
         """
         self._log(message=message, level=LogLevel.debug, **context)
 
-    def info(self, message: str, **context) -> None:
+    def info(self, message: Union[str, Callable[[], str]], **context) -> None:
         """Calls each registered ``Handler``'s ``write`` method to produce an info log entry.
 
-        :param message: the user message to be written
-        :param context: additional key-value pairs to override template context during interpolation
+        :param message: the user message to be written, or a function returning it
+        :param context: additional key-value pairs to override template context during interpolation, which the
+            message is formatted with
         """
         self._log(message=message, level=LogLevel.info, **context)
 
-    def warning(self, message: str, **context) -> None:
+    def warning(self, message: Union[str, Callable[[], str]], **context) -> None:
         """Calls each registered ``Handler``'s ``write`` method to produce a warning log entry.
 
-        :param message: the user message to be written
-        :param context: additional key-value pairs to override template context during interpolation
+        :param message: the user message to be written, or a function returning it
+        :param context: additional key-value pairs to override template context during interpolation, which the
+            message is formatted with
         """
         self._log(message=message, level=LogLevel.warning, **context)
 
-    def error(self, message: str, **context) -> None:
+    def error(
+        self,
+        message: Union[str, Callable[[], str]],
+        exc_info: Optional[ExcInfo] = None,
+        **context,
+    ) -> None:
         """Calls each registered ``Handler``'s ``write`` method to produce an error log entry.
 
-        :param message: the user message to be written
-        :param context: additional key-value pairs to override template context during interpolation
+        :param message: the user message to be written, or a function returning it
+        :param exc_info: an exception, or ``(type, value, traceback)`` tuple, whose traceback is added to the entry --
+            ``True`` adds the exception being handled
+        :param context: additional key-value pairs to override template context during interpolation, which the
+            message is formatted with
         """
-        self._log(message=message, level=LogLevel.error, **context)
+        self._log(
+            message=message,
+            level=LogLevel.error,
+            capture_error=False if exc_info is None else exc_info,
+            **context,
+        )
 
-    def exception(self, message: str, **context) -> None:
+    def exception(
+        self,
+        message: Union[str, Callable[[], str]],
+        exc_info: Optional[ExcInfo] = None,
+        **context,
+    ) -> None:
         """Calls each registered ``Handler``'s ``write`` method to produce an exception log entry.
 
-        :param message: the user message to be written
-        :param context: additional key-value pairs to override template context during interpolation
+        :param message: the user message to be written, or a function returning it
+        :param exc_info: an exception, or ``(type, value, traceback)`` tuple, whose traceback is added to the entry --
+            by default, the exception being handled
+        :param context: additional key-value pairs to override template context during interpolation, which the
+            message is formatted with
         """
         self._log(
-            message=message, level=LogLevel.exception, capture_error=True, **context
+            message=message,
+            level=LogLevel.exception,
+            capture_error=True if exc_info is None else exc_info,
+            **context,
         )
 
     def _log(
-        self, message: str, level: LogLevel, capture_error: bool = False, **context
+        self,
+        message: Union[str, Callable[[], str]],
+        level: LogLevel,
+        capture_error: ExcInfo = False,
+        **context,
     ) -> None:
         """Performs all information retrieval, does template interpolation and calls the handlers to write the message.
 
-        :param message: the ``{message}`` portion of the log entry
+        :param message: the ``{message}`` portion of the log entry, or a function returning it
         :param level: the verbosity/priority level of the message
-        :param capture_error: should the calling frame be inspected for any errors
+        :param capture_error: the exception whose traceback is added to the entry, or ``True`` for the exception being
+            handled
         :param context: key-value pairs to override template context during interpolation
         """
-        if not len(self._handlers):
-            default_handler = self.DEFAULT_HANDLER_CLASS(
-                level=self._level or self.DEFAULT_LOG_LEVEL
-            )
-            self.add_handler(default_handler)
+        if level < self._min_level:
+            if self._stats is not None:
+                self._stats.shard().counts[FILTERED] += 1
+            return
+
+        if self._filters:
+            frame = sys._getframe(2)
+            site = (frame.f_code, frame.f_lineno)
+            for entry_filter in self._filters:
+                if not entry_filter.filter(level, site):
+                    if self._stats is not None:
+                        self._stats.shard().counts[SUPPRESSED] += 1
+                    self._summary_timer.arm()
+                    return
+
+        # the instrumented path is inlined rather than wrapped, so the frame depths above hold for both
+        stats = self._stats
+        if stats is None:
+            self._emit(message, level, capture_error, context)
+            return
+
+        shard = stats.shard()
+        start = perf_counter()
+        try:
+            self._emit(message, level, capture_error, context)
+        except Exception:
+            shard.counts[ERRORS] += 1
+            raise
+        shard.observe(LATENCY, perf_counter() - start)
+        shard.counts[EMITTED] += 1
+
+    def _emit(
+        self,
+        message: Union[str, Callable[[], str]],
+        level: LogLevel,
+        capture_error: ExcInfo,
+        context: dict,
+    ) -> None:
+        """Assembles the log entry and calls the handlers to write it.
+
+        :param message: the ``{message}`` portion of the log entry, or a function returning it
+        :param level: the verbosity/priority level of the message
+        :param capture_error: the exception whose traceback is added to the entry, or ``True`` for the exception being
+            handled
+        :param context: key-value pairs to override template context during interpolation
+        """
+        if not self._dispatch:
+            self._add_default_handler()
+
+        # the per-call context dict is private to this call, so it doubles as the render params: per-call values
+        # take precedence over ``additional_context``, then over the context inherited from the ancestors, which
+        # take precedence over the builtin keys. Functions are only called when the template references their key --
+        # structured entries reference every key.
+        params = context
+        format_message = bool(params)
+        for key, value in self._additional_context.items():
+            if key not in params:
+                params[key] = value
+        for inherited in self._inherited_context:
+            for key, value in inherited.items():
+                if key not in params:
+                    params[key] = value
+
+        referenced = None if self.structured else self._template.keys
+        for key, value in params.items():
+            if inspect.isfunction(value) and (referenced is None or key in referenced):
+                params[key] = value()
 
-        if self.ensure_new_line and not message.endswith("\n"):
-            message = f"{message}\n"
+        params.setdefault("level", level)
+        params.setdefault("name", self.name)
 
-        params = {"message": message, "level": level, "name": self.name}
+        if message.__class__ is not str and callable(message):
+            message = message()
+        if format_message and "{" in message:
+            message = _format_message(message, params)
 
-        if "timestamp" in self.keys:
-            params["timestamp"] = self._get_timestamp()
+        if self.structured:
+            if capture_error:
+                tb = self.traceback_renderer.render(capture_error)
+                message = "{}\n{}".format(message, tb.rstrip("\n"))
+        else:
+            if self.ensure_new_line and not message.endswith("\n"):
+                message = f"{message}\n"
 
-        if {"source", "line", "function", "process"} & self.keys:
-            exec_info = self._get_exec_info()
-            params.update(exec_info)
+            if capture_error:
+                tb = self.traceback_renderer.render(capture_error)
+                message = "{}{}\n".format(message, tb)
 
-        if capture_error:
-            tb = traceback.format_exc()
-            params["message"] = "{}{}\n".format(message, tb)
+        params.setdefault("message", message)
 
-        for key, value in self.additional_context.items():
-            if inspect.isfunction(value):
-                params[key] = value()
-            else:
-                params[key] = value
+        template = self._template
+        if template.uses_timestamp and "timestamp" not in params:
+            params["timestamp"] = self._get_timestamp()
 
-        for key, value in context.items():
-            if inspect.isfunction(value):
-                params[key] = value()
+        if template.uses_exec_info:
+            for key, value in self._get_exec_info().items():
+                params.setdefault(key, value)
+
+        output = self._render(params)
+        stats = self._stats
+        if stats is None:
+            if self._overridden:
+                # the subtree's level was set with ``LogRegister.set_level``, which the handlers' levels don't gate
+                for handler in self._dispatch:
+                    if level < handler.min_level:
+                        handler.write(output, level=level, force=True)
+                    else:
+                        handler.write(output, level=level)
             else:
-                params[key] = value
+                for handler in self._dispatch:
+                    handler.write(output, level=level)
+        else:
+            self._write_instrumented(output, level, stats)
+
+    def _write_instrumented(
+        self, output: Union[str, bytes], level: LogLevel, stats: Stats
+    ) -> None:
+        """Calls the handlers to write an entry, counting it and timing each ``write``.
 
-        output = self.template.format(**params)
-        for handler in self._handlers.values():
-            handler.write(output, level=level)
+        :param output: the rendered entry
+        :param level: the verbosity/priority level of the entry
+        :param stats: the logger's stats
+        """
+        if output.__class__ is bytes or output.isascii():
+            size = len(output)
+        else:
+            size = len(output.encode("utf8"))
+        stats.shard().counts[BYTES] += size
+        overridden = self._overridden
+        for handler in self._dispatch:
+            shard = (handler._stats or handler._instrument()).shard()
+            force = False
+            if level < handler.min_level:
+                if not overridden:
+                    shard.counts[FILTERED] += 1
+                    handler.write(output, level=level)
+                    continue
+                force = True
+            start = perf_counter()
+            try:
+                if force:
+                    handler.write(output, level=level, force=True)
+                else:
+                    handler.write(output, level=level)
+            except Exception:
+                shard.counts[ERRORS] += 1
+                raise
+            shard.observe(LATENCY, perf_counter() - start)
+            shard.counts[EMITTED] += 1
+            shard.counts[BYTES] += size
+
+    def _add_default_handler(self) -> None:
+        """Creates the default handler on the top-most ancestor the logger propagates to, so that its other
+        descendants share it rather than each creating their own -- called when the logger has no handlers to write
+        an entry to. If another thread got there first, ``add_handler`` ignores the second one by its name.
+        """
+        owner = self
+        while owner._propagate:
+            parent = LogRegister.get_parent(owner.name)
+            if parent is None:
+                break
+            owner = parent
+        owner.add_handler(
+            self.DEFAULT_HANDLER_CLASS(
+                level=self._effective_level or self.DEFAULT_LOG_LEVEL
+            )
+        )
+
+    def _summarize_filters(self) -> None:
+        """Logs a warning entry reporting how many entries each filter suppressed since the last summary -- called
+        from the summary timer, armed when an entry is suppressed. Summaries themselves are never filtered.
+        """
+        counts = [(f.name, f.take_unreported()) for f in self._filters]
+        details = ", ".join(f"{count} by {name}" for name, count in counts if count)
+        if details:
+            total = sum(count for _, count in counts)
+            self._emit(
+                f"Suppressed {total} log entries: {details}", LogLevel.warning, False, {}
+            )
+
+    def _refresh_subtree(self) -> None:
+        """Recomputes the cached effective configuration of the logger and its descendants -- called whenever its
+        handlers, level or context change, and by its handlers when their level changes.
+        """
+        LogRegister.refresh(self.name)
+
+    def _refresh(self) -> None:
+        """Recomputes the cached effective configuration from the logger's own and that of its closest registered
+        ancestor, which is already up to date -- called by ``LogRegister.refresh`` with its lock held.
+
+        The effective handlers are the logger's own followed by those of its ancestors, if it propagates -- an
+        ancestor's handler is skipped when one with the same name is already there, as ``add_handler`` does. The
+        effective level is its own level or else the inherited one. The minimum level is the lowest level any of the
+        effective handlers will accept, raised to the effective level. Without handlers, it is the level the lazily
+        created default handler will be given. In a subtree whose level was set with ``LogRegister.set_level``, the
+        minimum level is the effective level, whatever the handlers accept.
+        """
+        parent = LogRegister.get_parent(self.name)
+        dispatch = tuple(self._handlers.values())
+        level = self._level
+        overridden = level is not None and self.name in LogRegister._changes
+        if parent is None:
+            self._inherited_context = ()
+        else:
+            overridden = overridden or parent._overridden
+            if self._propagate:
+                names = set(self._handlers)
+                dispatch += tuple(h for h in parent._dispatch if h.name not in names)
+            if level is None:
+                level = parent._effective_level
+            self._inherited_context = (
+                parent._additional_context,
+            ) + parent._inherited_context
+        self._dispatch = dispatch
+        self._effective_level = level
+        self._overridden = overridden
+
+        if overridden:
+            min_level = level
+        elif dispatch:
+            min_level = min(handler.min_level for handler in dispatch)
+            if level is not None:
+                min_level = max(min_level, level)
+        else:
+            min_level = level or self.DEFAULT_LOG_LEVEL
+        self._min_level = min_level
 
     def _setup_template(self, template: str) -> None:
-        """Sets up the ``_template`` and ``_keys`` attributes based on the input template.
+        """Compiles the input template and sets it up as the ``_template`` attribute, along with the ``_render``
+        function that produces entries from it.
 
         :param template: the template to be parsed
         """
-        keys = self.TEMPLATE_KEYS_REGEX.findall(template)
-        if not keys:
-            raise ValueError(f"No keys found in template `{template}`")
-        self._template = template
-        self._keys = set(keys)
+        self._template = Template(template)
+        if self.structured:
+            keys = (field.key for field in self._template.fields)
+            encoder = JsonEncoder(keys, ensure_new_line=self.ensure_new_line)
+            self._render = encoder.encode
+        else:
+            self._render = self._template.render
 
-    def _get_timestamp(self) -> str:
-        """Gets the ISO 8601 formatted timestamp for the current time.
+    def _get_timestamp(self) -> Union[str, int, float]:
+        """Gets the timestamp for the current time. The date, time and UTC offset are only formatted once per second
+        and shared by every logger using the same timezone -- see ``TimestampProvider``.
 
-        :returns: the ISO 8601 formatted timestamp for the current time
+        :returns: the ISO 8601 formatted timestamp, or the seconds since the epoch, for the current time
         """
-        return datetime.now(self.timezone).isoformat()
+        return self._timestamps.now()
 
     @staticmethod
     def _get_exec_info() -> dict:
-        """Gets the execution information of the calling stack.
+        """Gets the execution information of the calling stack. This only reads attributes of the calling frame and
+        its code object -- source files are never read.
 
         :returns: a dictionary to be used for interpolating execution information into log entries
         """
-        frame = sys._getframe(3)
-        fname, line, func, _, __ = inspect.getframeinfo(frame)
-        if func == "<module>":
-            func = "__main__"  # pragma: no cover
+        frame = sys._getframe(4)
+        source, function = get_code_info(frame.f_code)
         return {
-            "source": fname,
-            "function": func,
-            "line": line,
-            "process": os.getpid(),
+            "source": source,
+            "function": function,
+            "line": frame.f_lineno,
+            "process": get_pid(),
         }
+
+
+class _LazyContext:
+    """A read-only view of an entry's values for formatting its message, which calls the functions the message
+    references.
+    """
+
+    __slots__ = ("params",)
+
+    def __init__(self, params: Dict[str, object]):
+        self.params: Dict[str, object] = params
+
+    def __getitem__(self, key: str) -> object:
+        value = self.params[key]
+        return value() if inspect.isfunction(value) else value
+
+
+_FORMATTER = Formatter()
+
+
+def _format_message(message: str, params: Dict[str, object]) -> str:
+    """Formats a message with the values of its entry, e.g. ``user {user} logged in``. Only plain keys are looked up
+    -- a message with attribute or index lookups such as ``{user.password}`` or ``{users[0]}`` is logged as it is,
+    as is a message that can't be formatted with the values for any other reason, such as a JSON document.
+
+    :param message: the message, in ``str.format`` syntax
+    :param params: the entry's values
+    :returns: the formatted message
+    """
+    try:
+        for _, field, _, _ in _FORMATTER.parse(message):
+            if field is not None and ("." in field or "[" in field):
+                return message
+        return message.format_map(_LazyContext(params))
+    except Exception:
+        return message
+
+
+def _after_fork_in_child() -> None:  # pragma: no cover
+    """Reinitializes the register, and replaces the filters' locks and summary timer of every logger, which another
+    thread of the parent may have been holding when the process forked, and its stats -- registered to run in the
+    child after every ``os.fork``. Handlers reinitialize themselves.
+    """
+    LogRegister._after_fork()
+    for logger in LogRegister.get_loggers():
+        if logger._stats is not None:
+            logger._stats._after_fork()
+        logger._summary_timer = FlushTimer(
+            logger._summary_timer.interval, logger._summarize_filters
+        )
+        for entry_filter in logger._filters:
+            entry_filter._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class AsyncLogger(Logger):
+    """A ``Logger`` for use inside an ``asyncio`` event loop. Entries are assembled exactly as they are by ``Logger``;
+    paired with ``AsyncHandler`` s, the logging calls never block the loop on I/O. Await ``flush`` to wait until every
+    pending entry is sent and ``aclose`` before the loop shuts down.
+    """
+
+    async def flush(self) -> None:
+        """Flushes every ``Handler`` this logger writes to, including those inherited from its ancestors --
+        ``AsyncHandler`` s are awaited.
+        """
+        for handler in self.handlers:
+            if isinstance(handler, AsyncHandler):
+                await handler.aflush()
+            else:
+                handler.flush()
+
+    async def aclose(self) -> None:
+        """Flushes and closes the ``Handler`` s registered to this logger -- ``AsyncHandler`` s are awaited. The
+        handlers it inherits from its ancestors are left open for them.
+        """
+        for handler in list(self._handlers.values()):
+            if isinstance(handler, AsyncHandler):
+                await handler.aclose()
+            else:
+                handler.close()
@@ -0,0 +1,302 @@
+import os
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from logging2 import LogRegister
+
+# the upper bounds, in seconds, of the latency histogram buckets -- a last ``+Inf`` bucket catches the rest
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.1,
+)
+
+# the indexes of the counters in ``_Shard.counts`` -- handlers don't have the last one
+EMITTED, FILTERED, BYTES, ERRORS, SUPPRESSED = range(5)
+LOGGER_COUNTERS: Tuple[str, ...] = (
+    "emitted",
+    "filtered",
+    "bytes",
+    "errors",
+    "suppressed",
+)
+HANDLER_COUNTERS: Tuple[str, ...] = LOGGER_COUNTERS[:SUPPRESSED]
+
+# the index of the latency histogram in ``_Shard.buckets`` and ``_Shard.sums``
+LATENCY = 0
+LOGGER_HISTOGRAMS: Tuple[str, ...] = ("log_seconds",)
+HANDLER_HISTOGRAMS: Tuple[str, ...] = ("write_seconds",)
+
+_HELP: Dict[str, str] = {
+    "logger_emitted": "Entries the logger passed on to its handlers.",
+    "logger_filtered": "Entries below the logger's minimum level.",
+    "logger_bytes": "Bytes of entries the logger rendered.",
+    "logger_errors": "Entries whose handlers raised an exception.",
+    "logger_suppressed": "Entries suppressed by the logger's filters.",
+    "logger_log_seconds": "Time spent logging an entry that was passed on to the handlers.",
+    "handler_emitted": "Entries passed to the handler at or above its minimum level.",
+    "handler_filtered": "Entries passed to the handler below its minimum level.",
+    "handler_bytes": "Bytes of entries passed to the handler at or above its minimum level.",
+    "handler_errors": "Calls to the handler's write that raised an exception.",
+    "handler_write_seconds": "Time spent in the handler's write.",
+}
+
+
+class _Shard:
+    """The counts of a single thread -- only that thread ever updates them.
+    """
+
+    __slots__ = ("counts", "buckets", "sums")
+
+    def __init__(self, counters: int, histograms: int):
+        self.counts: List[int] = [0] * counters
+        self.buckets: List[List[int]] = [
+            [0] * (len(LATENCY_BUCKETS) + 1) for _ in range(histograms)
+        ]
+        self.sums: List[float] = [0.0] * histograms
+
+    def observe(self, histogram: int, seconds: float) -> None:
+        """Records a latency.
+
+        :param histogram: the index of the histogram
+        :param seconds: the latency
+        """
+        self.buckets[histogram][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sums[histogram] += seconds
+
+    def add(self, other: "_Shard") -> None:
+        """Adds the counts of another shard to this one.
+
+        :param other: a shard with the same counters and histograms
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        for index, buckets in enumerate(other.buckets):
+            for bucket, count in enumerate(buckets):
+                self.buckets[index][bucket] += count
+            self.sums[index] += other.sums[index]
+
+
+class _Owner:
+    """Holds a thread's shard in the ``threading.local`` -- it is freed when the thread finishes, which retires the
+    shard.
+    """
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: _Shard):
+        self.shard: _Shard = shard
+
+
+class Stats:
+    """Counters and latency histograms of a ``Logger`` or ``Handler``. Each thread updates its own shard, found
+    through a ``threading.local``, so updates never take a lock and never contend. Reading the stats adds up the
+    shards. When a thread finishes, its shard is folded into a single retired shard, so its counts aren't lost and
+    short-lived threads don't pile up shards.
+    """
+
+    def __init__(self, counters: Tuple[str, ...], histograms: Tuple[str, ...]):
+        """Instantiates a new ``Stats``
+
+        :param counters: the names of the counters
+        :param histograms: the names of the latency histograms
+        """
+        self.counters: Tuple[str, ...] = counters
+        self.histograms: Tuple[str, ...] = histograms
+        self._local: threading.local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired: _Shard = _Shard(len(counters), len(histograms))
+        # the lock is reentrant, as a shard may be retired while the thread holding it is freeing memory
+        self._lock: threading.RLock = threading.RLock()
+
+    def shard(self) -> _Shard:
+        """Gets the shard of the current thread, creating it on the thread's first update.
+
+        :returns: the shard
+        """
+        try:
+            return self._local.owner.shard
+        except AttributeError:
+            shard = _Shard(len(self.counters), len(self.histograms))
+            owner = self._local.owner = _Owner(shard)
+            with self._lock:
+                self._shards = self._shards + [shard]
+            finalizer = weakref.finalize(owner, Stats._retire, weakref.ref(self), shard)
+            finalizer.atexit = False
+            return shard
+
+    @staticmethod
+    def _retire(reference: "weakref.ref[Stats]", shard: _Shard) -> None:
+        """Folds the shard of a finished thread into the retired shard -- called once the thread's ``_Owner`` is
+        freed.
+
+        :param reference: a weak reference to the stats, which may have been dropped since
+        :param shard: the shard of the finished thread
+        """
+        stats = reference()
+        if stats is None:
+            return
+        with stats._lock:
+            if not any(kept is shard for kept in stats._shards):
+                return  # the shard of a parent's thread, dropped after a fork
+            # the retired shard is replaced rather than updated, like the list of shards, so a snapshot that read
+            # both never counts the shard twice
+            retired = _Shard(len(stats.counters), len(stats.histograms))
+            retired.add(stats._retired)
+            retired.add(shard)
+            stats._retired = retired
+            stats._shards = [kept for kept in stats._shards if kept is not shard]
+
+    def snapshot(self) -> Dict[str, object]:
+        """Adds up the shards. The counts of each histogram are cumulative, as in Prometheus: each bucket counts the
+        latencies up to its bound.
+
+        :returns: the value of each counter, and for each histogram a dictionary of its ``buckets`` by upper bound,
+            ``sum`` and ``count``
+        """
+        with self._lock:
+            shards = self._shards + [self._retired]
+        result = {
+            name: sum(shard.counts[index] for shard in shards)
+            for index, name in enumerate(self.counters)
+        }
+        for index, name in enumerate(self.histograms):
+            buckets = {}
+            count = 0
+            for bucket, bound in enumerate(LATENCY_BUCKETS + (float("inf"),)):
+                count += sum(shard.buckets[index][bucket] for shard in shards)
+                buckets[bound] = count
+            result[name] = {
+                "buckets": buckets,
+                "sum": sum(shard.sums[index] for shard in shards),
+                "count": count,
+            }
+        return result
+
+    def _after_fork(self) -> None:
+        """Drops the counts, which belong to the parent, and replaces the lock in a forked child process.
+        """
+        self._lock = threading.RLock()
+        self._shards = []
+        self._retired = _Shard(len(self.counters), len(self.histograms))
+        self._local = threading.local()
+
+
+def snapshot() -> Dict[str, Dict[str, Dict[str, object]]]:
+    """Takes a snapshot of the stats of every instrumented ``Logger`` and of the handlers they wrote to. The stats of
+    distinct handlers with the same name are added up.
+
+    :returns: the stats of the ``loggers`` and of the ``handlers``, by name
+    """
+    loggers = {}
+    handlers = {}
+    seen = set()
+    for logger in LogRegister.get_loggers():
+        if logger._stats is None:
+            continue
+        loggers[logger.name] = logger._stats.snapshot()
+        for handler in logger._dispatch:
+            if handler._stats is not None and id(handler) not in seen:
+                seen.add(id(handler))
+                stats = handler._stats.snapshot()
+                if handler.name in handlers:
+                    stats = _add(handlers[handler.name], stats)
+                handlers[handler.name] = stats
+    return {
+        "loggers": dict(sorted(loggers.items())),
+        "handlers": dict(sorted(handlers.items())),
+    }
+
+
+def format_prometheus(stats: Optional[Dict[str, Dict]] = None) -> str:
+    """Formats a snapshot in the Prometheus text exposition format, e.g.
+    ``logging2_logger_emitted_total{logger="app.db"} 42``. Latencies are ``logging2_logger_log_seconds`` and
+    ``logging2_handler_write_seconds`` histograms.
+
+    :param stats: the snapshot -- by default, a new one
+    :returns: the metrics
+    """
+    if stats is None:
+        stats = snapshot()
+    lines = []
+    for kind, counters, histograms in (
+        ("logger", LOGGER_COUNTERS, LOGGER_HISTOGRAMS),
+        ("handler", HANDLER_COUNTERS, HANDLER_HISTOGRAMS),
+    ):
+        entries = stats[f"{kind}s"]
+        for counter in counters:
+            metric = f"logging2_{kind}_{counter}_total"
+            lines.append(f"# HELP {metric} {_HELP[f'{kind}_{counter}']}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, values in entries.items():
+                lines.append(f'{metric}{{{kind}="{_escape(name)}"}} {values[counter]}')
+        for histogram in histograms:
+            metric = f"logging2_{kind}_{histogram}"
+            lines.append(f"# HELP {metric} {_HELP[f'{kind}_{histogram}']}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, values in entries.items():
+                label = f'{kind}="{_escape(name)}"'
+                for bound, count in values[histogram]["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label},le="{le}"}} {count}')
+                lines.append(f"{metric}_sum{{{label}}} {values[histogram]['sum']!r}")
+                lines.append(f"{metric}_count{{{label}}} {values[histogram]['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str) -> None:
+    """Writes the metrics of a new snapshot to a file, e.g. for the textfile collector of the Prometheus node
+    exporter. The file is replaced atomically, so readers never see a partial file.
+
+    :param path: the path of the file
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf8") as fh:
+        fh.write(format_prometheus())
+    os.replace(temporary, path)
+
+
+def _add(first: Dict[str, object], second: Dict[str, object]) -> Dict[str, object]:
+    """Adds up two snapshots of ``Stats``.
+
+    :param first: a snapshot
+    :param second: another snapshot with the same counters and histograms
+    :returns: the sum of the snapshots
+    """
+    result = {}
+    for name, value in first.items():
+        other = second[name]
+        if isinstance(value, dict):
+            result[name] = {
+                "buckets": {
+                    bound: count + other["buckets"][bound]
+                    for bound, count in value["buckets"].items()
+                },
+                "sum": value["sum"] + other["sum"],
+                "count": value["count"] + other["count"],
+            }
+        else:
+            result[name] = value + other
+    return result
+
+
+def _escape(value: str) -> str:
+    """Escapes a Prometheus label value.
+
+    :param value: the value
+    :returns: the escaped value
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,114 @@
+import re
+from _string import formatter_field_name_split
+from string import Formatter
+from typing import Callable, FrozenSet, Mapping, NamedTuple, Optional, Tuple, Union
+
+
+class TemplateField(NamedTuple):
+    """A single replacement field of a ``Template``, e.g. ``{message!r:>20}``.
+    """
+
+    name: str
+    key: str
+    conversion: Optional[str]
+    format_spec: str
+
+
+class Template:
+    """A log entry template that is parsed once into literal segments and field slots. The segments are compiled into
+    a single render function, so producing an entry does no format string parsing at all -- it is a join over the
+    precomputed pieces.
+    """
+
+    EXEC_INFO_KEYS: FrozenSet[str] = frozenset(
+        {"source", "line", "function", "process"}
+    )
+    EXPENSIVE_KEYS: FrozenSet[str] = EXEC_INFO_KEYS | {"timestamp"}
+
+    _FORMATTER: Formatter = Formatter()
+    _SIMPLE_SPEC_REGEX = re.compile(r"^[\w<>=^+\- #,.%]*$")
+    _CONVERSIONS: Mapping[str, str] = {"r": "repr", "s": "str", "a": "ascii"}
+
+    def __init__(self, template: str):
+        """Instantiates a new ``Template``
+
+        :param template: a ``str.format`` style template using named fields
+        """
+        segments = []
+        for literal, name, format_spec, conversion in self._FORMATTER.parse(template):
+            if literal:
+                segments.append(literal)
+            if name is not None:
+                key, _ = formatter_field_name_split(name)
+                if not isinstance(key, str) or not key:
+                    raise ValueError(
+                        f"Positional fields are not supported in template `{template}`"
+                    )
+                segments.append(TemplateField(name, key, conversion, format_spec))
+
+        fields = tuple(seg for seg in segments if isinstance(seg, TemplateField))
+        if not fields:
+            raise ValueError(f"No keys found in template `{template}`")
+
+        self.template: str = template
+        self.segments: Tuple[Union[str, TemplateField], ...] = tuple(segments)
+        self.fields: Tuple[TemplateField, ...] = fields
+        self.keys: FrozenSet[str] = frozenset(field.key for field in fields)
+        self.uses: FrozenSet[str] = self.keys & self.EXPENSIVE_KEYS
+        self.uses_timestamp: bool = "timestamp" in self.uses
+        self.uses_exec_info: bool = bool(self.uses & self.EXEC_INFO_KEYS)
+        self.render: Callable[[Mapping[str, object]], str] = self._compile()
+
+    def __repr__(self) -> str:
+        return f"Template({self.template!r})"
+
+    def _compile(self) -> Callable[[Mapping[str, object]], str]:
+        """Generates the render function for the parsed segments. Each field slot is bound to a local variable and
+        the literal segments are inlined into one f-string, so rendering is a single ``BUILD_STRING``.
+
+        :returns: a function that takes the entry's values and returns the rendered entry
+        """
+        lines = ["def render(p):"]
+        pieces = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                escaped = segment.replace("{", "{{").replace("}", "}}")
+                pieces.append(f"f{escaped!r}")
+                continue
+
+            var = f"v{len(lines)}"
+            lines.append(f"    {var} = {self._field_expression(segment)}")
+            spec = segment.format_spec
+            if self._SIMPLE_SPEC_REGEX.match(spec):
+                conversion = f"!{segment.conversion}" if segment.conversion else ""
+                spec = f":{spec}" if spec else ""
+                pieces.append(f"f'{{{var}{conversion}{spec}}}'")
+            else:
+                # nested or unusual format specs are resolved against the entry values at render time
+                if segment.conversion:
+                    value = f"{self._CONVERSIONS[segment.conversion]}({var})"
+                else:
+                    value = var
+                lines.append(f"    {var} = format({value}, {spec!r}.format_map(p))")
+                pieces.append(f"f'{{{var}}}'")
+
+        lines.append(f"    return {' '.join(pieces)}")
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        return namespace["render"]
+
+    @staticmethod
+    def _field_expression(field: TemplateField) -> str:
+        """Translates a field name such as ``request.headers[host]`` into the equivalent Python expression.
+
+        :param field: the field to be translated
+        :returns: the expression looking the field's value up in the mapping ``p``
+        """
+        _, rest = formatter_field_name_split(field.name)
+        expression = f"p[{field.key!r}]"
+        for is_attribute, key in rest:
+            if is_attribute:
+                expression = f"getattr({expression}, {key!r})"
+            else:
+                expression = f"{expression}[{key!r}]"
+        return expression
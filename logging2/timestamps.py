@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Callable, Tuple, Union
+
+
+class TimestampProvider:
+    """Produces timestamps for log entries. ISO 8601 timestamps are assembled from a date, time and UTC offset that
+    are formatted once per second -- only the fractional part is formatted for each entry. Because the cached parts
+    are recomputed for every new second, they follow second boundaries and UTC offset changes (e.g. DST) of the
+    timezone exactly.
+
+    In epoch mode the provider returns the number of seconds since the epoch instead: an ``int`` at ``s`` precision,
+    a ``float`` otherwise.
+    """
+
+    PRECISIONS: Tuple[str, ...] = ("s", "ms", "us")
+
+    def __init__(self, timezone: tzinfo, precision: str = "us", epoch: bool = False):
+        """Instantiates a new ``TimestampProvider``
+
+        :param timezone: the timezone of the ISO 8601 timestamps
+        :param precision: the precision of the timestamps -- one of ``s``, ``ms`` or ``us``
+        :param epoch: produce seconds since the epoch instead of ISO 8601 timestamps
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(
+                f"Unknown timestamp precision `{precision}`, expected one of {self.PRECISIONS}"
+            )
+        self.timezone: tzinfo = timezone
+        self.precision: str = precision
+        self.epoch: bool = epoch
+        self._cache: Tuple[int, str, str] = (-1, "", "")
+
+        # bound once, so getting a timestamp is a single call without any dispatching on the format
+        self.now: Callable[[], Union[str, int, float]] = getattr(
+            self, f"_{'epoch' if epoch else 'iso'}_{precision}"
+        )
+
+    def __call__(self) -> Union[str, int, float]:
+        """Gets the timestamp for the current time.
+
+        :returns: the formatted timestamp
+        """
+        return self.now()
+
+    def _parts(self, second: int) -> Tuple[str, str]:
+        """Gets the cached date and time, and the UTC offset, for a second since the epoch.
+
+        :param second: the second since the epoch
+        :returns: the ``YYYY-MM-DDTHH:MM:SS`` part and the UTC offset part of the ISO 8601 timestamp
+        """
+        cache = self._cache
+        if cache[0] != second:
+            iso = datetime.fromtimestamp(second, self.timezone).isoformat()
+            cache = self._cache = (second, iso[:19], iso[19:])
+        return cache[1], cache[2]
+
+    def _iso_s(self) -> str:
+        second = time.time_ns() // 1_000_000_000
+        date_time, offset = self._parts(second)
+        return f"{date_time}{offset}"
+
+    def _iso_ms(self) -> str:
+        second, remainder = divmod(time.time_ns(), 1_000_000_000)
+        date_time, offset = self._parts(second)
+        return f"{date_time}.{remainder // 1_000_000:03d}{offset}"
+
+    def _iso_us(self) -> str:
+        second, remainder = divmod(time.time_ns(), 1_000_000_000)
+        date_time, offset = self._parts(second)
+        return f"{date_time}.{remainder // 1_000:06d}{offset}"
+
+    @staticmethod
+    def _epoch_s() -> int:
+        return time.time_ns() // 1_000_000_000
+
+    @staticmethod
+    def _epoch_ms() -> float:
+        return time.time_ns() // 1_000_000 / 1_000
+
+    @staticmethod
+    def _epoch_us() -> float:
+        return time.time_ns() // 1_000 / 1_000_000
+
+
+@lru_cache(maxsize=None)
+def get_timestamp_provider(
+    timezone: tzinfo, precision: str = "us", epoch: bool = False
+) -> TimestampProvider:
+    """Gets the ``TimestampProvider`` for a timezone and format. Providers are shared, so every logger using the same
+    timezone shares one per-second cache.
+
+    :param timezone: the timezone of the ISO 8601 timestamps
+    :param precision: the precision of the timestamps -- one of ``s``, ``ms`` or ``us``
+    :param epoch: produce seconds since the epoch instead of ISO 8601 timestamps
+    :returns: the timestamp provider
+    """
+    return TimestampProvider(timezone, precision=precision, epoch=epoch)
@@ -0,0 +1,219 @@
+import builtins
+import sys
+import threading
+import traceback
+from types import TracebackType
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+# what the logging methods accept as ``exc_info``: an exception, an ``(type, value, traceback)`` tuple as returned by
+# ``sys.exc_info``, or ``True`` for the exception being handled
+ExcInfo = Union[
+    bool,
+    BaseException,
+    Tuple[
+        Optional[Type[BaseException]], Optional[BaseException], Optional[TracebackType]
+    ],
+]
+
+_CAUSE: str = (
+    "\nThe above exception was the direct cause of the following exception:\n\n"
+)
+_CONTEXT: str = (
+    "\nDuring handling of the above exception, another exception occurred:\n\n"
+)
+
+# exception groups (Python 3.11+) are left to ``traceback``, uncached
+_EXCEPTION_GROUP: Union[type, tuple] = getattr(builtins, "BaseExceptionGroup", ())
+
+
+class TracebackRenderer:
+    """Renders the tracebacks of logged exceptions. Formatting a traceback reads the source line of every frame, so
+    the formatted frames are cached per exception type and code locations -- the code object and line number of each
+    frame. An exception that keeps being raised from the same place is only formatted once; after that, rendering it
+    walks the frames and formats the final ``Type: message`` line.
+
+    By default the output is the same as ``traceback.format_exc``. ``max_depth`` keeps only the innermost frames of
+    each traceback, ``max_bytes`` keeps only the end of the output, and ``compact`` renders everything on a single line.
+    """
+
+    DEFAULT_CACHE_SIZE: int = 1024
+
+    def __init__(
+        self,
+        max_depth: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compact: Optional[bool] = False,
+        cache_size: Optional[int] = None,
+    ):
+        """Instantiates a new ``TracebackRenderer``
+
+        :param max_depth: the maximum number of frames rendered for each exception -- the innermost ones are kept
+        :param max_bytes: the maximum size of the rendered traceback in UTF-8 bytes -- the end is kept
+        :param compact: render the exceptions and their frames on a single line
+        :param cache_size: the maximum number of formatted tracebacks kept -- the oldest are evicted first
+        """
+        self.max_depth: Optional[int] = max_depth
+        self.max_bytes: Optional[int] = max_bytes
+        self.compact: bool = compact
+        self.cache_size: int = cache_size or self.DEFAULT_CACHE_SIZE
+        # hits only read the cache, so a plain dict evicted in insertion order is used rather than an LRU, which would
+        # need the lock on every hit. Each value keeps the code objects of its key alive, so their ids aren't reused.
+        self._cache: Dict[tuple, Tuple[str, tuple]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def render(self, exc_info: ExcInfo = True) -> str:
+        """Renders the traceback of an exception, along with the exceptions it was raised from or while handling.
+
+        :param exc_info: the exception, an ``(type, value, traceback)`` tuple, or ``True`` for the exception being
+            handled
+        :returns: the rendered traceback, ending with a new line
+        """
+        error = get_exception(exc_info)
+        if error is None:
+            return "NoneType: None\n"
+        if isinstance(error, _EXCEPTION_GROUP):
+            rendered = "".join(traceback.format_exception(error, limit=self._limit()))
+        else:
+            chain = _get_chain(error)
+            if self.compact:
+                rendered = self._render_compact(chain)
+            else:
+                rendered = self._render_full(chain)
+        if self.max_bytes is not None:
+            rendered = self._truncate(rendered)
+        return rendered
+
+    def _render_full(self, chain: List[Tuple[BaseException, str]]) -> str:
+        """Renders a chain of exceptions the way ``traceback.format_exception`` does, outermost cause first.
+
+        :param chain: the exceptions and the messages linking each to the exception before it
+        :returns: the rendered traceback
+        """
+        parts = []
+        for error, link in reversed(chain):
+            if error.__traceback__ is not None:
+                parts.append("Traceback (most recent call last):\n")
+                parts.append(self._get_frames(error))
+            parts.extend(traceback.format_exception_only(error.__class__, error))
+            parts.append(link)
+        return "".join(parts)
+
+    def _render_compact(self, chain: List[Tuple[BaseException, str]]) -> str:
+        """Renders a chain of exceptions on a single line, innermost exception and frame first, e.g.
+        ``KeyError: 'id' [api.py:12 in load, api.py:40 in main] from ValueError: bad [db.py:7 in parse]``.
+
+        :param chain: the exceptions and the messages linking each to the exception before it
+        :returns: the rendered traceback
+        """
+        parts = []
+        for error, link in chain:
+            if link:
+                parts.append(" from " if link is _CAUSE else " while handling ")
+            message = traceback.format_exception_only(error.__class__, error)[-1]
+            parts.append(message.strip().replace("\n", "\\n"))
+            if error.__traceback__ is not None:
+                parts.append(self._get_frames(error))
+        parts.append("\n")
+        return "".join(parts)
+
+    def _get_frames(self, error: BaseException) -> str:
+        """Gets the formatted frames of an exception's traceback from the cache, formatting them on a miss.
+
+        :param error: the exception, which has a traceback
+        :returns: the formatted frames
+        """
+        tb = error.__traceback__
+        codes = []
+        lines = []
+        while tb is not None:
+            codes.append(tb.tb_frame.f_code)
+            lines.append(tb.tb_lineno)
+            tb = tb.tb_next
+        key = (error.__class__, tuple(map(id, codes)), tuple(lines))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[0]
+
+        frames = self._format_frames(error.__traceback__, len(codes))
+        with self._lock:
+            if len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = (frames, tuple(codes))
+        return frames
+
+    def _format_frames(self, tb: TracebackType, depth: int) -> str:
+        """Formats the frames of a traceback, keeping the innermost ``max_depth`` ones.
+
+        :param tb: the traceback
+        :param depth: the number of frames in the traceback
+        :returns: the formatted frames
+        """
+        summary = traceback.extract_tb(tb, limit=self._limit())
+        omitted = depth - len(summary)
+        if self.compact:
+            frames = ", ".join(
+                f"{frame.filename}:{frame.lineno} in {frame.name}"
+                for frame in reversed(summary)
+            )
+            if omitted:
+                frames = f"{frames}, ... {omitted} more"
+            return f" [{frames}]"
+
+        frames = "".join(summary.format())
+        if omitted:
+            frames = f"  ... {omitted} outer frames omitted\n{frames}"
+        return frames
+
+    def _limit(self) -> Optional[int]:
+        """Gets the ``limit`` for the ``traceback`` module, which keeps the innermost frames when it is negative.
+
+        :returns: the limit
+        """
+        return None if self.max_depth is None else -self.max_depth
+
+    def _truncate(self, rendered: str) -> str:
+        """Keeps the end of a rendered traceback -- the innermost frames and the exception -- within ``max_bytes``.
+
+        :param rendered: the rendered traceback
+        :returns: the truncated traceback
+        """
+        data = rendered.encode("utf8")
+        if len(data) <= self.max_bytes:
+            return rendered
+        marker = f"[{len(data) - self.max_bytes} bytes truncated] "
+        kept = data[len(data) - self.max_bytes + len(marker) :]
+        return marker + kept.decode("utf8", "ignore")
+
+
+def get_exception(exc_info: ExcInfo) -> Optional[BaseException]:
+    """Gets the exception to render from the ``exc_info`` a logging method was given.
+
+    :param exc_info: the exception, an ``(type, value, traceback)`` tuple, or ``True`` for the exception being handled
+    :returns: the exception, if there is one
+    """
+    if isinstance(exc_info, BaseException):
+        return exc_info
+    if isinstance(exc_info, tuple):
+        return exc_info[1]
+    return sys.exc_info()[1]
+
+
+def _get_chain(error: BaseException) -> List[Tuple[BaseException, str]]:
+    """Follows an exception's ``__cause__`` and ``__context__`` the way ``traceback`` does.
+
+    :param error: the exception that was logged
+    :returns: the exceptions, innermost first, and the message linking each to the exception before it
+    """
+    chain = []
+    seen = set()
+    link = ""
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        chain.append((error, link))
+        if error.__cause__ is not None:
+            error, link = error.__cause__, _CAUSE
+        elif error.__context__ is not None and not error.__suppress_context__:
+            error, link = error.__context__, _CONTEXT
+        else:
+            error = None
+    return chain
@@ -1,3 +1,11 @@
+import inspect
+import os
+import threading
+from functools import lru_cache
+from types import CodeType
+from typing import Callable, Optional, Tuple
+
+
 class Singleton(type):
     """A metaclass for creating Singletons (ta-da).
     """
@@ -7,3 +15,79 @@ class Singleton(type):
             instance = super().__call__(*args, **kwargs)
             cls._instance = instance
         return cls._instance
+
+
+_pid: int = os.getpid()
+
+
+def _reset_pid() -> None:  # pragma: no cover
+    """Refreshes the cached process id -- registered to run in the child after every ``os.fork``.
+    """
+    global _pid
+    _pid = os.getpid()
+
+
+os.register_at_fork(after_in_child=_reset_pid)
+
+
+def get_pid() -> int:
+    """Gets the id of the current process without making a syscall. The cached value is refreshed in the child
+    process after a fork.
+
+    :returns: the current process id
+    """
+    return _pid
+
+
+@lru_cache(maxsize=4096)
+def get_code_info(code: CodeType) -> Tuple[str, str]:
+    """Gets the normalized source file name and function name of a code object. The results are cached per code
+    object, so the file system is only consulted the first time a call site is seen.
+
+    :param code: the code object of the calling frame
+    :returns: the source file name and the function name
+    """
+    source = inspect.getsourcefile(code) or code.co_filename
+    function = code.co_name
+    if function == "<module>":
+        function = "__main__"
+    return source, function
+
+
+class FlushTimer:
+    """A one-shot timer for handlers that hold entries back: once armed, it calls ``function`` from a background
+    thread after ``interval`` seconds. Arming an already armed timer is a no-op, so the deadline is set by the first
+    entry that was held back.
+    """
+
+    def __init__(self, interval: float, function: Callable[[], None]):
+        """Instantiates a new ``FlushTimer``
+
+        :param interval: the number of seconds to wait after being armed
+        :param function: the callable to run once the interval has passed
+        """
+        self.interval: float = interval
+        self.function: Callable[[], None] = function
+        self._timer: Optional[threading.Timer] = None
+
+    def arm(self) -> None:
+        """Starts the countdown if it isn't already running.
+        """
+        if self._timer is None:
+            timer = threading.Timer(self.interval, self._run)
+            timer.daemon = True
+            self._timer = timer
+            timer.start()
+
+    def cancel(self) -> None:
+        """Stops the countdown if it is running.
+        """
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _run(self) -> None:
+        """Disarms the timer and calls the function.
+        """
+        self._timer = None
+        self.function()
@@ -37,5 +37,5 @@ setup(
         "Programming Language :: Python :: 3.6",
     ],
     keywords="logging",
-    packages=find_packages(where=".", exclude=["tests", "docs"]),
+    packages=find_packages(where=".", exclude=["tests", "docs", "benchmarks", "benchmarks.*"]),
 )
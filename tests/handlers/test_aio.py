@@ -0,0 +1,234 @@
+import asyncio
+import os
+import socket
+import syslog
+
+from logging2.handlers.aio import (
+    AsyncFileHandler,
+    AsyncSyslogHandler,
+    AsyncTcpHandler,
+    AsyncUdpHandler,
+    AsyncUnixSocketHandler,
+)
+from logging2.levels import LogLevel
+
+
+async def serve_stream(start_server, **kwargs):
+    """Starts a stream server that collects everything it receives.
+    """
+    received = []
+
+    async def on_connect(reader, writer):
+        received.append(await reader.read())
+        writer.close()
+
+    server = await start_server(on_connect, **kwargs)
+    return server, received
+
+
+class TestAsyncTcpHandler:
+    def test_write(self):
+        async def main():
+            server, received = await serve_stream(
+                asyncio.start_server, host="localhost", port=0
+            )
+            port = server.sockets[0].getsockname()[1]
+            handler = AsyncTcpHandler(host="localhost", port=port)
+
+            handler.write("Hello, world!\n", level=LogLevel.info)
+            handler.write("안녕하세요\n", level=LogLevel.info)
+            handler.write("skipped\n", level=LogLevel.debug)
+            await handler.aclose()
+
+            server.close()
+            await server.wait_closed()
+            return received
+
+        received = asyncio.run(main())
+        assert received == [bytes("Hello, world!\n안녕하세요\n", "utf8")]
+
+    def test_write_bytes(self):
+        async def main():
+            server, received = await serve_stream(
+                asyncio.start_server, host="localhost", port=0
+            )
+            port = server.sockets[0].getsockname()[1]
+            handler = AsyncTcpHandler(host="localhost", port=port)
+            handler.write(b'{"message":"hi"}\n', level=LogLevel.info)
+            await handler.aclose()
+            server.close()
+            await server.wait_closed()
+            return received
+
+        assert asyncio.run(main()) == [b'{"message":"hi"}\n']
+
+    def test_write_without_running_loop(self):
+        async def main(handler):
+            server, received = await serve_stream(
+                asyncio.start_server, host="localhost", port=port
+            )
+            await handler.aclose()
+            server.close()
+            await server.wait_closed()
+            return received
+
+        with socket.socket() as probe:
+            probe.bind(("localhost", 0))
+            port = probe.getsockname()[1]
+        handler = AsyncTcpHandler(host="localhost", port=port)
+        handler.write("Hello, world!\n", level=LogLevel.info)
+
+        assert asyncio.run(main(handler)) == [b"Hello, world!\n"]
+
+    def test_backpressure(self):
+        handler = AsyncTcpHandler(host="localhost", port=1, max_buffer=10)
+        handler.write("0123456789", level=LogLevel.info)
+        handler.write("a", level=LogLevel.info)
+
+        assert handler.dropped == 1
+
+    def test_connection_error(self):
+        async def main():
+            with socket.socket() as probe:
+                probe.bind(("localhost", 0))
+                port = probe.getsockname()[1]
+            handler = AsyncTcpHandler(host="localhost", port=port)
+            handler.write("Hello, world!\n", level=LogLevel.info)
+            await handler.aflush()
+            return handler
+
+        handler = asyncio.run(main())
+        assert handler.errors == 1
+
+    def test_after_fork(self):
+        handler = AsyncTcpHandler(host="localhost", port=8089)
+        handler.write("parent\n", level=LogLevel.info)
+        handler._writer = object()  # the parent's stream
+        handler._after_fork()
+
+        assert handler._pending == []
+        assert handler._pending_size == 0
+        assert handler._writer is None
+
+    def test_create_name(self):
+        handler = AsyncTcpHandler(host="localhost", port=8089)
+        assert handler.name == "TCP localhost:8089"
+
+
+class TestAsyncUnixSocketHandler:
+    def setup_method(self, method):
+        self.node = "/tmp/async-unix.node"
+        if os.path.exists(self.node):
+            os.remove(self.node)
+
+    def test_write(self):
+        async def main():
+            server, received = await serve_stream(
+                asyncio.start_unix_server, path=self.node
+            )
+            handler = AsyncUnixSocketHandler(node=self.node)
+            handler.write("Hello, world!\n", level=LogLevel.info)
+            await handler.aclose()
+            server.close()
+            await server.wait_closed()
+            return received
+
+        assert asyncio.run(main()) == [b"Hello, world!\n"]
+
+    def test_create_name(self):
+        handler = AsyncUnixSocketHandler(node=self.node)
+        assert handler.name == f"UNIX {self.node}"
+
+
+class TestAsyncUdpHandler:
+    def setup_method(self, method):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(("localhost", 0))
+        self.port = self.server.getsockname()[1]
+
+    def teardown_method(self, method):
+        self.server.close()
+
+    def test_write(self):
+        handler = AsyncUdpHandler(host="localhost", port=self.port)
+
+        async def main():
+            handler.write("Hello, world!", level=LogLevel.info)
+            handler.write("안녕하세요", level=LogLevel.info)
+            await handler.aclose()
+
+        asyncio.run(main())
+        messages = [self.server.recv(1024), self.server.recv(1024)]
+
+        assert messages == [b"Hello, world!", bytes("안녕하세요", "utf8")]
+
+    def test_after_fork(self):
+        handler = AsyncUdpHandler(host="localhost", port=self.port)
+        handler._transport = object()  # the parent's endpoint
+        handler._after_fork()
+
+        assert handler._transport is None
+
+    def test_create_name(self):
+        handler = AsyncUdpHandler(host="localhost", port=self.port)
+        assert handler.name == f"UDP localhost:{self.port}"
+
+
+class TestAsyncSyslogHandler:
+    def setup_method(self, method):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(("localhost", 0))
+        self.port = self.server.getsockname()[1]
+        self.handler = AsyncSyslogHandler(host="localhost", port=self.port)
+
+    def teardown_method(self, method):
+        self.server.close()
+
+    def test_write(self):
+        async def main():
+            self.handler.write("Hello, world!", level=LogLevel.warning)
+            self.handler.write("skipped", level=LogLevel.debug)
+            await self.handler.aclose()
+
+        asyncio.run(main())
+        priority = syslog.LOG_USER | syslog.LOG_WARNING
+
+        assert self.server.recv(1024) == f"<{priority}>Hello, world!\000".encode()
+
+    def test_write_bytes(self):
+        async def main():
+            self.handler.write(b"Hello, world!", level=LogLevel.warning)
+            await self.handler.aclose()
+
+        asyncio.run(main())
+        priority = syslog.LOG_USER | syslog.LOG_WARNING
+
+        assert self.server.recv(1024) == b"<%d>Hello, world!\000" % priority
+
+    def test_create_name(self):
+        assert self.handler.name == f"syslog-{syslog.LOG_USER}"
+
+
+class TestAsyncFileHandler:
+    def setup_method(self, method):
+        self.filename = "/tmp/test_async_file_handler.log"
+        self.handler = AsyncFileHandler(self.filename)
+
+    def teardown_method(self, method):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_write(self):
+        async def main():
+            self.handler.write("Hello, world!\n", level=LogLevel.info)
+            self.handler.write("안녕하세요\n", level=LogLevel.info)
+            await self.handler.aflush()
+            self.handler.write("again\n", level=LogLevel.info)
+            await self.handler.aclose()
+
+        asyncio.run(main())
+        with open(self.filename, encoding="utf8") as fh:
+            assert fh.read() == "Hello, world!\n안녕하세요\nagain\n"
+
+    def test_create_name(self):
+        assert self.handler.name == "test_async_file_handler.log"
@@ -0,0 +1,228 @@
+import gzip
+import os
+import pytest
+import socket
+import threading
+import time
+
+from logging2.handlers.abc import Handler
+from logging2.handlers.collectors import Collector, CollectorHandler
+from logging2.handlers.files import FileHandler, GzipFileHandler, MappedFileHandler
+from logging2.levels import LogLevel
+
+
+class ListHandler(Handler):
+    """A handler that records every write.
+    """
+
+    def __init__(self, fail: bool = False):
+        self.writes = []
+        self.closed = False
+        self.fail = fail
+        super().__init__(name="list", level=LogLevel.debug)
+
+    def write(self, message, level):
+        if self.fail:
+            raise RuntimeError(message)
+        self.writes.append((message, level))
+
+    def close(self):
+        if self.fail:
+            raise RuntimeError("close")
+        self.closed = True
+
+
+class TestCollector:
+    def setup_method(self, method):
+        self.path = f"/tmp/test_collector_{os.getpid()}.sock"
+        self.target = ListHandler()
+        self.collector = Collector(self.path, handler=self.target)
+        self.handler = CollectorHandler(self.path)
+
+    def teardown_method(self, method):
+        self.handler.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def serve(self):
+        """Stops the collector, then serves everything sent before the stop signal.
+        """
+        self.collector.stop()
+        self.collector.serve()
+
+    def test_write(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        self.handler.write("skipped\n", level=LogLevel.debug)
+        self.serve()
+
+        assert self.target.writes == [(b"Hello, world!\n", LogLevel.info)]
+        assert self.target.closed
+        assert not os.path.exists(self.path)
+
+    def test_write_non_ascii_and_bytes(self):
+        self.handler.write("안녕하세요\n", level=LogLevel.warning)
+        self.handler.write(b'{"message":"hi"}\n', level=LogLevel.error)
+        self.serve()
+
+        assert self.target.writes == [
+            (bytes("안녕하세요\n", "utf8"), LogLevel.warning),
+            (b'{"message":"hi"}\n', LogLevel.error),
+        ]
+
+    def test_batches_runs_of_the_same_level(self):
+        for message, level in [
+            ("a\n", LogLevel.info),
+            ("b\n", LogLevel.info),
+            ("c\n", LogLevel.error),
+            ("d\n", LogLevel.info),
+        ]:
+            self.handler.write(message, level=level)
+        self.serve()
+
+        assert self.target.writes == [
+            (b"a\nb\n", LogLevel.info),
+            (b"c\n", LogLevel.error),
+            (b"d\n", LogLevel.info),
+        ]
+
+    def test_batch_size(self):
+        self.collector.batch_size = 6
+        for message in ["a\n", "b\n", "c\n", "d\n"]:
+            self.handler.write(message, level=LogLevel.info)
+        self.serve()
+
+        assert self.target.writes == [
+            (b"a\nb\n", LogLevel.info),
+            (b"c\nd\n", LogLevel.info),
+        ]
+
+    def test_serve_in_thread(self):
+        thread = threading.Thread(target=self.collector.serve)
+        thread.start()
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        while not self.target.writes:  # written as soon as nothing else is waiting
+            time.sleep(0.001)
+        self.collector.stop()
+        thread.join()
+
+        assert self.target.writes == [(b"Hello, world!\n", LogLevel.info)]
+
+    def test_handler_errors_are_counted(self):
+        collector = Collector(self.path, handler=ListHandler(fail=True))
+        CollectorHandler(self.path).write("boom\n", level=LogLevel.info)
+        collector.stop()
+        collector.serve()
+
+        assert collector.errors == 2  # the write and the close
+
+    def test_stop_after_stopped(self):
+        self.serve()
+        self.collector.stop()
+
+    def test_replaces_stale_socket(self):
+        collector = Collector(self.path, handler=self.target)
+        CollectorHandler(self.path).write("Hello, world!\n", level=LogLevel.info)
+        collector.stop()
+        collector.serve()
+
+        assert self.target.writes == [(b"Hello, world!\n", LogLevel.info)]
+
+    def test_does_not_replace_other_files(self):
+        path = f"/tmp/test_collector_{os.getpid()}.log"
+        with open(path, "w"):
+            pass
+        try:
+            with pytest.raises(OSError):
+                Collector(path, handler=self.target)
+            assert os.path.exists(path)
+        finally:
+            os.remove(path)
+
+    def test_no_handlers(self):
+        with pytest.raises(ValueError):
+            Collector(self.path)
+
+    def test_start(self, tmp_path):
+        path = str(tmp_path / "collected.log")
+        collector = Collector(self.path, handler=FileHandler(path))
+        collector.start()
+        handler = CollectorHandler(self.path)
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            handler.write("child\n", level=LogLevel.info)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        handler.write("parent\n", level=LogLevel.info)
+        collector.stop()
+
+        assert collector.process.exitcode == 0
+        with open(path) as fh:
+            assert fh.read() == "child\nparent\n"
+        handler.close()
+
+    def test_start_with_mapped_file(self, tmp_path):
+        path = str(tmp_path / "collected.log")
+        mapped = MappedFileHandler(path)
+        mapped.write("before\n", level=LogLevel.info)
+        collector = Collector(self.path, handler=mapped)
+        collector.start()
+        handler = CollectorHandler(self.path)
+        handler.write("collected\n", level=LogLevel.info)
+        collector.stop()
+        mapped.close()  # as at exit in the parent
+
+        assert collector.process.exitcode == 0
+        with open(path) as fh:
+            assert fh.read() == "before\ncollected\n"
+        handler.close()
+
+    def test_start_with_gzip_file(self, tmp_path):
+        path = str(tmp_path / "collected.log.gz")
+        compressed = GzipFileHandler(path, background=True)
+        compressed.write("before\n", level=LogLevel.info)
+        compressed.flush()
+        collector = Collector(self.path, handler=compressed)
+        collector.start()
+        handler = CollectorHandler(self.path)
+        handler.write("collected\n", level=LogLevel.info)
+        collector.stop()
+        compressed.close()  # as at exit in the parent
+
+        assert collector.process.exitcode == 0
+        with gzip.open(path, "rt") as fh:
+            assert fh.read() == "before\ncollected\n"
+        handler.close()
+
+
+class TestCollectorHandler:
+    def setup_method(self, method):
+        self.path = f"/tmp/test_collector_handler_{os.getpid()}.sock"
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.server.bind(self.path)
+        self.handler = CollectorHandler(self.path)
+
+    def teardown_method(self, method):
+        self.handler.close()
+        self.server.close()
+        os.remove(self.path)
+
+    def test_datagram(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.error)
+        assert self.server.recv(1024) == bytes([LogLevel.error]) + b"Hello, world!\n"
+
+    def test_after_fork(self):
+        self.handler._after_fork()
+        assert self.handler.socket is None
+        self.handler._after_fork()  # no socket to close
+
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        assert self.server.recv(1024) == bytes([LogLevel.info]) + b"Hello, world!\n"
+
+    def test_close(self):
+        self.handler.close()
+        self.handler.close()
+        assert self.handler.socket is None
+
+    def test_create_name(self):
+        assert self.handler.name == f"collector {self.path}"
@@ -0,0 +1,187 @@
+import io
+import pytest
+import time
+
+from logging2.handlers.abc import Handler
+from logging2.handlers.dedupe import DedupeHandler
+from logging2.handlers.streaming import StreamingHandler
+from logging2.levels import LogLevel
+from logging2.loggers import Logger
+
+
+class RecordingHandler(Handler):
+    """A handler that keeps every entry it is given.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.flushes = 0
+        self.closed = False
+        super().__init__(name="recording", level=LogLevel.debug)
+
+    def write(self, message, level: LogLevel) -> None:
+        self.entries.append((message, level))
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestDedupeHandler:
+    def test_collapses_runs(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target)
+        for second in range(5):
+            handler.write(
+                f"2021-03-14T06:59:5{second}.000001+00:00 ERROR app: down\n",
+                LogLevel.error,
+            )
+        handler.write("2021-03-14T07:00:00.000001+00:00 INFO app: up\n", LogLevel.info)
+        handler.write("2021-03-14T07:00:01.000001+00:00 INFO app: up\n", LogLevel.info)
+        handler.close()
+
+        assert target.entries == [
+            ("2021-03-14T06:59:50.000001+00:00 ERROR app: down\n", LogLevel.error),
+            ("Last entry repeated 4 times\n", LogLevel.error),
+            ("2021-03-14T07:00:00.000001+00:00 INFO app: up\n", LogLevel.info),
+            ("Last entry repeated 1 times\n", LogLevel.info),
+        ]
+        assert handler.suppressed == 5
+        assert target.closed
+
+    def test_levels_differ(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target, timestamp_pattern=None)
+        handler.write("same\n", LogLevel.info)
+        handler.write("same\n", LogLevel.error)
+
+        assert len(target.entries) == 2
+
+    def test_force(self):
+        stream = io.StringIO()
+        handler = DedupeHandler(
+            StreamingHandler(name="warning", stream=stream, level=LogLevel.warning)
+        )
+        for _ in range(3):
+            handler.write("down\n", LogLevel.debug, force=True)
+        handler.write("skipped\n", LogLevel.debug)
+        handler.close()
+
+        assert stream.getvalue() == "down\nLast entry repeated 2 times\n"
+
+    def test_window(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target, window=0.01)
+        for _ in range(3):
+            handler.write("down\n", LogLevel.error)
+        for _ in range(100):
+            if len(target.entries) == 2:
+                break
+            time.sleep(0.01)
+        handler.write("down\n", LogLevel.error)  # starts a new run
+
+        assert [message for message, _ in target.entries] == [
+            "down\n",
+            "Last entry repeated 2 times\n",
+            "down\n",
+        ]
+
+    def test_bytes(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target)
+        handler.write(
+            b'{"timestamp":"2021-03-14T06:59:50+00:00","message":"down"}\n',
+            LogLevel.error,
+        )
+        handler.write(
+            b'{"timestamp":"2021-03-14T06:59:51+00:00","message":"down"}\n',
+            LogLevel.error,
+        )
+        handler.close()
+
+        assert target.entries[-1] == (
+            b'{"message":"Last entry repeated 1 times"}\n',
+            LogLevel.error,
+        )
+
+    def test_custom_summary(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target, summary="x{count}\n")
+        handler.write(b"down\n", LogLevel.error)
+        handler.write(b"down\n", LogLevel.error)
+        handler.close()
+
+        assert target.entries[-1] == (b"x1\n", LogLevel.error)
+
+    def test_text_around_the_timestamp_is_compared(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target)
+        handler.write("db 2021-03-14T06:59:50+00:00 down\n", LogLevel.error)
+        handler.write("db 2021-03-14T06:59:51+00:00 down\n", LogLevel.error)
+        handler.write("web 2021-03-14T06:59:52+00:00 down\n", LogLevel.error)
+        handler.write("web 2021-03-14T06:59:53+00:00 up\n", LogLevel.error)
+        handler.close()
+
+        assert [message for message, _ in target.entries] == [
+            "db 2021-03-14T06:59:50+00:00 down\n",
+            "Last entry repeated 1 times\n",
+            "web 2021-03-14T06:59:52+00:00 down\n",
+            "web 2021-03-14T06:59:53+00:00 up\n",
+        ]
+
+    def test_flush_keeps_the_run(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target)
+        handler.write("down\n", LogLevel.error)
+        handler.write("down\n", LogLevel.error)
+        handler.flush()
+        handler.write("down\n", LogLevel.error)
+
+        assert target.flushes == 1
+        assert handler._repeats == 2
+        handler._timer.cancel()
+
+    def test_min_level(self):
+        target = RecordingHandler()
+        handler = DedupeHandler(target, level=LogLevel.warning)
+        handler.write("skipped\n", LogLevel.info)
+
+        assert handler.min_level == LogLevel.warning
+        assert DedupeHandler(target).min_level == LogLevel.debug
+        assert target.entries == []
+
+    def test_with_logger(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="dedupe",
+            handler=DedupeHandler(StreamingHandler(stream=stream)),
+        )
+        for _ in range(1000):
+            logger.error("connection refused")
+        logger.info("recovered")
+        lines = stream.getvalue().splitlines()
+
+        assert len(lines) == 3
+        assert lines[0].endswith("ERROR dedupe: connection refused")
+        assert lines[1] == "Last entry repeated 999 times"
+        assert lines[2].endswith("INFO dedupe: recovered")
+
+    def test_after_fork(self):
+        handler = DedupeHandler(RecordingHandler())
+        handler.write("down\n", LogLevel.error)
+        handler.write("down\n", LogLevel.error)
+        timer = handler._timer
+        handler._after_fork()
+        timer.cancel()
+
+        assert (handler._last, handler._repeats) == (None, 0)
+        assert handler._timer is not timer
+
+    def test_no_handlers(self):
+        with pytest.raises(ValueError):
+            DedupeHandler()
+
+    def test_create_name(self):
+        assert DedupeHandler(RecordingHandler()).name == "dedupe-recording"
@@ -1,7 +1,18 @@
 import codecs
+import gzip
+import mmap
 import os
+import pytest
+import time
+import zlib
 
-from logging2.handlers.files import FileHandler
+from logging2.handlers import abc
+from logging2.handlers.files import (
+    FileHandler,
+    GzipFileHandler,
+    MappedFileHandler,
+    RotatingFileHandler,
+)
 from logging2.levels import LogLevel
 
 
@@ -32,5 +43,645 @@ class TestFileHandler:
 
         assert output == [message]
 
+    def test_write_bytes(self):
+        message = bytes("안녕하세요", "utf8")
+
+        self.handler.write(message, level=LogLevel.info)
+        self.handler.flush()
+        with codecs.open(self.filename, "r", encoding="utf8") as fh:
+            output = [line for line in fh]
+
+        assert output == ["안녕하세요"]
+
     def test_create_name(self):
         assert self.handler.name == "test_file_handler.log"
+
+    def test_reopen(self):
+        self.handler.write("old\n", level=LogLevel.info)
+        os.rename(self.filename, self.filename + ".1")
+        self.handler.reopen()
+        self.handler.write("new\n", level=LogLevel.info)
+
+        with open(self.filename + ".1") as fh:
+            assert fh.read() == "old\n"
+        os.remove(self.filename + ".1")
+        with open(self.filename) as fh:
+            assert fh.read() == "new\n"
+
+    def test_close(self):
+        self.handler.close()
+        assert self.handler.fh.closed
+
+
+class TestBufferedFileHandler:
+    def setup_method(self, method):
+        self.filename = "/tmp/test_buffered_file_handler.log"
+        self.handler = FileHandler(
+            self.filename, buffer_size=64, flush_interval=60, flush_level=LogLevel.error
+        )
+
+    def teardown_method(self, method):
+        self.handler.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def read(self):
+        with codecs.open(self.filename, "r", encoding="utf8") as fh:
+            return fh.read()
+
+    def test_after_fork_discards_parent_buffer(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        timer = self.handler._timer
+        self.handler._after_fork()
+        self.handler.write("child\n", level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.read() == "child\n"
+        assert self.handler._timer is not timer
+
+    def test_fork(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            self.handler.write("child\n", level=LogLevel.info)
+            self.handler.flush()
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+        self.handler.flush()
+
+        assert self.read() == "child\nparent\n"
+
+    def test_write_is_buffered(self):
+        message = "Hello, world!\n"
+        self.handler.write(message, level=LogLevel.info)
+
+        assert self.read() == ""
+
+        self.handler.flush()
+
+        assert self.read() == message
+
+    def test_write_non_ascii(self):
+        message = "안녕하세요\n"
+        self.handler.write(message, level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.read() == message
+
+    def test_write_below_level(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.debug)
+        self.handler.flush()
+
+        assert self.read() == ""
+
+    def test_write_bytes(self):
+        self.handler.write(bytes("안녕하세요\n", "utf8"), level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.read() == "안녕하세요\n"
+
+    def test_flush_when_full(self):
+        messages = [f"message number {i}\n" for i in range(4)]  # 18 bytes each
+        for message in messages:
+            self.handler.write(message, level=LogLevel.info)
+
+        assert self.read() == "".join(messages[:3])
+
+    def test_flush_level(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        self.handler.write("Boom\n", level=LogLevel.error)
+
+        assert self.read() == "Hello\nBoom\n"
+
+    def test_flush_interval(self):
+        handler = FileHandler(self.filename, buffer_size=64, flush_interval=0.01)
+        handler.write("Hello\n", level=LogLevel.info)
+        for _ in range(100):
+            if self.read():
+                break
+            time.sleep(0.01)
+        handler.close()
+
+        assert self.read() == "Hello\n"
+
+    def test_oversized_entry(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        message = "x" * 100 + "\n"
+        self.handler.write(message, level=LogLevel.info)
+
+        assert self.read() == "Hello\n" + message
+
+    def test_mode_w(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        self.handler.close()
+        self.handler = FileHandler(self.filename, mode="w", buffer_size=64)
+        self.handler.write("World\n", level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.read() == "World\n"
+
+    def test_reopen(self):
+        self.handler.write("old\n", level=LogLevel.info)
+        os.rename(self.filename, self.filename + ".1")
+        self.handler.reopen()
+        self.handler.write("new\n", level=LogLevel.info)
+        self.handler.flush()
+
+        with open(self.filename + ".1") as fh:
+            assert fh.read() == "old\n"
+        os.remove(self.filename + ".1")
+        assert self.read() == "new\n"
+
+    def test_close_twice(self):
+        self.handler.close()
+        fd = os.open(self.filename, os.O_RDONLY)  # may reuse the closed descriptor
+        try:
+            self.handler.close()
+            os.fstat(fd)
+        finally:
+            os.close(fd)
+
+        assert self.handler.fd is None
+
+    def test_after_close(self):
+        self.handler.write("before\n", level=LogLevel.info)
+        self.handler.close()
+        self.handler.write("dropped\n", level=LogLevel.info)
+        self.handler.flush()
+        self.handler.reopen()
+
+        assert self.read() == "before\n"
+        assert self.handler._offset == 0
+
+    def test_unsupported_mode(self):
+        with pytest.raises(ValueError):
+            FileHandler(self.filename, mode="r+", buffer_size=64)
+
+    def test_create_name(self):
+        assert self.handler.name == "test_buffered_file_handler.log"
+
+
+class TestMappedFileHandler:
+    def setup_method(self, method):
+        self.filename = "/tmp/test_mapped_file_handler.log"
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self.handler = MappedFileHandler(self.filename, segment_size=1)
+
+    def teardown_method(self, method):
+        self.handler.close()
+        os.remove(self.filename)
+
+    def read(self):
+        with open(self.filename, "rb") as fh:
+            return fh.read()
+
+    def test_write(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        self.handler.write(bytes("안녕하세요\n", "utf8"), level=LogLevel.info)
+        self.handler.write("skipped\n", level=LogLevel.debug)
+
+        assert len(self.read()) == mmap.ALLOCATIONGRANULARITY  # preallocated
+        self.handler.close()
+        assert self.read() == bytes("Hello, world!\n안녕하세요\n", "utf8")
+
+    def test_segment_size_is_rounded_up(self):
+        assert self.handler.segment_size == mmap.ALLOCATIONGRANULARITY
+
+    def test_rolls_to_next_segment(self):
+        entries = [f"{i:09d}\n" for i in range(1000)]  # 10 bytes each, two and a half segments
+        for entry in entries:
+            self.handler.write(entry, level=LogLevel.info)
+        self.handler.close()
+
+        assert self.read() == "".join(entries).encode()
+
+    def test_oversized_entry(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        message = "x" * (3 * mmap.ALLOCATIONGRANULARITY) + "\n"
+        self.handler.write(message, level=LogLevel.info)
+        self.handler.write("World\n", level=LogLevel.info)
+        self.handler.close()
+
+        assert self.read() == f"Hello\n{message}World\n".encode()
+
+    def test_appends_to_existing_file(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        self.handler.close()
+        self.handler = MappedFileHandler(self.filename, segment_size=1)
+        self.handler.write("World\n", level=LogLevel.info)
+        self.handler.close()
+
+        assert self.read() == b"Hello\nWorld\n"
+
+    def test_sync_interval(self):
+        handler = MappedFileHandler(self.filename, sync_interval=0.01)
+        synced = []
+        handler._map = FlushRecorder(handler._map, synced)
+        handler.write("Hello\n", level=LogLevel.info)
+        for _ in range(100):
+            if synced:
+                break
+            time.sleep(0.01)
+        handler.close()
+
+        assert synced
+
+    def test_sync_on_roll(self):
+        handler = MappedFileHandler(self.filename, segment_size=1, sync_interval=60)
+        synced = []
+        handler._map = FlushRecorder(handler._map, synced)
+        handler.write("x" * mmap.ALLOCATIONGRANULARITY + "\n", level=LogLevel.info)
+        handler.close()
+
+        assert synced
+
+    def test_after_fork(self):
+        self.handler.close()
+        handler = MappedFileHandler(self.filename, sync_interval=60)
+        timer = handler._timer
+        handler.write("parent\n", level=LogLevel.info)
+        handler._after_fork()
+        handler.write("child\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler.dropped == 0
+        assert handler._timer is not timer
+        assert self.read() == b"parent\nchild\n"
+
+    def test_fork(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            self.handler.write("child\n" * 1000, level=LogLevel.info)  # past the segment
+            self.handler.close()
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+        self.handler.close()
+
+        assert self.read() == b"parent\n" + b"child\n" * 1000
+
+    def test_fork_child_not_closed(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            self.handler.write("child\n", level=LogLevel.info)
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+        self.handler.close()
+        data = self.read()
+
+        assert len(data) == mmap.ALLOCATIONGRANULARITY
+        assert data.rstrip(b"\0") == b"parent\nchild\n"
+
+    def test_close_twice(self):
+        self.handler.close()
+        self.handler.close()
+        assert self.handler.fd is None
+
+    def test_write_after_close(self):
+        self.handler.close()
+        self.handler.write("dropped\n", level=LogLevel.info)
+
+        assert self.handler.dropped == 1
+
+    def test_create_name(self):
+        assert self.handler.name == "test_mapped_file_handler.log"
+
+
+class TestGzipFileHandler:
+    def setup_method(self, method):
+        self.filename = "/tmp/test_gzip_file_handler.log.gz"
+        self.handler = GzipFileHandler(self.filename, buffer_size=64, flush_interval=60)
+
+    def teardown_method(self, method):
+        self.handler.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def read(self):
+        with open(self.filename, "rb") as fh:
+            return gzip.decompress(fh.read()).decode("utf8")
+
+    def read_partial(self):
+        with open(self.filename, "rb") as fh:
+            return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(fh.read())
+
+    def test_write(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        self.handler.write(b"bytes\n", level=LogLevel.info)
+        self.handler.write("below\n", level=LogLevel.debug)
+        self.handler.close()
+
+        assert self.read() == "Hello, world!\nbytes\n"
+
+    def test_readable_while_written(self):
+        self.handler.write("first\n", level=LogLevel.info)
+        assert self.read_partial() == b""
+
+        self.handler.flush()
+        assert self.read_partial() == b"first\n"
+
+        self.handler.write("x" * 100 + "\n", level=LogLevel.info)
+        assert self.read_partial() == b"first\n" + b"x" * 100 + b"\n"
+
+    def test_flush_level(self):
+        self.handler.write("error\n", level=LogLevel.error)
+        assert self.read_partial() == b"error\n"
+
+    def test_compress_level(self):
+        self.handler.close()
+        handler = GzipFileHandler(self.filename, mode="w", compress_level=0)
+        handler.write("a" * 1000 + "\n", level=LogLevel.info)
+        handler.close()
+
+        assert os.path.getsize(self.filename) > 1000
+        assert self.read() == "a" * 1000 + "\n"
+
+    def test_appends_member(self):
+        self.handler.write("first\n", level=LogLevel.info)
+        self.handler.close()
+        handler = GzipFileHandler(self.filename)
+        handler.write("second\n", level=LogLevel.info)
+        handler.close()
+
+        assert self.read() == "first\nsecond\n"
+
+    def test_mode_w(self):
+        self.handler.write("first\n", level=LogLevel.info)
+        self.handler.close()
+        handler = GzipFileHandler(self.filename, mode="w")
+        handler.write("second\n", level=LogLevel.info)
+        handler.close()
+
+        assert self.read() == "second\n"
+
+    def test_background(self):
+        self.handler.close()
+        handler = GzipFileHandler(
+            self.filename, mode="w", buffer_size=64, background=True
+        )
+        entries = [f"entry {i}" for i in range(100)]
+        for entry in entries:
+            handler.write(entry + "\n", level=LogLevel.info)
+        handler.flush()
+
+        assert self.read_partial().decode().splitlines() == entries
+
+        handler.close()
+        assert not handler._worker.is_alive()
+        assert self.read().splitlines() == entries
+
+    def test_background_write_error(self):
+        self.handler.close()
+        handler = GzipFileHandler(self.filename, mode="w", background=True)
+        os.close(handler.fd)
+        handler.fd = os.open("/dev/null", os.O_RDONLY)
+        handler.write("lost\n", level=LogLevel.info)
+        handler.flush()
+
+        assert handler.write_errors == 1
+        handler.fd = os.open(self.filename, os.O_WRONLY)
+        handler.close()
+
+    def test_reopen(self):
+        self.handler.close()
+        handler = GzipFileHandler(self.filename, mode="w", background=True)
+        handler.write("old\n", level=LogLevel.info)
+        os.rename(self.filename, self.filename + ".1")
+        handler.reopen()
+        handler.write("new\n", level=LogLevel.info)
+        handler.close()
+
+        with open(self.filename + ".1", "rb") as fh:
+            assert gzip.decompress(fh.read()) == b"old\n"
+        os.remove(self.filename + ".1")
+        assert self.read() == "new\n"
+
+    def test_after_fork(self):
+        self.handler.close()
+        handler = GzipFileHandler(self.filename, mode="w", background=True)
+        handler.write("parent\n", level=LogLevel.info)
+        handler._before_fork()
+        worker = handler._worker
+        handler._after_fork()
+        handler.write("child\n", level=LogLevel.info)
+        handler.write("below\n", level=LogLevel.debug)
+        handler.close()
+
+        assert handler._worker is not worker
+        assert self.read() == "parent\nchild\n"
+
+    def test_before_fork_without_entries(self):
+        self.handler._before_fork()
+        assert os.path.getsize(self.filename) == 0
+
+        self.handler.write("Hello\n", level=LogLevel.info)
+        self.handler.close()
+        self.handler._before_fork()
+
+        assert self.read() == "Hello\n"
+
+    def test_fork(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            self.handler.write("child\n", level=LogLevel.info)
+            self.handler.close()
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+        self.handler.close()
+
+        assert self.read() == "parent\nchild\n"
+
+    def test_before_fork_errors_are_printed(self, monkeypatch, capsys):
+        def fail():
+            raise OSError("disk full")
+
+        monkeypatch.setattr(self.handler, "_before_fork", fail)
+        abc._before_fork()
+
+        assert "OSError: disk full" in capsys.readouterr().err
+
+    def test_close_twice(self):
+        self.handler.close()
+        self.handler.close()
+
+    def test_create_name(self):
+        assert self.handler.name == "test_gzip_file_handler.log.gz"
+
+
+class TestRotatingFileHandler:
+    @pytest.fixture(autouse=True)
+    def directory(self, tmp_path):
+        self.directory = tmp_path
+        self.filename = str(tmp_path / "app.log")
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name != "app.log")
+
+    def read(self, name="app.log"):
+        path = os.path.join(self.directory, name)
+        if name.endswith(".gz"):
+            with gzip.open(path, "rt") as fh:
+                return fh.read()
+        with open(path) as fh:
+            return fh.read()
+
+    def test_rotates_on_size(self):
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=20, flush_level=LogLevel.debug
+        )
+        for i in range(5):
+            handler.write(f"entry {i:02d}\n", level=LogLevel.info)  # 9 bytes each
+        handler.close()
+
+        segments = self.segments()
+        assert handler.rotations == 2
+        assert [self.read(name) for name in segments] == [
+            "entry 00\nentry 01\n",
+            "entry 02\nentry 03\n",
+        ]
+        assert self.read() == "entry 04\n"
+
+    def test_segment_path(self, monkeypatch):
+        rotated_at = time.struct_time((2017, 4, 29, 17, 8, 23, 5, 119, 0))
+        monkeypatch.setattr(time, "gmtime", lambda: rotated_at)
+        handler = RotatingFileHandler(self.filename)
+        handler.close()
+        open(self.filename + ".20170429-170823", "w").close()
+        open(self.filename + ".20170429-170823-1.gz", "w").close()
+
+        assert handler._segment_path() == self.filename + ".20170429-170823-2"
+
+    def test_counts_existing_file(self):
+        with open(self.filename, "w") as fh:
+            fh.write("x" * 15 + "\n")
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=20, flush_level=LogLevel.debug
+        )
+        handler.write("entry\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler.rotations == 1
+        assert self.read() == "entry\n"
+
+    def test_oversized_chunk(self):
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=4, flush_level=LogLevel.debug
+        )
+        handler.write("too long\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler.rotations == 0
+        assert self.read() == "too long\n"
+
+    def test_rotates_on_interval(self):
+        handler = RotatingFileHandler(
+            self.filename, interval=3600, flush_level=LogLevel.debug
+        )
+        assert handler._rollover_at % 3600 == 0
+        assert handler._rollover_at > time.time()
+
+        handler._rollover_at = time.time()
+        handler.write("first\n", level=LogLevel.info)  # the file is empty
+        assert handler.rotations == 0
+        handler.write("second\n", level=LogLevel.info)
+        handler._rollover_at = time.time()
+        handler.write("third\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler.rotations == 1
+        assert handler._rollover_at > time.time()
+        assert self.read(self.segments()[0]) == "first\nsecond\n"
+        assert self.read() == "third\n"
+
+    def test_compress_and_prune(self):
+        handler = RotatingFileHandler(
+            self.filename,
+            max_bytes=1,
+            flush_level=LogLevel.debug,
+            backup_count=2,
+            compress=True,
+        )
+        for i in range(5):
+            handler.write(f"entry {i}\n", level=LogLevel.info)
+        handler.close()
+
+        segments = self.segments()
+        assert handler.rotations == 4
+        assert all(name.endswith(".gz") for name in segments)
+        assert [self.read(name) for name in segments] == ["entry 2\n", "entry 3\n"]
+        assert handler.maintenance_errors == 0
+
+    def test_prune_only(self):
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=1, flush_level=LogLevel.debug, backup_count=0
+        )
+        handler.write("entry 0\n", level=LogLevel.info)
+        handler.write("entry 1\n", level=LogLevel.info)
+        handler.close()
+
+        assert self.segments() == []
+        assert self.read() == "entry 1\n"
+
+    def test_maintenance_error(self):
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=1, flush_level=LogLevel.debug, compress=True
+        )
+        handler._segments.put(str(self.directory))
+        handler.close()
+
+        assert handler.maintenance_errors == 1
+
+    def test_after_fork(self):
+        handler = RotatingFileHandler(
+            self.filename, max_bytes=1, backup_count=1, flush_interval=60
+        )
+        worker = handler._worker
+        handler.write("parent\n", level=LogLevel.info)
+        handler._after_fork()
+        handler.write("child\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler._worker is not worker
+        assert self.read() == "child\n"
+
+    def test_close_twice(self):
+        handler = RotatingFileHandler(self.filename)
+        handler.close()
+        handler.close()
+
+    def test_create_name(self):
+        handler = RotatingFileHandler(self.filename)
+        handler.close()
+        assert handler.name == "app.log"
+
+
+class FlushRecorder:
+    """Wraps a map, recording each ``flush``.
+    """
+
+    def __init__(self, mapped, synced):
+        self.mapped = mapped
+        self.synced = synced
+
+    def __getattr__(self, name):
+        return getattr(self.mapped, name)
+
+    def __len__(self):
+        return len(self.mapped)
+
+    def __getitem__(self, key):
+        return self.mapped[key]
+
+    def __setitem__(self, key, value):
+        self.mapped[key] = value
+
+    def flush(self):
+        self.synced.append(True)
+        self.mapped.flush()
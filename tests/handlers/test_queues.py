@@ -0,0 +1,256 @@
+import io
+import pytest
+import threading
+
+from logging2.handlers.abc import Handler
+from logging2.handlers.queues import OverflowPolicy, QueueHandler
+from logging2.handlers.streaming import StreamingHandler
+from logging2.levels import LogLevel
+
+
+class GatedHandler(Handler):
+    """A handler whose writes block until its gate is opened.
+    """
+
+    def __init__(self, fail: bool = False):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.messages = []
+        self.flushes = 0
+        self.fail = fail
+        super().__init__(name="gated", level=LogLevel.debug)
+
+    def write(self, message: str, level: LogLevel) -> None:
+        self.started.set()
+        self.gate.wait()
+        if self.fail:
+            raise RuntimeError(message)
+        self.messages.append(message)
+
+    def flush(self) -> None:
+        if self.fail:
+            raise RuntimeError("flush")
+        self.flushes += 1
+
+
+def fill(handler: QueueHandler, target: GatedHandler, count: int) -> None:
+    """Parks the listener on the first entry, then fills the queue.
+    """
+    handler.write("first", level=LogLevel.info)
+    target.started.wait()
+    for i in range(count):
+        handler.write(f"{i}", level=LogLevel.info)
+
+
+class TestQueueHandler:
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+        self.target = StreamingHandler(name="test", stream=self.stream)
+        self.handler = QueueHandler(handler=self.target)
+
+    def teardown_method(self, method):
+        self.handler.close()
+
+    def test_write(self):
+        message = "Hello, world!"
+        self.handler.write(message, level=LogLevel.info)
+        self.handler.flush()
+        assert self.stream.getvalue() == message
+
+    def test_write_non_ascii(self):
+        message = "안녕하세요"
+        self.handler.write(message, level=LogLevel.info)
+        self.handler.flush()
+        assert self.stream.getvalue() == message
+
+    def test_write_below_level(self):
+        self.handler.write("Hello, world!", level=LogLevel.debug)
+        self.handler.flush()
+        assert self.stream.getvalue() == ""
+
+    def test_force(self):
+        self.handler.write("forced", level=LogLevel.debug, force=True)
+        self.handler.flush()
+        assert self.stream.getvalue() == "forced"
+
+        self.handler.close()
+        self.handler.write(" late", level=LogLevel.debug, force=True)
+        assert self.stream.getvalue() == "forced late"
+
+    def test_multiple_handlers(self):
+        stream = io.StringIO()
+        handler = QueueHandler(
+            handlers=[self.target, StreamingHandler(name="other", stream=stream)]
+        )
+        handler.write("Hello, world!", level=LogLevel.info)
+        handler.close()
+
+        assert self.stream.getvalue() == stream.getvalue() == "Hello, world!"
+
+    def test_level_defaults_to_wrapped_handlers(self):
+        target = StreamingHandler(stream=io.StringIO(), level=LogLevel.error)
+        handler = QueueHandler(handler=target)
+        assert handler.min_level == LogLevel.error
+        handler.close()
+
+    def test_no_handlers(self):
+        with pytest.raises(ValueError):
+            QueueHandler()
+
+    def test_close_drains(self):
+        for i in range(100):
+            self.handler.write(f"{i}\n", level=LogLevel.info)
+        self.handler.close()
+        self.handler.close()
+
+        assert self.stream.getvalue() == "".join(f"{i}\n" for i in range(100))
+
+    def test_write_after_close(self):
+        self.handler.close()
+        self.handler.write("late", level=LogLevel.info)
+        assert self.stream.getvalue() == "late"
+
+    def test_write_while_closing(self):
+        failing = GatedHandler(fail=True)
+        failing.gate.set()
+        handler = QueueHandler(handlers=[self.target, failing])
+        put_nowait = handler.queue.put_nowait
+
+        def close_then_put(entry):
+            # the writer passed the closed check, then the handler was closed before the entry was queued
+            closing = threading.Thread(target=handler.close)
+            closing.start()
+            closing.join()
+            put_nowait(entry)
+
+        handler.queue.put_nowait = close_then_put
+        handler.write("late", level=LogLevel.info)
+
+        assert self.stream.getvalue() == "late"
+        assert handler.errors == 2  # the flush when closing, then the late entry
+
+    def test_drop_oldest_while_closing(self):
+        target = GatedHandler()
+        handler = QueueHandler(
+            handler=target, max_size=1, overflow=OverflowPolicy.drop_oldest
+        )
+        handler.write("first", level=LogLevel.info)
+        target.started.wait()
+        closing = threading.Thread(target=handler.close)
+        closing.start()
+        while not handler.queue.full():  # the sentinel is queued
+            pass
+        opening = threading.Timer(0.05, target.gate.set)
+        opening.start()
+        # a writer that passed the closed check finds the queue full, and the oldest entry is the sentinel
+        handler._overflow("late", LogLevel.info)
+        handler._drain()  # as the writer does once it sees the handler closed
+        closing.join()
+        opening.join()
+
+        assert target.messages == ["first", "late"]
+        assert handler.dropped == 0
+
+    def test_flushes_when_empty(self):
+        target = GatedHandler()
+        target.gate.set()
+        handler = QueueHandler(handler=target)
+        handler.write("Hello, world!", level=LogLevel.info)
+        handler.flush()
+
+        assert target.messages == ["Hello, world!"]
+        assert target.flushes >= 1
+        handler.close()
+
+    def test_drop_newest(self):
+        target = GatedHandler()
+        handler = QueueHandler(
+            handler=target, max_size=2, overflow=OverflowPolicy.drop_newest
+        )
+        fill(handler, target, 4)
+        target.gate.set()
+        handler.close()
+
+        assert target.messages == ["first", "0", "1"]
+        assert handler.dropped == 2
+        assert handler.dropped_by_level[LogLevel.info] == 2
+
+    def test_drop_oldest(self):
+        target = GatedHandler()
+        handler = QueueHandler(
+            handler=target, max_size=2, overflow=OverflowPolicy.drop_oldest
+        )
+        fill(handler, target, 4)
+        target.gate.set()
+        handler.close()
+
+        assert target.messages == ["first", "2", "3"]
+        assert handler.dropped == 2
+
+    def test_drop_below_level(self):
+        target = GatedHandler()
+        handler = QueueHandler(
+            handler=target,
+            max_size=2,
+            overflow=OverflowPolicy.drop_below_level,
+            overflow_level=LogLevel.error,
+        )
+        fill(handler, target, 3)
+
+        writer = threading.Thread(
+            target=handler.write, args=("important",), kwargs={"level": LogLevel.error}
+        )
+        writer.start()
+        writer.join(timeout=0.1)
+        assert writer.is_alive()  # blocked until there's room
+
+        target.gate.set()
+        writer.join()
+        handler.close()
+
+        assert target.messages == ["first", "0", "1", "important"]
+        assert handler.dropped_by_level[LogLevel.info] == 1
+
+    def test_block(self):
+        target = GatedHandler()
+        handler = QueueHandler(handler=target, max_size=1)
+        fill(handler, target, 1)
+
+        writer = threading.Thread(
+            target=handler.write, args=("blocked",), kwargs={"level": LogLevel.info}
+        )
+        writer.start()
+        writer.join(timeout=0.1)
+        assert writer.is_alive()
+
+        target.gate.set()
+        writer.join()
+        handler.close()
+
+        assert target.messages == ["first", "0", "blocked"]
+        assert handler.dropped == 0
+
+    def test_errors_are_counted(self):
+        target = GatedHandler(fail=True)
+        target.gate.set()
+        handler = QueueHandler(handler=target)
+        handler.write("boom", level=LogLevel.info)
+        handler.close()
+
+        assert handler.errors == 2  # the write and the flush
+
+    def test_after_fork(self):
+        listener, parent_queue = self.handler._listener, self.handler.queue
+        self.handler._after_fork()
+        parent_queue.put(QueueHandler._SENTINEL)  # stands in for the parent's listener not surviving the fork
+        listener.join()
+
+        assert self.handler.queue is not parent_queue
+        assert self.handler._listener.is_alive()
+
+        self.handler.write("child", level=LogLevel.info)
+        self.handler.flush()
+        assert self.stream.getvalue() == "child"
+
+    def test_create_name(self):
+        assert self.handler.name == "queue-test"
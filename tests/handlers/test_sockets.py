@@ -1,8 +1,14 @@
 import os
+import pytest
 import socket
 import syslog
+import threading
+import time
 
+from logging2.formatters import SyslogFormatter
 from logging2.handlers.sockets import (
+    ReconnectingTcpHandler,
+    SocketHandler,
     SyslogHandler,
     TcpHandler,
     TcpIPv6Handler,
@@ -60,6 +66,78 @@ class TestSyslogHandler:
 
         assert messages == expected
 
+    def test_write_bytes(self):
+        message = b"Hello, world!"
+        self.handler.write(message, level=LogLevel.info)
+        data, address = self.server.recvfrom(1024)
+
+        priority = self.handler._get_priority(LogLevel.info)
+        assert data == b"<%d>%b\000" % (priority, message)
+
+    def test_after_fork(self):
+        parent_socket = self.handler.socket
+        self.handler._after_fork()
+        assert self.handler.socket is None
+        assert parent_socket.fileno() == -1
+
+        self.handler.write("Hello, world!", level=LogLevel.info)
+        data, address = self.server.recvfrom(1024)
+
+        priority = self.handler._get_priority(LogLevel.info)
+        assert data == bytes(f"<{priority}>Hello, world!\000", "utf8")
+
+    def test_priority(self):
+        assert self.handler._get_priority(LogLevel.warning) == 12  # user.warning
+
+    def test_rfc5424(self):
+        handler = SyslogHandler(
+            host=self.host,
+            port=self.port,
+            rfc=SyslogFormatter.RFC5424,
+            hostname="web-1",
+            app_name="api",
+            procid="42",
+            structured_data={"env": "prod"},
+        )
+        handler.write("Hello, world!\n", level=LogLevel.info)
+        data, address = self.server.recvfrom(1024)
+
+        assert data.startswith(b"<14>1 ")
+        assert data.endswith(b' web-1 api 42 - [context@32473 env="prod"] Hello, world!')
+
+    def test_stream_octet_counting(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind((self.host, 0))
+        server.listen(1)
+        handler = SyslogHandler(
+            host=self.host,
+            port=server.getsockname()[1],
+            hostname="web-1",
+            socket_type=socket.SOCK_STREAM,
+        )
+        connection, address = server.accept()
+        handler.write("one\n", level=LogLevel.info)
+        handler.write(b"two\nlines\n", level=LogLevel.error)
+        handler.close()
+
+        data = b""
+        while True:
+            chunk = connection.recv(1024)
+            if not chunk:
+                break
+            data += chunk
+        connection.close()
+        server.close()
+
+        frames = []
+        while data:
+            length, data = data.split(b" ", 1)
+            frames.append(data[: int(length)])
+            data = data[int(length) :]
+        assert len(frames) == 2
+        assert frames[0].startswith(b"<14>1 ") and frames[0].endswith(b" - - one")
+        assert frames[1].startswith(b"<11>1 ") and frames[1].endswith(b" - - two\nlines")
+
     def test_create_name(self):
         assert self.handler.name == "syslog-{}".format(syslog.LOG_USER)
 
@@ -109,6 +187,15 @@ class TestTcpHandler:
         expected = [bytes(message, "utf8")]
         assert messages == expected
 
+    def test_after_fork(self):
+        self.server.accept()[0].close()  # the parent's connection
+        self.handler._after_fork()
+        self.handler.write("Hello, world!", level=LogLevel.info)
+
+        connection, address = self.server.accept()
+        with connection:
+            assert connection.recv(1024) == b"Hello, world!"
+
     def test_create_name(self):
         assert self.handler.name == "TCP {}:{}".format(self.host, self.port)
 
@@ -203,6 +290,34 @@ class TestUdpHandler:
         expected = [bytes(message, "utf8")]
         assert messages == expected
 
+    def test_write_bytes(self):
+        message = b"Hello, world!"
+        self.handler.write(message, level=LogLevel.info)
+        data, address = self.server.recvfrom(1024)
+
+        assert data == message
+
+    def test_after_fork(self):
+        self.handler._after_fork()
+        assert self.handler.socket is None
+        self.handler._after_fork()  # no socket to close
+
+        self.handler.write("Hello, world!", level=LogLevel.info)
+        data, address = self.server.recvfrom(1024)
+
+        assert data == b"Hello, world!"
+
+    def test_packet_size(self):
+        handler = UdpHandler(
+            host=self.host, port=self.port, packet_size=UdpHandler.ETHERNET_UDP_PAYLOAD
+        )
+        handler.write("Hello\n", level=LogLevel.info)
+        handler.write("world\n", level=LogLevel.info)
+        handler.close()
+        data, address = self.server.recvfrom(2048)
+
+        assert data == b"Hello\nworld\n"
+
     def test_create_name(self):
         assert self.handler.name == "UDP {}:{}".format(self.host, self.port)
 
@@ -296,3 +411,309 @@ class TestUnixHandler:
 
     def test_create_name(self):
         assert self.handler.name == "UNIX {}".format(self.node)
+
+
+class TestPackedUnixHandler:
+    def setup_method(self, method):
+        self.node = "/tmp/packed_unix.node"
+        if os.path.exists(self.node):
+            os.remove(self.node)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.server.bind(self.node)
+        self.server.settimeout(5)
+
+        self.handler = UnixSocketHandler(node=self.node, packet_size=16, linger=60)
+
+    def teardown_method(self, method):
+        self.handler.close()
+        self.server.close()
+        os.remove(self.node)
+
+    def test_packs_until_full(self):
+        for message in ["one\n", "two\n", "three\n", "four\n"]:
+            self.handler.write(message, level=LogLevel.info)
+
+        assert self.server.recv(1024) == b"one\ntwo\nthree\n"
+
+        self.handler.flush()
+
+        assert self.server.recv(1024) == b"four\n"
+
+    def test_sends_exactly_full_packet(self):
+        self.handler.write("1234567\n", level=LogLevel.info)
+        self.handler.write(b"abcdefg\n", level=LogLevel.info)
+
+        assert self.server.recv(1024) == b"1234567\nabcdefg\n"
+        assert self.handler._packet == []
+
+    def test_appends_new_line(self):
+        self.handler.write("Hello", level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.server.recv(1024) == b"Hello\n"
+
+    def test_write_below_level(self):
+        handler = UnixSocketHandler(
+            node=self.node, packet_size=16, level=LogLevel.error
+        )
+        handler.write("Hello\n", level=LogLevel.info)
+        handler.close()
+
+        assert handler._packet == []
+
+    def test_truncates_oversized_entries(self):
+        self.handler.write("x" * 32 + "\n", level=LogLevel.info)
+
+        assert self.server.recv(1024) == b"x" * 15 + b"\n"
+        assert self.handler.truncated == 1
+
+    def test_truncates_on_character_boundary(self):
+        self.handler.write("ab안녕하세요\n", level=LogLevel.info)  # 3 bytes per character
+        self.handler.flush()
+
+        assert self.server.recv(1024) == bytes("ab안녕하세\n", "utf8")
+
+    def test_linger(self):
+        handler = UnixSocketHandler(node=self.node, packet_size=1024, linger=0.01)
+        handler.write("Hello\n", level=LogLevel.info)
+
+        assert self.server.recv(1024) == b"Hello\n"
+        handler.close()
+
+    def test_send_errors_are_counted(self):
+        self.handler.write("Hello\n", level=LogLevel.info)
+        self.server.close()
+        os.remove(self.node)
+        self.handler.flush()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.server.bind(self.node)
+
+        assert self.handler.errors == 1
+
+    def test_after_fork(self):
+        self.handler.write("parent\n", level=LogLevel.info)
+        timer = self.handler._timer
+        self.handler._after_fork()
+        self.handler.write("child\n", level=LogLevel.info)
+        self.handler.flush()
+
+        assert self.server.recv(1024) == b"child\n"
+        assert self.handler._timer is not timer
+
+    def test_stream_sockets_cannot_pack(self):
+        with pytest.raises(ValueError):
+            SocketHandler(
+                host="localhost",
+                port=8090,
+                family=socket.AF_INET,
+                type=socket.SOCK_STREAM,
+                packet_size=1024,
+            )
+
+
+class TestReconnectingTcpHandler:
+    def setup_method(self, method):
+        self.host = "localhost"
+        with socket.socket() as probe:
+            probe.bind((self.host, 0))
+            self.port = probe.getsockname()[1]
+        self.server = None
+        self.received = []
+        self.handler = ReconnectingTcpHandler(
+            host=self.host, port=self.port, linger=0.01, backoff=0.01, max_backoff=0.05
+        )
+
+    def teardown_method(self, method):
+        self.handler.close()
+        if self.server is not None:
+            self.server.close()
+
+    def listen(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.port))
+        self.server.listen(5)
+
+        def accept():
+            connection, address = self.server.accept()
+            with connection:
+                while True:
+                    data = connection.recv(65536)
+                    if not data:
+                        break
+                    self.received.append(data)
+
+        thread = threading.Thread(target=accept, daemon=True)
+        thread.start()
+        return thread
+
+    def test_write(self):
+        thread = self.listen()
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        self.handler.write("안녕하세요\n", level=LogLevel.info)
+        self.handler.write("skipped\n", level=LogLevel.debug)
+        self.handler.close()
+        thread.join()
+
+        expected = bytes("Hello, world!\n안녕하세요\n", "utf8")
+        assert b"".join(self.received) == expected
+        assert self.handler.bytes_sent == len(expected)
+
+    def test_write_bytes(self):
+        thread = self.listen()
+        self.handler.write(b'{"message":"hi"}\n', level=LogLevel.info)
+        self.handler.close()
+        thread.join()
+
+        assert self.received == [b'{"message":"hi"}\n']
+
+    def test_coalesces_entries(self):
+        thread = self.listen()
+        handler = ReconnectingTcpHandler(host=self.host, port=self.port, linger=1)
+        messages = [f"{i}\n" for i in range(100)]
+        for message in messages:
+            handler.write(message, level=LogLevel.info)
+        handler.flush()
+        handler.close()
+        thread.join()
+
+        assert self.received == [bytes("".join(messages), "utf8")]
+
+    def test_batch_size(self):
+        thread = self.listen()
+        handler = ReconnectingTcpHandler(
+            host=self.host, port=self.port, batch_size=10, linger=1
+        )
+        batches = []
+        send = handler._send
+        handler._send = lambda data: batches.append(data) or send(data)
+        handler.write("0123456789", level=LogLevel.info)
+        handler.write("abcdefghij", level=LogLevel.info)
+        handler.close()
+        thread.join()
+
+        # the stream may deliver both batches in one read, so the batches are checked where they are sent
+        assert batches == [b"0123456789", b"abcdefghij"]
+        assert b"".join(self.received) == b"0123456789abcdefghij"
+
+    def test_spools_until_connected(self):
+        self.handler.write("Hello, world!\n", level=LogLevel.info)
+        self.handler.flush()
+        assert not self.handler.connected
+
+        thread = self.listen()
+        self.handler.write("again\n", level=LogLevel.info)
+        for _ in range(200):
+            self.handler.flush()
+            if self.handler.connected and not self.handler._spool:
+                break
+        self.handler.close()
+        thread.join()
+
+        assert b"".join(self.received) == b"Hello, world!\nagain\n"
+        assert self.handler.reconnects == 0
+
+    def test_reconnects(self):
+        thread = self.listen()
+        self.handler.write("first\n", level=LogLevel.info)
+        self.handler.flush()
+        self.handler.socket.shutdown(socket.SHUT_RDWR)  # simulate a dropped link
+        thread.join()
+
+        thread = self.listen()
+        self.handler.write("second\n", level=LogLevel.info)
+        for _ in range(200):
+            self.handler.flush()
+            if self.handler.reconnects and not self.handler._spool:
+                break
+        self.handler.close()
+        thread.join()
+
+        assert b"".join(self.received) == b"first\nsecond\n"
+        assert self.handler.reconnects == 1
+
+    def test_after_fork(self):
+        sender = self.handler._sender
+        self.handler.socket = socket.socket()  # the parent's connection
+        self.handler._spool.append(b"parent\n")  # spooled by the parent, not yet sent
+        self.handler._after_fork()
+
+        assert self.handler.socket is None
+        assert not self.handler._spool
+        assert self.handler._sender is not sender
+        assert self.handler._sender.is_alive()
+
+        thread = self.listen()
+        self.handler.write("child\n", level=LogLevel.info)
+        self.handler.close()
+        thread.join()
+
+        assert self.received == [b"child\n"]
+
+    def test_send_timeout(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.port))
+        self.server.listen(5)  # -- accepted by the kernel, never read
+        handler = ReconnectingTcpHandler(
+            host=self.host,
+            port=self.port,
+            batch_size=64 * 1024 * 1024,
+            linger=0,
+            backoff=1,
+            send_timeout=0.1,
+        )
+        handler.write(b"x" * 32 * 1024 * 1024, level=LogLevel.info)
+        start = time.monotonic()
+        handler.flush()
+
+        assert time.monotonic() - start < 5
+        assert handler._failures >= 1  # -- the sender may already be retrying
+        assert handler.bytes_sent == 0
+
+        handler.close()
+        assert handler.dropped == 1
+
+    def test_close_is_bounded(self):
+        handler = ReconnectingTcpHandler(
+            host=self.host, port=self.port, batch_size=2, linger=0, send_timeout=0.1
+        )
+        handler.DEFAULT_CONNECT_TIMEOUT = 0
+        started, release = threading.Event(), threading.Event()
+
+        def send(data):
+            started.set()
+            release.wait()
+            return False
+
+        handler._send = send
+        handler.write("0\n", level=LogLevel.info)
+        started.wait()
+        handler.write("1\n", level=LogLevel.info)
+        handler.write("2\n", level=LogLevel.info)
+        start = time.monotonic()
+        handler.close()
+
+        assert time.monotonic() - start < 1
+        assert handler.dropped == 2
+
+        release.set()
+        handler._sender.join()
+        assert handler.dropped == 3
+
+    def test_drops_oldest_when_spool_is_full(self):
+        handler = ReconnectingTcpHandler(
+            host=self.host, port=self.port, spool_size=2, linger=1, backoff=1
+        )
+        for i in range(3):
+            handler.write(f"{i}\n", level=LogLevel.info)
+
+        assert handler.dropped == 1
+        assert list(handler._spool) == [b"1\n", b"2\n"]
+
+        handler.close()
+        assert handler.dropped == 3
+
+    def test_create_name(self):
+        assert self.handler.name == "TCP {}:{}".format(self.host, self.port)
@@ -24,6 +24,10 @@ class TestStreamingHandler:
         output = self.stream.getvalue()
         assert output == message
 
+    def test_write_bytes(self):
+        self.handler.write(bytes("안녕하세요", "utf8"), level=LogLevel.info)
+        assert self.stream.getvalue() == "안녕하세요"
+
     def test_create_name(self):
         handler = StreamingHandler(stream=self.stream, name=None)
         expected_name = "StringIO"
@@ -0,0 +1,242 @@
+import io
+import os
+import pytest
+import signal
+import socket
+import time
+from uuid import uuid4
+
+from logging2 import LogRegister
+from logging2.control import (
+    ControlServer,
+    install_reopen_handler,
+    install_signal_handlers,
+)
+from logging2.handlers.abc import Handler
+from logging2.handlers.files import FileHandler
+from logging2.handlers.streaming import StreamingHandler
+from logging2.levels import LogLevel
+from logging2.loggers import Logger
+
+
+@pytest.fixture
+def tree():
+    """Registers a logger writing to an info handler, with a child and a sibling subtree.
+    """
+    root = f"control{uuid4().hex}"
+    handler = StreamingHandler(name=root, stream=io.StringIO())
+    parent = Logger(name=root, handler=handler, level=LogLevel.warning)
+    child = Logger(name=f"{root}.db")
+    sibling = Logger(name=f"{root}.api")
+    yield parent, child, sibling, handler
+    for logger in (parent, child, sibling):
+        LogRegister.reset_level(logger.name)
+
+
+class RecordingHandler(Handler):
+    def __init__(self):
+        self.entries = []
+        super().__init__(name=f"recording-{uuid4()}", level=LogLevel.warning)
+
+    def write(self, message, level, force=False):
+        if force or level >= self.min_level:
+            self.entries.append((level, force))
+
+
+def _wait_for(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        time.sleep(0.01)
+
+
+class TestSetLevel:
+    def test_set_and_reset(self, tree):
+        parent, child, sibling, handler = tree
+        LogRegister.set_level(child.name, LogLevel.debug)
+
+        assert (child.level, child._min_level) == (LogLevel.debug, LogLevel.debug)
+        assert handler.min_level == LogLevel.info  # the handler is left as it is
+        assert (
+            sibling._min_level == LogLevel.warning
+        )  # the parent's level still applies
+
+        LogRegister.reset_level(child.name)
+        assert (child.level, child._min_level) == (None, LogLevel.warning)
+        assert not child._overridden
+        LogRegister.reset_level(child.name)  # nothing left to reset
+
+    def test_only_the_subtree_logs_lower_entries(self, tree):
+        parent, child, sibling, handler = tree
+        parent.level = None  # the handler's level decides for the rest of the tree
+        other = StreamingHandler(name=f"{parent.name}-debug", stream=io.StringIO())
+        other.min_level = LogLevel.debug
+        sibling.add_handler(other)
+        grandchild = Logger(name=f"{child.name}.pool")
+        LogRegister.set_level(child.name, LogLevel.debug)
+
+        child.debug("child")
+        grandchild.debug("grandchild")
+        sibling.debug("sibling")
+        parent.debug("parent")
+        output = handler.stream.getvalue()
+
+        assert "DEBUG" in output and "child" in output and "grandchild" in output
+        assert "sibling" not in output
+        assert "parent" not in output
+        assert "sibling" in other.stream.getvalue()
+
+        LogRegister.reset_level(child.name)
+        child.debug("after reset")
+        assert "after reset" not in handler.stream.getvalue()
+
+    def test_instrumented(self, tree):
+        parent, child, sibling, handler = tree
+        child.instrumented = True
+        LogRegister.set_level(child.name, LogLevel.debug)
+        child.debug("counted")
+
+        assert "counted" in handler.stream.getvalue()
+        assert handler.stats()["emitted"] == 1
+        assert handler.stats()["filtered"] == 0
+
+    @pytest.mark.parametrize("instrumented", [False, True])
+    def test_handlers_get_the_real_level(self, tree, instrumented):
+        parent, child, sibling, handler = tree
+        recording = RecordingHandler()
+        child.add_handler(recording)
+        child.instrumented = instrumented
+        LogRegister.set_level(child.name, LogLevel.debug)
+        child.debug("forced")
+        child.error("accepted")
+
+        assert recording.entries == [(LogLevel.debug, True), (LogLevel.error, False)]
+
+    def test_reset_restores_first_levels(self, tree):
+        parent, child, sibling, handler = tree
+        LogRegister.set_level(child.name, LogLevel.info)
+        LogRegister.set_level(child.name, LogLevel.debug)
+        LogRegister.reset_level(child.name)
+
+        assert child.level is None
+        assert not child._overridden
+
+    def test_ttl(self, tree):
+        parent, child, sibling, handler = tree
+        LogRegister.set_level(child.name, LogLevel.debug, ttl=0.01)
+        _wait_for(lambda: child.level is None)
+
+        assert child._min_level == LogLevel.warning
+
+    def test_changed_again_before_expiring(self, tree):
+        parent, child, sibling, handler = tree
+        LogRegister.set_level(child.name, LogLevel.debug, ttl=0.01)
+        timer = LogRegister._changes[child.name][0]
+        LogRegister.set_level(child.name, LogLevel.debug)
+        LogRegister._expire(child.name, timer)  # a stale timer
+
+        assert child.level == LogLevel.debug
+
+    def test_unknown_logger(self):
+        with pytest.raises(ValueError):
+            LogRegister.set_level("missing", LogLevel.debug)
+
+    def test_get_levels(self, tree):
+        parent, child, sibling, handler = tree
+        levels = LogRegister.get_levels()
+
+        assert levels[parent.name] == (LogLevel.warning, LogLevel.warning)
+        assert levels[child.name] == (None, LogLevel.warning)
+
+
+class TestSignalHandlers:
+    def test_signals(self, tree):
+        parent, child, sibling, handler = tree
+        handlers = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+        install_signal_handlers([child.name, "missing"], ttl=None)
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            _wait_for(lambda: child.level is not None)
+            assert child._min_level == LogLevel.debug
+
+            os.kill(os.getpid(), signal.SIGUSR2)
+            _wait_for(lambda: child.level is None)
+            assert child._min_level == LogLevel.warning
+        finally:
+            signal.signal(signal.SIGUSR1, handlers[0])
+            signal.signal(signal.SIGUSR2, handlers[1])
+
+
+    def test_reopen(self, tmp_path):
+        path = str(tmp_path / "app.log")
+        handler = FileHandler(path, buffer_size=64, flush_interval=60)
+        previous = signal.getsignal(signal.SIGHUP)
+        install_reopen_handler([handler])
+        try:
+            handler.write("old\n", level=LogLevel.info)
+            os.rename(path, path + ".1")
+            os.kill(os.getpid(), signal.SIGHUP)
+            _wait_for(lambda: os.path.exists(path))
+            handler.close()
+
+            with open(path + ".1") as fh:
+                assert fh.read() == "old\n"
+        finally:
+            signal.signal(signal.SIGHUP, previous)
+
+
+class TestControlServer:
+    def test_commands(self, tree, tmp_path):
+        parent, child, sibling, handler = tree
+        path = str(tmp_path / "control.sock")
+        server = ControlServer(path)
+        server.start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+                stream = sock.makefile("rw")
+
+                def send(command: str) -> str:
+                    stream.write(f"{command}\n")
+                    stream.flush()
+                    lines = []
+                    while not lines or not lines[-1].startswith(("ok", "error")):
+                        lines.append(stream.readline())
+                    return "".join(lines)
+
+                assert send(f"set {child.name} DEBUG 300") == "ok\n"
+                assert child._min_level == LogLevel.debug
+                assert f"{child.name} DEBUG DEBUG\n" in send("levels")
+                assert send(f"reset {child.name}") == "ok\n"
+                assert child._min_level == LogLevel.warning
+                assert send(f"set {parent.name} none") == "ok\n"
+                assert parent.level is None
+                assert send(f"set {child.name} loud") == "error: Unknown level `loud`\n"
+                assert send("set missing debug").startswith("error: ")
+                assert send("stats").endswith("\nok\n")
+                assert send("shout") == "error: Unknown command `shout`\n"
+                stream.close()
+        finally:
+            server.stop()
+            server.stop()
+
+        assert not os.path.exists(path)
+
+    def test_mode_and_stale_node(self, tmp_path):
+        path = str(tmp_path / "control.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = ControlServer(path)
+
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        server.socket.close()
+
+    def test_idle_connection(self, tmp_path):
+        path = str(tmp_path / "control.sock")
+        server = ControlServer(path, timeout=0.01)
+        server.start()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            assert sock.recv(1) == b""  # closed by the server
+        server.stop()
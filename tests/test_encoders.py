@@ -0,0 +1,79 @@
+import json
+import pytest
+
+from logging2.encoders import JsonEncoder
+from logging2.levels import LogLevel
+
+
+class Opaque:
+    def __str__(self):
+        return "opaque"
+
+
+def test_encode():
+    encoder = JsonEncoder(["timestamp", "level", "name", "message"])
+    params = {
+        "message": 'Hello, "world"!\n안녕하세요',
+        "level": LogLevel.warning,
+        "name": "app",
+        "timestamp": "now",
+    }
+    output = encoder.encode(params)
+
+    assert isinstance(output, bytes)
+    assert output.endswith(b"}\n")
+    assert list(json.loads(output)) == ["timestamp", "level", "name", "message"]
+    assert json.loads(output) == {
+        "timestamp": "now",
+        "level": "WARNING",
+        "name": "app",
+        "message": 'Hello, "world"!\n안녕하세요',
+    }
+
+
+def test_encode_value_types():
+    encoder = JsonEncoder(["message"], ensure_new_line=False)
+    params = {
+        "message": "hi",
+        "line": 42,
+        "ratio": 0.5,
+        "nan": float("nan"),
+        "ok": True,
+        "missing": None,
+        "tags": ["a", 1],
+        "opaque": Opaque(),
+        'we"ird': "key",
+    }
+    output = encoder.encode(params)
+
+    assert not output.endswith(b"\n")
+    assert json.loads(output) == {
+        "message": "hi",
+        "line": 42,
+        "ratio": 0.5,
+        "nan": None,
+        "ok": True,
+        "missing": None,
+        "tags": ["a", 1],
+        "opaque": "opaque",
+        'we"ird': "key",
+    }
+
+
+def test_extra_key_cache_is_bounded():
+    encoder = JsonEncoder(["message"])
+    encoder.MAX_CACHED_KEYS = 2
+    for i in range(5):
+        assert json.loads(encoder.encode({"message": "hi", f"key{i}": i}))[f"key{i}"] == i
+
+    assert len(encoder._extra_prefixes) == 2
+
+
+def test_missing_key():
+    with pytest.raises(KeyError):
+        JsonEncoder(["message", "request_id"]).encode({"message": "hi"})
+
+
+def test_no_keys():
+    with pytest.raises(ValueError):
+        JsonEncoder([])
@@ -0,0 +1,149 @@
+import pytest
+import sys
+import threading
+
+from logging2 import filters
+from logging2.filters import EveryNthFilter, RateLimitFilter, SamplingFilter
+from logging2.levels import LogLevel
+
+
+def _site(line: int):
+    return sys._getframe().f_code, line
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the filters' monotonic clock with a settable one.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(filters.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestRateLimitFilter:
+    def test_burst_then_rate(self, clock):
+        rate_limit = RateLimitFilter(rate=2, burst=3)
+        site = _site(1)
+
+        assert [rate_limit.filter(LogLevel.info, site) for _ in range(5)] == [
+            True,
+            True,
+            True,
+            False,
+            False,
+        ]
+        clock[0] += 0.5  # one token
+        assert rate_limit.filter(LogLevel.info, site)
+        assert not rate_limit.filter(LogLevel.info, site)
+        clock[0] += 60  # refills up to the burst only
+        assert [rate_limit.filter(LogLevel.info, site) for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+        assert rate_limit.suppressed == 4
+
+    def test_per_call_site(self, clock):
+        rate_limit = RateLimitFilter(rate=1)
+
+        assert rate_limit.filter(LogLevel.info, _site(1))
+        assert not rate_limit.filter(LogLevel.info, _site(1))
+        assert rate_limit.filter(LogLevel.info, _site(2))
+
+    def test_sites_are_bounded(self, clock):
+        rate_limit = RateLimitFilter(rate=1, max_sites=2)
+        for line in (1, 2, 3):
+            rate_limit.filter(LogLevel.info, _site(line))
+
+        assert len(rate_limit._sites) == 2
+        assert rate_limit.filter(LogLevel.info, _site(1))  # evicted, so it starts over
+        assert not rate_limit.filter(LogLevel.info, _site(3))
+
+    def test_recently_used_sites_are_kept(self, clock):
+        rate_limit = RateLimitFilter(rate=1, max_sites=2)
+        rate_limit.filter(LogLevel.info, _site(1))
+        rate_limit.filter(LogLevel.info, _site(2))
+        rate_limit.filter(LogLevel.info, _site(1))
+        rate_limit.filter(LogLevel.info, _site(3))
+
+        assert list(rate_limit._sites) == [_site(1), _site(3)]
+
+    def test_create_name(self):
+        assert RateLimitFilter(rate=0.5).name == "rate-limit 0.5/s"
+
+
+class TestEveryNthFilter:
+    def test_first_then_every(self):
+        every = EveryNthFilter(first=2, every=3)
+        site = _site(1)
+
+        assert [every.filter(LogLevel.info, site) for _ in range(9)] == [
+            True,
+            True,
+            True,
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+        ]
+        assert every.suppressed == 4
+        assert every.take_unreported() == 4
+        assert every.take_unreported() == 0
+
+    def test_invalid_every(self):
+        with pytest.raises(ValueError):
+            EveryNthFilter(first=1, every=0)
+
+    def test_create_name(self):
+        assert EveryNthFilter(first=10, every=100).name == "first 10 then every 100"
+
+
+class TestSamplingFilter:
+    def test_sampling(self, monkeypatch):
+        sampling = SamplingFilter({LogLevel.debug: 0.25, LogLevel.info: 0.0})
+        values = iter([0.1, 0.3, 0.5])
+        monkeypatch.setattr(filters.random, "random", lambda: next(values))
+
+        assert sampling.filter(LogLevel.debug, _site(1))
+        assert not sampling.filter(LogLevel.debug, _site(1))
+        assert not sampling.filter(LogLevel.info, _site(1))
+        assert sampling.filter(LogLevel.error, _site(1))  # not sampled
+        assert sampling.suppressed == 2
+
+    def test_create_name(self):
+        assert SamplingFilter({}).name == "sampling"
+
+
+class TestFilter:
+    def test_after_fork(self):
+        every = EveryNthFilter(first=1, every=2)
+        lock = every._lock
+        every._after_fork()
+
+        assert every._lock is not lock
+
+    def test_counts_from_many_threads(self):
+        sampling = SamplingFilter({LogLevel.info: 0.0})
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        taken = []
+
+        def suppress() -> None:
+            for _ in range(10000):
+                sampling.filter(LogLevel.info, _site(1))
+            taken.append(sampling.take_unreported())
+
+        threads = [threading.Thread(target=suppress) for _ in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert sampling.suppressed == 80000
+        assert sum(taken) + sampling.take_unreported() == 80000
@@ -0,0 +1,156 @@
+import os
+import pytest
+import syslog
+import time
+
+from logging2 import timestamps
+from logging2.formatters import SyslogFormatter
+from logging2.levels import LogLevel
+
+# 2021-03-14T06:59:59+00:00
+_NOW = 1_615_705_199
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the clock with a settable one, in nanoseconds since the epoch.
+    """
+    now = [_NOW * 1_000_000_000 + 1_234_567]
+    monkeypatch.setattr(timestamps.time, "time_ns", lambda: now[0])
+    return now
+
+
+class TestRfc5424:
+    def test_format(self, clock):
+        formatter = SyslogFormatter(hostname="web-1", app_name="api", procid="42")
+        data = formatter.format("Hello, world!\n", level=LogLevel.info)
+
+        assert (
+            data
+            == b"<14>1 2021-03-14T06:59:59.001234+00:00 web-1 api 42 - - Hello, world!"
+        )
+
+    def test_priorities(self, clock):
+        formatter = SyslogFormatter(facility=syslog.LOG_LOCAL0, hostname="web-1")
+        for level, priority in [
+            (LogLevel.debug, 135),
+            (LogLevel.info, 134),
+            (LogLevel.warning, 132),
+            (LogLevel.error, 131),
+            (LogLevel.exception, 131),
+        ]:
+            assert formatter.format("x", level=level).startswith(b"<%d>1 " % priority)
+
+    def test_defaults(self, clock):
+        formatter = SyslogFormatter()
+        data = formatter.format("Hello", level=LogLevel.info)
+        hostname = formatter.hostname.encode()
+
+        assert data == b"<14>1 2021-03-14T06:59:59.001234+00:00 %b - %d - - Hello" % (
+            hostname,
+            os.getpid(),
+        )
+
+    def test_sanitizes_header_fields(self, clock):
+        formatter = SyslogFormatter(
+            hostname="web 1", app_name="a" * 64, msgid="ünïcode"
+        )
+        data = formatter.format("Hello", level=LogLevel.info)
+
+        assert data.split(b" ")[2:6] == [
+            b"web_1",
+            b"a" * 48,
+            b"%d" % os.getpid(),
+            b"_n_code",
+        ]
+
+    def test_non_ascii_and_bytes(self, clock):
+        formatter = SyslogFormatter(hostname="web-1", procid="42")
+
+        assert formatter.format("안녕하세요\n", level=LogLevel.info).endswith(
+            bytes(" - 안녕하세요", "utf8")
+        )
+        assert formatter.format(b'{"message":"hi"}\n', level=LogLevel.info).endswith(
+            b' - {"message":"hi"}'
+        )
+
+    def test_structured_data(self, clock):
+        formatter = SyslogFormatter(
+            hostname="web-1",
+            procid="42",
+            structured_data={"env": "prod", "quote": 'a "b" [c] \\d', "bad key=": 1},
+        )
+        data = formatter.format("Hello", level=LogLevel.info)
+
+        assert data.endswith(
+            b'42 - [context@32473 env="prod" quote="a \\"b\\" [c\\] \\\\d" bad_key_="1"] Hello'
+        )
+
+    def test_dynamic_structured_data(self, clock):
+        requests = iter(["r1", "r2"])
+        formatter = SyslogFormatter(
+            hostname="web-1",
+            procid="42",
+            sd_id="meta@32473",
+            structured_data={"env": "prod", "request": lambda: next(requests)},
+        )
+
+        assert formatter.format("a", level=LogLevel.info).endswith(
+            b'[meta@32473 env="prod" request="r1"] a'
+        )
+        assert formatter.format("b", level=LogLevel.info).endswith(
+            b'[meta@32473 env="prod" request="r2"] b'
+        )
+
+    def test_octet_counting(self, clock):
+        formatter = SyslogFormatter(hostname="web-1", procid="42", octet_counting=True)
+        data = formatter.format("안녕\nTraceback\n", level=LogLevel.error)
+
+        length, message = data.split(b" ", 1)
+        assert int(length) == len(message)
+        assert message.endswith(bytes(" 안녕\nTraceback", "utf8"))
+
+    def test_procid_after_fork(self, clock, monkeypatch):
+        formatter = SyslogFormatter(hostname="web-1")
+        monkeypatch.setattr("logging2.formatters.get_pid", lambda: 12345)
+
+        assert b" web-1 - 12345 - - " in formatter.format("x", level=LogLevel.info)
+
+    def test_unknown_rfc(self):
+        with pytest.raises(ValueError):
+            SyslogFormatter(rfc="1234")
+
+
+class TestRfc3164:
+    def test_format(self, clock):
+        formatter = SyslogFormatter(
+            rfc=SyslogFormatter.RFC3164,
+            hostname="web-1",
+            app_name="my-api",
+            procid="42",
+        )
+        data = formatter.format("Hello, world!\n", level=LogLevel.warning)
+
+        t = time.localtime(_NOW)
+        stamp = time.strftime("%H:%M:%S", t)
+        month = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()[t.tm_mon - 1]
+        expected = f"<12>{month} {t.tm_mday:2d} {stamp} web-1 myapi[42]: Hello, world!"
+        assert data == expected.encode()
+
+    def test_timestamp_cached_per_second(self, clock):
+        formatter = SyslogFormatter(rfc=SyslogFormatter.RFC3164, hostname="web-1")
+        first = formatter.format("x", level=LogLevel.info)
+        clock[0] += 500_000_000
+        assert formatter.format("x", level=LogLevel.info) == first
+        clock[0] += 500_000_000
+        assert formatter.format("x", level=LogLevel.info) != first
+
+    def test_without_tag(self, clock):
+        formatter = SyslogFormatter(rfc=SyslogFormatter.RFC3164, hostname="web-1")
+        assert formatter.format("Hello", level=LogLevel.info).endswith(b" web-1 Hello")
+
+    def test_no_structured_data(self):
+        with pytest.raises(ValueError):
+            SyslogFormatter(
+                rfc=SyslogFormatter.RFC3164, structured_data={"env": "prod"}
+            )
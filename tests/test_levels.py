@@ -1,6 +1,6 @@
 import syslog
 
-from logging2.levels import LogLevel
+from logging2.levels import PADDED_NAMES, SYSLOG_SEVERITIES, UPPER_NAMES, LogLevel
 
 
 def test_str():
@@ -62,3 +62,34 @@ def test_syslog_eq():
     assert LogLevel.info.as_syslog == syslog.LOG_INFO
     assert LogLevel.warning.as_syslog == syslog.LOG_WARNING
     assert LogLevel.error.as_syslog == syslog.LOG_ERR
+    assert LogLevel.exception.as_syslog == syslog.LOG_ERR
+
+
+def test_format():
+    assert f"{LogLevel.info}" == "INFO"
+    assert f"{LogLevel.info:>6}" == "  INFO"
+    assert "{}".format(LogLevel.warning) == "WARNING"
+
+
+def test_int():
+    assert LogLevel.error == 3
+    assert LogLevel.info < 2
+    assert LogLevel(1) is LogLevel.info
+
+
+def test_hash():
+    counts = {LogLevel.info: 1}
+    counts[LogLevel.info] += 1
+    assert counts == {LogLevel.info: 2}
+
+
+def test_bool():
+    assert LogLevel.debug
+    assert (LogLevel.debug or LogLevel.info) is LogLevel.debug
+
+
+def test_tables():
+    assert [UPPER_NAMES[level] for level in LogLevel] == [str(level) for level in LogLevel]
+    assert PADDED_NAMES[LogLevel.info] == "INFO     "
+    assert {len(name) for name in PADDED_NAMES} == {len("EXCEPTION")}
+    assert SYSLOG_SEVERITIES[LogLevel.warning] == syslog.LOG_WARNING
@@ -1,11 +1,26 @@
+import asyncio
+import io
+import json
+import os
 import pytest
 import re
+import socket
+import sys
+import threading
+import time
 from capturer import CaptureOutput
+from datetime import timedelta, timezone
 from uuid import uuid4
 
-from logging2.handlers.streaming import StdErrHandler, StdOutHandler
+from logging2 import LogRegister
+from logging2.filters import EveryNthFilter, RateLimitFilter, SamplingFilter
+from logging2.handlers.aio import AsyncFileHandler
+from logging2.handlers.files import FileHandler
+from logging2.handlers.sockets import TcpHandler
+from logging2.handlers.streaming import StdErrHandler, StdOutHandler, StreamingHandler
 from logging2.levels import LogLevel
-from logging2.loggers import Logger
+from logging2.loggers import AsyncLogger, Logger
+from logging2.tracebacks import TracebackRenderer
 
 
 _timestamp_group = "\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}[+-]\d{2}:\d{2}"
@@ -70,6 +85,45 @@ class TestLogger:
 
         assert BASIC_OUTPUT_REGEX.match(output)
 
+    def test_exc_info(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="exc-info",
+            template="{message}",
+            handler=StreamingHandler(stream=stream),
+        )
+        try:
+            1 / 0
+        except ZeroDivisionError as error:
+            caught = error
+        logger.exception("explicit", exc_info=caught)
+        logger.error("tuple", exc_info=(ZeroDivisionError, caught, caught.__traceback__))
+        logger.error("plain")
+        entries = stream.getvalue().split("\n\n")
+
+        assert entries[0].startswith("explicit\nTraceback (most recent call last):\n")
+        assert entries[0].endswith("ZeroDivisionError: division by zero")
+        assert entries[1] == entries[0].replace("explicit", "tuple", 1)
+        assert entries[2] == "plain\n"
+
+    def test_traceback_renderer(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="traceback-renderer",
+            template="{message}",
+            handler=StreamingHandler(stream=stream),
+            traceback_renderer=TracebackRenderer(compact=True),
+        )
+        try:
+            {}["id"]
+        except KeyError:
+            logger.exception("lookup failed")
+        line = sys._getframe().f_lineno - 3
+
+        assert stream.getvalue() == (
+            f"lookup failed\nKeyError: 'id' [{__file__}:{line} in test_traceback_renderer]\n\n"
+        )
+
     def test_init_with_one_handler(self):
         handler = StdErrHandler(name="test-stderr")
         logger = Logger(name="test-handler", handler=handler)
@@ -90,6 +144,9 @@ class TestLogger:
         assert logger.template == self.logger.template
         assert logger.keys == self.logger.keys
 
+    def test_registered(self):
+        assert self.logger in LogRegister.get_loggers()
+
     def test_set_template(self):
         logger = Logger(name="template")
         assert logger.template == Logger.DEFAULT_TEMPLATE
@@ -108,6 +165,48 @@ class TestLogger:
         regex = f"{_timestamp_group} {_message_group}"
         assert re.match(regex, output)
 
+    def test_timestamp_precision(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="timestamp-ms",
+            template="{timestamp}",
+            handler=StreamingHandler(stream=stream),
+            timestamp_precision="ms",
+        )
+        logger.info("Hello, world!")
+
+        regex = "\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}[+-]\d{2}:\d{2}$"
+        assert re.match(regex, stream.getvalue())
+
+    def test_epoch_timestamps(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="timestamp-epoch",
+            template="{timestamp}",
+            handler=StreamingHandler(stream=stream),
+            timestamp_precision="s",
+            epoch_timestamps=True,
+        )
+        logger.info("Hello, world!")
+
+        assert re.match("\d+$", stream.getvalue())
+
+    def test_set_timezone(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="timezone",
+            template="{timestamp}",
+            handler=StreamingHandler(stream=stream),
+        )
+        assert logger.timezone is Logger.DEFAULT_TIMEZONE
+
+        tz = timezone(timedelta(hours=-3))
+        logger.timezone = tz
+        logger.info("Hello, world!")
+
+        assert logger.timezone is tz
+        assert stream.getvalue().endswith("-03:00")
+
     def test_remove_handler(self):
         handler = StdErrHandler()
         self.logger.add_handler(handler)
@@ -119,6 +218,15 @@ class TestLogger:
         assert len(self.logger.handlers) == 1
         assert isinstance(self.logger.handlers[0], StdOutHandler)
 
+    def test_add_and_remove_handler_idempotent(self):
+        handler = StreamingHandler(name="idempotent", stream=io.StringIO())
+        logger = Logger(name="idempotent", handler=handler)
+        logger.add_handler(StreamingHandler(name="idempotent", stream=io.StringIO()))
+        assert logger.handlers == [handler]
+
+        logger.remove_handler("missing")
+        assert logger.handlers == [handler]
+
     def test_get_exec_info(self):
         template = "{source} {line} {function} {process}: {message}"
         logger = Logger(name="exec-info", template=template)
@@ -130,6 +238,17 @@ class TestLogger:
         regex = "[\w/]+\.py \d+ \w+ \d+: [^\n]+"
         assert re.match(regex, output)
 
+    def test_get_exec_info_values(self):
+        template = "{source}:{line} {function} {process}: {message}"
+        logger = Logger(name="exec-info-values", template=template)
+
+        with CaptureOutput() as co:
+            line = sys._getframe().f_lineno + 1
+            logger.info("hello")
+        output = co.get_text()
+
+        assert output == f"{__file__}:{line} test_get_exec_info_values {os.getpid()}: hello"
+
     def test_additional_context_static(self):
         template = "{name} {person}: {message}"
         logger = Logger(
@@ -180,3 +299,719 @@ class TestLogger:
         with pytest.raises(ValueError):
             template = "ohai"
             Logger(name="no-keys", template=template)
+
+    def test_below_min_level_short_circuits(self):
+        handler = StdErrHandler(name="short-circuit-stderr", level=LogLevel.error)
+        logger = Logger(name="short-circuit", handler=handler)
+        logger._get_timestamp = None  # would raise if the entry were formatted
+
+        with CaptureOutput() as co:
+            logger.info("skipped")
+        output = co.get_text()
+
+        assert output == ""
+
+    def test_min_level_follows_handlers(self):
+        handler0 = StdErrHandler(name="min-level-stderr", level=LogLevel.error)
+        handler1 = StdOutHandler(name="min-level-stdout", level=LogLevel.warning)
+        logger = Logger(name="min-level", handler=handler0)
+        assert logger._min_level == LogLevel.error.value
+
+        logger.add_handler(handler1)
+        assert logger._min_level == LogLevel.warning.value
+
+        handler0.min_level = LogLevel.debug
+        assert logger._min_level == LogLevel.debug.value
+
+        logger.remove_handler("min-level-stderr")
+        assert logger._min_level == LogLevel.warning.value
+
+        handler0.min_level = LogLevel.info
+        assert logger._min_level == LogLevel.warning.value
+
+        logger.remove_handler("min-level-stdout")
+        assert logger._min_level == Logger.DEFAULT_LOG_LEVEL.value
+
+    def test_min_level_without_handlers(self):
+        logger = Logger(name="min-level-default", level=LogLevel.warning)
+
+        with CaptureOutput() as co:
+            logger.info("skipped")
+        output = co.get_text()
+
+        assert output == ""
+        assert logger.handlers == []
+
+
+class TestLazyMessages:
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+        self.handler = StreamingHandler(name=f"lazy-{uuid4()}", stream=self.stream)
+
+    def test_format_with_context(self):
+        logger = Logger(name="lazy-format", template="{message}", handler=self.handler)
+        logger.info("user {user} did {action!r}", user=42, action="login")
+
+        assert self.stream.getvalue() == "user 42 did 'login'\n"
+
+    def test_format_with_additional_context(self):
+        logger = Logger(
+            name="lazy-format-additional",
+            template="{message}",
+            handler=self.handler,
+            additional_context={"host": lambda: "web-1"},
+        )
+        logger.info("{user} on {host}", user=42)
+        logger.info("{host} is not formatted without context")
+
+        assert self.stream.getvalue() == (
+            "42 on web-1\n{host} is not formatted without context\n"
+        )
+
+    def test_unformattable_messages_are_logged_as_they_are(self):
+        logger = Logger(name="lazy-format-json", template="{message}", handler=self.handler)
+        logger.info('{"user": 42}', user=42)
+        logger.info("{missing} {0} {user.nope}", user=42)
+
+        assert self.stream.getvalue() == '{"user": 42}\n{missing} {0} {user.nope}\n'
+
+    def test_attribute_and_index_lookups_are_not_formatted(self):
+        logger = Logger(name="lazy-format-lookups", template="{message}", handler=self.handler)
+        logger.info("{user.__class__} {users[0]} {user}", user=42, users=[1])
+
+        assert self.stream.getvalue() == "{user.__class__} {users[0]} {user}\n"
+
+    def test_failing_values_are_logged_as_they_are(self):
+        logger = Logger(name="lazy-format-raises", template="{message}", handler=self.handler)
+
+        class Broken:
+            def __format__(self, spec):
+                raise RuntimeError("broken")
+
+        logger.info("{value}", value=Broken())
+
+        assert self.stream.getvalue() == "{value}\n"
+
+    def test_format_with_name_and_level(self):
+        logger = Logger(name="lazy-format-builtins", template="{message}", handler=self.handler)
+        logger.info("{user} at {name} {level}", user="bob")
+
+        assert self.stream.getvalue() == "bob at lazy-format-builtins INFO\n"
+
+    def test_not_formatted_below_min_level(self):
+        logger = Logger(name="lazy-format-level", template="{message}", handler=self.handler)
+
+        class Expensive:
+            def __format__(self, spec):
+                raise AssertionError("formatted")
+
+        logger.debug("{value}", value=Expensive())
+        assert self.stream.getvalue() == ""
+
+    def test_callable_message(self):
+        logger = Logger(name="lazy-callable", template="{message}", handler=self.handler)
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "expensive"
+
+        logger.debug(expensive)
+        assert calls == []
+
+        logger.info(expensive)
+        logger.info(lambda: "{n} things", n=3)
+        assert calls == [1]
+        assert self.stream.getvalue() == "expensive\n3 things\n"
+
+    def test_unreferenced_context_functions_are_not_called(self):
+        calls = []
+
+        def tracked(value):
+            def get():
+                calls.append(value)
+                return value
+
+            return get
+
+        logger = Logger(
+            name="lazy-context",
+            template="{used} {message}",
+            handler=self.handler,
+            additional_context={"used": tracked("a"), "unused": tracked("b")},
+        )
+        logger.info("hello", extra=tracked("c"))
+
+        assert self.stream.getvalue() == "a hello\n"
+        assert calls == ["a"]
+
+    def test_structured_calls_every_context_function(self):
+        logger = Logger(
+            name="lazy-structured",
+            template="{message}",
+            handler=self.handler,
+            structured=True,
+            additional_context={"host": lambda: "web-1"},
+        )
+        logger.info("hello", request=lambda: "r1")
+
+        entry = json.loads(self.stream.getvalue())
+        assert (entry["request"], entry["host"]) == ("r1", "web-1")
+
+
+class TestFilters:
+    def test_filters_before_formatting(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="filtered",
+            template="{message}",
+            handler=StreamingHandler(name="filtered", stream=stream),
+            filters=[EveryNthFilter(first=1, every=2)],
+        )
+        for i in range(4):
+            logger.info(f"hot {i}")
+        logger.info("cold")  # another call site
+
+        assert stream.getvalue() == "hot 0\nhot 1\nhot 3\ncold\n"
+
+    def test_summary(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="filter-summary",
+            template="{level} {message}",
+            handler=StreamingHandler(
+                name="filter-summary", stream=stream, level=LogLevel.debug
+            ),
+            filters=[
+                SamplingFilter({LogLevel.debug: 0.0}),
+                EveryNthFilter(first=0, every=10),
+            ],
+        )
+        for _ in range(10):
+            logger.debug("sampled")
+            logger.info("thinned")
+        logger._summary_timer.cancel()
+        logger._summarize_filters()
+        logger._summarize_filters()  # nothing left to report
+
+        assert stream.getvalue().splitlines() == [
+            "INFO thinned",
+            "WARNING Suppressed 19 log entries: 10 by sampling, 9 by first 0 then every 10",
+        ]
+
+    def test_summary_timer(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="filter-summary-timer",
+            template="{message}",
+            handler=StreamingHandler(name="filter-summary-timer", stream=stream),
+            filters=[EveryNthFilter(first=1, every=100)],
+            filter_summary_interval=0.01,
+        )
+        for _ in range(3):
+            logger.info("hot")
+        for _ in range(100):
+            if "Suppressed" in stream.getvalue():
+                break
+            time.sleep(0.01)
+
+        assert stream.getvalue() == "hot\nhot\nSuppressed 1 log entries: 1 by first 1 then every 100\n"
+
+    def test_add_and_remove_filter(self):
+        logger = Logger(name="filter-registration")
+        sampling = SamplingFilter({})
+        logger.add_filter(sampling)
+        logger.add_filter(SamplingFilter({}))
+        assert logger.filters == [sampling]
+
+        logger.remove_filter("sampling")
+        assert logger.filters == []
+
+    def test_exec_info_with_filters(self):
+        template = "{source}:{line} {function}: {message}"
+        stream = io.StringIO()
+        logger = Logger(
+            name="filter-exec-info",
+            template=template,
+            handler=StreamingHandler(name="filter-exec-info", stream=stream),
+            filters=[RateLimitFilter(rate=10)],
+        )
+        line = sys._getframe().f_lineno + 1
+        logger.info("hello")
+
+        assert stream.getvalue() == f"{__file__}:{line} test_exec_info_with_filters: hello\n"
+
+
+class TestHierarchy:
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+        self.handler = StreamingHandler(
+            name=f"tree-{uuid4()}", stream=self.stream, level=LogLevel.debug
+        )
+        self.root = f"tree{uuid4().hex}"
+
+    def test_children_inherit(self):
+        Logger(
+            name=self.root,
+            template="{name} {env}: {message}",
+            handler=self.handler,
+            additional_context={"env": "prod"},
+        )
+        child = Logger(name=f"{self.root}.db.pool", template="{name} {env}: {message}")
+        child.info("connected")
+
+        assert self.stream.getvalue() == f"{self.root}.db.pool prod: connected\n"
+        assert child.handlers == [self.handler]
+
+    def test_parent_registered_after_child(self):
+        child = Logger(name=f"{self.root}.db", template="{message}")
+        assert LogRegister.get_parent(child.name) is None
+
+        parent = Logger(name=self.root, handler=self.handler)
+        assert LogRegister.get_parent(child.name) is parent
+        assert child.handlers == [self.handler]
+
+    def test_own_handlers_first(self):
+        own = StreamingHandler(name="own", stream=io.StringIO())
+        Logger(name=self.root, handlers=[own, self.handler])
+        child = Logger(name=f"{self.root}.db", handler=own)
+
+        assert child.handlers == [own, self.handler]
+
+    def test_propagate(self):
+        own = StreamingHandler(name="own", stream=io.StringIO())
+        Logger(name=self.root, handler=self.handler)
+        child = Logger(name=f"{self.root}.db", handler=own, propagate=False)
+        assert child.handlers == [own]
+
+        child.propagate = True
+        assert child.propagate
+        assert child.handlers == [own, self.handler]
+
+    def test_subtree_level(self):
+        parent = Logger(name=self.root, template="{message}", handler=self.handler)
+        child = Logger(name=f"{self.root}.db", template="{message}")
+        grandchild = Logger(name=f"{self.root}.db.pool", template="{message}")
+        sibling = Logger(name=f"{self.root}.api", template="{message}")
+        assert grandchild._min_level == LogLevel.debug
+
+        child.level = LogLevel.warning
+        assert (child.level, grandchild.level) == (LogLevel.warning, None)
+        assert (parent._min_level, child._min_level, grandchild._min_level) == (
+            LogLevel.debug,
+            LogLevel.warning,
+            LogLevel.warning,
+        )
+        grandchild.info("skipped")
+        sibling.info("logged")
+
+        grandchild.level = LogLevel.info
+        grandchild.info("overridden")
+
+        child.level = None
+        assert child._min_level == LogLevel.debug
+        assert self.stream.getvalue() == "logged\noverridden\n"
+
+    def test_default_handler_is_shared(self):
+        parent = Logger(name=self.root, template="{name}: {message}")
+        child = Logger(name=f"{self.root}.db", template="{name}: {message}")
+        sibling = Logger(name=f"{self.root}.api", template="{name}: {message}")
+
+        with CaptureOutput() as co:
+            child.info("child")
+            parent.info("parent")
+            sibling.info("sibling")
+        output = co.get_text()
+
+        assert output.splitlines() == [
+            f"{self.root}.db: child",
+            f"{self.root}: parent",
+            f"{self.root}.api: sibling",
+        ]
+        assert [h.name for h in child.handlers] == ["stdout"]
+        assert parent.handlers == child.handlers == sibling.handlers
+
+    def test_default_handler_before_parent(self):
+        child = Logger(name=f"{self.root}.db", template="{name}: {message}")
+        with CaptureOutput() as co:
+            child.info("alone")
+            parent = Logger(name=self.root, template="{name}: {message}")
+            parent.info("parent")
+            child.info("child")
+        output = co.get_text()
+
+        assert output.splitlines() == [
+            f"{self.root}.db: alone",
+            f"{self.root}: parent",
+            f"{self.root}.db: child",
+        ]
+        assert [h.name for h in child.handlers] == ["stdout"]
+
+    def test_handler_level_changes_reach_descendants(self):
+        Logger(name=self.root, handler=self.handler)
+        child = Logger(name=f"{self.root}.db")
+
+        self.handler.min_level = LogLevel.error
+        assert child._min_level == LogLevel.error
+
+    def test_handler_changes_reach_descendants(self):
+        parent = Logger(name=self.root)
+        child = Logger(name=f"{self.root}.db")
+
+        parent.add_handler(self.handler)
+        assert child.handlers == [self.handler]
+
+        parent.remove_handler(self.handler.name)
+        assert child.handlers == []
+
+    def test_context_precedence(self):
+        parent = Logger(
+            name=self.root,
+            template="{env} {region} {host}:{message}",
+            handler=self.handler,
+            additional_context={"env": "prod", "region": "us"},
+        )
+        child = Logger(
+            name=f"{self.root}.db",
+            template="{env} {region} {host}:{message}",
+            additional_context={"region": "eu", "host": lambda: "db-1"},
+        )
+        child.info("")
+        child.info("", region="ap")
+
+        parent.additional_context = {"env": "staging"}
+        assert parent.additional_context == {"env": "staging"}
+        child.info("")
+
+        parent.additional_context["env"] = "dev"
+        child.info("")
+
+        assert self.stream.getvalue().splitlines() == [
+            "prod eu db-1:",
+            "prod ap db-1:",
+            "staging eu db-1:",
+            "dev eu db-1:",
+        ]
+
+    def test_context_changed_in_place(self):
+        parent = Logger(name=self.root, handler=self.handler)
+        Logger(name=f"{self.root}.db")
+        grandchild = Logger(name=f"{self.root}.db.pool", template="{env}:{message}")
+
+        parent.additional_context["env"] = "prod"
+        grandchild.info("in place")
+        assert self.stream.getvalue() == "prod:in place\n"
+
+
+class TestInstrumentation:
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+        self.handler = StreamingHandler(
+            name="instrumented", stream=self.stream, level=LogLevel.info
+        )
+        self.logger = Logger(
+            name=f"instrumented{uuid4().hex}",
+            template="{function}: {message}",
+            handlers=[
+                self.handler,
+                StreamingHandler(
+                    name="instrumented-debug",
+                    stream=io.StringIO(),
+                    level=LogLevel.debug,
+                ),
+            ],
+            level=LogLevel.debug,
+            filters=[EveryNthFilter(first=0, every=10)],
+            instrumented=True,
+        )
+
+    def test_counters(self):
+        self.logger.debug("hidden")
+        for _ in range(2):
+            self.logger.info("héllo")  # the second one is suppressed by the filter
+        self.logger.level = LogLevel.warning
+        self.logger.info("filtered")
+        stats = self.logger.stats()
+        handler_stats = stats["handlers"]["instrumented"]
+
+        assert self.stream.getvalue() == "test_counters: héllo\n"
+        assert stats["emitted"] == 2
+        assert stats["filtered"] == 1
+        assert stats["suppressed"] == 1
+        assert stats["bytes"] == len("test_counters: hidden\n") + len(
+            "test_counters: héllo\n".encode()
+        )
+        assert stats["log_seconds"]["count"] == 2
+        assert handler_stats["emitted"] == 1
+        assert handler_stats["filtered"] == 1
+        assert handler_stats["bytes"] == len("test_counters: héllo\n".encode())
+        assert handler_stats["write_seconds"]["count"] == 1
+        assert self.handler.stats() == handler_stats
+
+    def test_errors(self):
+        self.stream.close()
+        with pytest.raises(ValueError):
+            self.logger.info("closed")
+        stats = self.logger.stats()
+
+        assert stats["errors"] == 1
+        assert stats["emitted"] == 0
+        assert stats["handlers"]["instrumented"]["errors"] == 1
+
+    def test_structured(self):
+        logger = Logger(
+            name=f"instrumented-structured{uuid4().hex}",
+            template="{message}",
+            handler=self.handler,
+            structured=True,
+            instrumented=True,
+        )
+        logger.info("héllo")
+
+        assert logger.stats()["bytes"] == len(self.stream.getvalue().encode())
+
+    def test_toggle(self):
+        assert self.logger.instrumented
+        self.logger.instrumented = False
+        assert not self.logger.instrumented
+        assert self.logger.stats() is None
+        self.logger.info("not counted")
+
+        self.logger.instrumented = True
+        self.logger.instrumented = True
+        assert self.logger.stats()["emitted"] == 0
+        assert StreamingHandler(name="unused", stream=self.stream).stats() is None
+
+
+class TestAsyncLogger:
+    def test_flush_and_aclose(self):
+        filename = "/tmp/test_async_logger.log"
+        stream = io.StringIO()
+        logger = AsyncLogger(
+            name="async",
+            template="{level} {name}: {message}",
+            handlers=[AsyncFileHandler(filename), StreamingHandler(stream=stream)],
+        )
+
+        async def main():
+            logger.info("Hello, world!")
+            await logger.flush()
+            with open(filename) as fh:
+                flushed = fh.read()
+            logger.warning("Goodbye")
+            await logger.aclose()
+            return flushed
+
+        try:
+            flushed = asyncio.run(main())
+            with open(filename) as fh:
+                closed = fh.read()
+        finally:
+            os.remove(filename)
+
+        assert flushed == "INFO async: Hello, world!\n"
+        assert closed == "INFO async: Hello, world!\nWARNING async: Goodbye\n"
+        assert stream.getvalue() == closed
+
+    def test_aclose_leaves_inherited_handlers_open(self):
+        name = f"async{uuid4().hex}"
+        inherited = StreamingHandler(name="inherited", stream=io.StringIO())
+        own = StreamingHandler(name="own", stream=io.StringIO())
+        parent = AsyncLogger(name=name, template="{message}", handler=inherited)
+        child = AsyncLogger(name=f"{name}.child", template="{message}", handler=own)
+        assert child.handlers == [own, inherited]
+
+        closed = []
+        own.close = lambda: closed.append(own)
+        inherited.close = lambda: closed.append(inherited)
+
+        asyncio.run(child.aclose())
+
+        assert closed == [own]
+        assert parent.handlers == [inherited]
+
+
+class TestStructuredLogger:
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+
+    def test_structured(self):
+        logger = Logger(
+            name="structured",
+            handler=StreamingHandler(stream=self.stream),
+            additional_context={"app": "api", "request_id": lambda: "abc"},
+            structured=True,
+        )
+        logger.info("Hello, world!", user=42)
+        entry = json.loads(self.stream.getvalue())
+
+        assert self.stream.getvalue().endswith("}\n")
+        assert list(entry) == [
+            "timestamp",
+            "level",
+            "name",
+            "message",
+            "user",
+            "app",
+            "request_id",
+        ]
+        assert entry["level"] == "INFO"
+        assert entry["name"] == "structured"
+        assert entry["message"] == "Hello, world!"
+        assert entry["user"] == 42
+        assert entry["request_id"] == "abc"
+        assert re.match(_timestamp_group, entry["timestamp"])
+
+    def test_structured_exec_info(self):
+        logger = Logger(
+            name="structured-exec-info",
+            template="{message} {line} {function}",
+            handler=StreamingHandler(stream=self.stream),
+            structured=True,
+        )
+        line = sys._getframe().f_lineno + 1
+        logger.info("hello")
+        entry = json.loads(self.stream.getvalue())
+
+        assert entry == {
+            "message": "hello",
+            "line": line,
+            "function": "test_structured_exec_info",
+            "source": __file__,
+            "process": os.getpid(),
+            "level": "INFO",
+            "name": "structured-exec-info",
+        }
+
+    def test_structured_exception(self):
+        logger = Logger(
+            name="structured-exception",
+            template="{level} {message}",
+            handler=StreamingHandler(stream=self.stream),
+            structured=True,
+        )
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("boom")
+        entry = json.loads(self.stream.getvalue())
+
+        assert entry["level"] == "EXCEPTION"
+        assert entry["message"].startswith("boom\nTraceback (most recent call last):")
+        assert entry["message"].endswith("ZeroDivisionError: division by zero")
+
+    def test_structured_template_change(self):
+        logger = Logger(
+            name="structured-template",
+            template="{level} {message}",
+            handler=StreamingHandler(stream=self.stream),
+            structured=True,
+        )
+        logger.template = "{message}"
+        logger.info("hello")
+
+        assert self.stream.getvalue() == (
+            '{"message":"hello","level":"INFO","name":"structured-template"}\n'
+        )
+
+
+class TestThreadSafety:
+    THREADS = 64
+    ENTRIES = 100
+    ENTRY_REGEX = re.compile("^(\d{2})-(\d{4}) x{16384}$")
+
+    def setup_method(self, method):
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads as often as possible
+
+    def teardown_method(self, method):
+        sys.setswitchinterval(self.switch_interval)
+
+    def hammer(self, logger: Logger, *also) -> None:
+        """Logs from many threads at once, released together by a barrier.
+        """
+        barrier = threading.Barrier(self.THREADS + len(also))
+
+        def log(thread: int) -> None:
+            barrier.wait()
+            for i in range(self.ENTRIES):
+                logger.info(f"{thread:02d}-{i:04d} {'x' * 16384}")
+
+        def run(target) -> None:
+            barrier.wait()
+            target()
+
+        threads = [
+            threading.Thread(target=log, args=(thread,))
+            for thread in range(self.THREADS)
+        ]
+        threads += [threading.Thread(target=run, args=(target,)) for target in also]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def assert_whole_lines(self, output: str) -> None:
+        lines = output.splitlines()
+        assert len(lines) == self.THREADS * self.ENTRIES
+        seen = set()
+        for line in lines:
+            match = self.ENTRY_REGEX.match(line)
+            assert match, f"torn line: {line[:40]!r}..."
+            seen.add(match.groups())
+        assert len(seen) == len(lines)
+
+    def test_file_handler(self, tmp_path):
+        path = str(tmp_path / "threads.log")
+        handler = FileHandler(path)
+        logger = Logger(name="threads-file", template="{message}", handler=handler)
+        self.hammer(logger)
+        handler.close()
+
+        with open(path) as fh:
+            self.assert_whole_lines(fh.read())
+
+    def test_socket_handler(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        received = []
+
+        def read() -> None:
+            conn, _ = server.accept()
+            with conn:
+                while True:
+                    data = conn.recv(1 << 16)
+                    if not data:
+                        break
+                    received.append(data)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        handler = TcpHandler(*server.getsockname())
+        logger = Logger(name="threads-socket", template="{message}", handler=handler)
+        self.hammer(logger)
+        handler.socket.close()
+        reader.join()
+        server.close()
+
+        self.assert_whole_lines(b"".join(received).decode("utf8"))
+
+    def test_registration_while_logging(self):
+        stream = io.StringIO()
+        logger = Logger(
+            name="threads-registration",
+            template="{message}",
+            handler=StreamingHandler(stream=stream),
+        )
+
+        def churn() -> None:
+            for i in range(200):
+                handler = StreamingHandler(name=f"churn-{i}", stream=io.StringIO())
+                logger.add_handler(handler)
+                logger.remove_handler(f"churn-{i}")
+
+        self.hammer(logger, churn)
+
+        assert [handler.name for handler in logger.handlers] == ["StringIO"]
+        self.assert_whole_lines(stream.getvalue())
@@ -0,0 +1,195 @@
+import io
+import os
+import threading
+import weakref
+from uuid import uuid4
+
+from logging2.handlers.streaming import StreamingHandler
+from logging2.loggers import Logger
+from logging2.stats import (
+    EMITTED,
+    LATENCY,
+    LATENCY_BUCKETS,
+    LOGGER_COUNTERS,
+    LOGGER_HISTOGRAMS,
+    Stats,
+    format_prometheus,
+    snapshot,
+    write_prometheus,
+)
+
+
+class TestStats:
+    def test_shards_per_thread(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+        counted = threading.Barrier(5)
+        checked = threading.Event()
+
+        def count():
+            shard = stats.shard()
+            assert stats.shard() is shard
+            for _ in range(1000):
+                shard.counts[EMITTED] += 1
+            counted.wait()
+            checked.wait()
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        counted.wait()
+        assert len(stats._shards) == 4
+        assert stats.snapshot()["emitted"] == 4000
+
+        checked.set()
+        for thread in threads:
+            thread.join()
+
+        assert stats._shards == []
+        assert stats.snapshot()["emitted"] == 4000
+
+    def test_finished_threads_are_retired(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+
+        def count():
+            shard = stats.shard()
+            shard.counts[EMITTED] += 10
+            shard.observe(LATENCY, 0.001)
+
+        for _ in range(200):
+            thread = threading.Thread(target=count)
+            thread.start()
+            thread.join()
+        stats.shard().counts[EMITTED] += 1
+
+        assert len(stats._shards) == 1
+        assert stats.snapshot()["emitted"] == 2001
+        assert stats.snapshot()["log_seconds"]["count"] == 200
+
+    def test_dropped_stats_are_not_retired_into(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+        started = threading.Event()
+        dropped = threading.Event()
+
+        def count():
+            stats.shard()
+            started.set()
+            dropped.wait()
+
+        thread = threading.Thread(target=count)
+        thread.start()
+        started.wait()
+        reference = weakref.ref(stats)
+        del stats
+        dropped.set()
+        thread.join()
+
+        assert reference() is None
+
+    def test_histogram(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+        shard = stats.shard()
+        shard.observe(LATENCY, 0.000001)  # on the first bound
+        shard.observe(LATENCY, 0.00002)
+        shard.observe(LATENCY, 10.0)
+
+        histogram = stats.snapshot()["log_seconds"]
+        buckets = list(histogram["buckets"].items())
+
+        assert len(buckets) == len(LATENCY_BUCKETS) + 1
+        assert buckets[0] == (0.000001, 1)
+        assert histogram["buckets"][0.00001] == 1
+        assert histogram["buckets"][0.000025] == 2
+        assert histogram["buckets"][0.1] == 2
+        assert buckets[-1] == (float("inf"), 3)
+        assert histogram["count"] == 3
+        assert histogram["sum"] == 0.000001 + 0.00002 + 10.0
+
+    def test_after_fork(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+        stats.shard().counts[EMITTED] += 1
+        stats._after_fork()
+        stats.shard().counts[EMITTED] += 1
+
+        assert stats.snapshot()["emitted"] == 1
+
+    def test_after_fork_from_another_thread(self):
+        stats = Stats(LOGGER_COUNTERS, LOGGER_HISTOGRAMS)
+
+        def fork():
+            stats.shard().counts[EMITTED] += 1
+            stats._after_fork()  # the parent's shard of this thread is freed, but not retired
+
+        thread = threading.Thread(target=fork)
+        thread.start()
+        thread.join()
+
+        assert stats.snapshot()["emitted"] == 0
+
+
+class TestExport:
+    def setup_method(self, method):
+        name = f"stats{uuid4().hex}"
+        self.handler = StreamingHandler(name=f'{name}"\\', stream=io.StringIO())
+        self.logger = Logger(
+            name=name, template="{message}", handler=self.handler, instrumented=True
+        )
+        self.other = Logger(
+            name=f"{name}.other",
+            template="{message}",
+            handler=StreamingHandler(name=f'{name}"\\', stream=io.StringIO()),
+            propagate=False,
+            instrumented=True,
+        )
+
+    def test_snapshot(self):
+        self.logger.info("Hello")
+        self.other.info("Hello")
+        self.other.info("Hello")
+        stats = snapshot()
+
+        assert stats["loggers"][self.logger.name]["emitted"] == 1
+        assert stats["loggers"][self.other.name]["emitted"] == 2
+        assert Logger(name="not-instrumented").name not in stats["loggers"]
+        # both handlers have the same name
+        assert stats["handlers"][self.handler.name]["emitted"] == 3
+        assert stats["handlers"][self.handler.name]["write_seconds"]["count"] == 3
+
+    def test_format_prometheus(self):
+        self.logger.info("Hello")
+        metrics = format_prometheus()
+        label = f'handler="{self.logger.name}\\"\\\\"'
+
+        assert "# TYPE logging2_logger_emitted_total counter\n" in metrics
+        assert (
+            f'logging2_logger_emitted_total{{logger="{self.logger.name}"}} 1\n'
+            in metrics
+        )
+        assert (
+            f'logging2_logger_bytes_total{{logger="{self.logger.name}"}} 6\n' in metrics
+        )
+        assert "# TYPE logging2_handler_write_seconds histogram\n" in metrics
+        assert (
+            f'logging2_handler_write_seconds_bucket{{{label},le="+Inf"}} 1\n' in metrics
+        )
+        assert f"logging2_handler_write_seconds_count{{{label}}} 1\n" in metrics
+        assert metrics.endswith("\n")
+
+    def test_write_prometheus(self, tmp_path):
+        path = str(tmp_path / "logging2.prom")
+        self.logger.info("Hello")
+        write_prometheus(path)
+
+        with open(path) as fh:
+            assert (
+                f'logging2_logger_emitted_total{{logger="{self.logger.name}"}} 1\n'
+                in fh.read()
+            )
+        assert os.listdir(tmp_path) == ["logging2.prom"]
+
+    def test_after_fork(self):
+        self.logger.info("Hello")
+        self.logger._stats._after_fork()
+        self.handler._after_fork()
+
+        assert self.logger.stats()["emitted"] == 0
+        assert self.handler.stats()["emitted"] == 0
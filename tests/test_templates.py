@@ -0,0 +1,78 @@
+import pytest
+from datetime import date
+
+from logging2.levels import LogLevel
+from logging2.templates import Template, TemplateField
+
+
+def test_render_default_template():
+    template = Template("{timestamp} {level} {name}: {message}")
+    params = {
+        "timestamp": "now",
+        "level": LogLevel.info,
+        "name": "app",
+        "message": "Hello, world!",
+    }
+
+    assert template.render(params) == "now INFO app: Hello, world!"
+
+
+def test_segments():
+    template = Template("[{level}] {message!r:>10}")
+
+    assert template.segments == (
+        "[",
+        TemplateField("level", "level", None, ""),
+        "] ",
+        TemplateField("message", "message", "r", ">10"),
+    )
+    assert template.keys == {"level", "message"}
+
+
+@pytest.mark.parametrize(
+    "text, params",
+    [
+        ("{{literal}} {message}", {"message": "hi"}),
+        ("{message!r:>12} {message!a}", {"message": "안녕"}),
+        ("{obj.real} {obj.imag:.1f}", {"obj": 3 + 4j}),
+        ("{items[0]} {items[key]}", {"items": {0: "zero", "key": "value"}}),
+        (
+            "{value:{width}.{precision}f}|",
+            {"value": 3.14159, "width": 10, "precision": 2},
+        ),
+        ("{value!r:{width}}|", {"value": "x", "width": 6}),
+        ("{day:%Y-%m-%d}", {"day": date(2020, 6, 29)}),
+        ("quotes ' \" and \\ backslash\n{message}", {"message": "hi"}),
+    ],
+)
+def test_render_matches_str_format(text, params):
+    assert Template(text).render(params) == text.format(**params)
+
+
+def test_uses():
+    template = Template("{timestamp} {line} {message}")
+
+    assert template.uses == {"timestamp", "line"}
+    assert template.uses_timestamp
+    assert template.uses_exec_info
+
+    template = Template("{level} {name}: {message}")
+
+    assert template.uses == frozenset()
+    assert not template.uses_timestamp
+    assert not template.uses_exec_info
+
+
+def test_missing_key():
+    with pytest.raises(KeyError):
+        Template("{message} {request_id}").render({"message": "hi"})
+
+
+@pytest.mark.parametrize("text", ["ohai", "{}", "{0}"])
+def test_invalid_template(text):
+    with pytest.raises(ValueError):
+        Template(text)
+
+
+def test_repr():
+    assert repr(Template("{message}")) == "Template('{message}')"
@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from logging2 import timestamps
+from logging2.timestamps import TimestampProvider, get_timestamp_provider
+
+
+# 2021-03-14T01:59:59-05:00, one second before US Eastern switches to daylight saving time
+_BEFORE_DST = 1_615_705_199
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the provider's clock with a settable one, in nanoseconds since the epoch.
+    """
+    now = [_BEFORE_DST * 1_000_000_000]
+    monkeypatch.setattr(timestamps.time, "time_ns", lambda: now[0])
+    return now
+
+
+class TestTimestampProvider:
+    def test_iso_us(self, clock):
+        clock[0] += 1_234_567
+        provider = TimestampProvider(timezone.utc)
+        assert provider() == "2021-03-14T06:59:59.001234+00:00"
+
+    def test_iso_ms(self, clock):
+        clock[0] += 1_234_567
+        provider = TimestampProvider(timezone.utc, precision="ms")
+        assert provider() == "2021-03-14T06:59:59.001+00:00"
+
+    def test_iso_s(self, clock):
+        clock[0] += 1_234_567
+        provider = TimestampProvider(timezone.utc, precision="s")
+        assert provider() == "2021-03-14T06:59:59+00:00"
+
+    def test_matches_isoformat(self, clock):
+        tz = timezone(timedelta(hours=5, minutes=30))
+        provider = TimestampProvider(tz)
+        for offset in (0, 999_999_999, 1_000_000_000, 86_400_123_456_789):
+            clock[0] = _BEFORE_DST * 1_000_000_000 + offset
+            expected = datetime.fromtimestamp(clock[0] // 1000 / 1_000_000, tz)
+            assert provider() == expected.isoformat(timespec="microseconds")
+
+    def test_caches_per_second(self, clock, monkeypatch):
+        provider = TimestampProvider(timezone.utc)
+        provider()
+        cached = provider._cache
+
+        clock[0] += 999_999_999
+        assert provider()[:19] == "2021-03-14T06:59:59"
+        assert provider._cache is cached
+
+        clock[0] += 1
+        assert provider()[:19] == "2021-03-14T07:00:00"
+        assert provider._cache is not cached
+
+    def test_dst_transition(self, clock):
+        provider = TimestampProvider(ZoneInfo("America/New_York"))
+        assert provider() == "2021-03-14T01:59:59.000000-05:00"
+        clock[0] += 1_000_000_000
+        assert provider() == "2021-03-14T03:00:00.000000-04:00"
+
+    def test_epoch(self, clock):
+        clock[0] += 123_456_789
+        assert TimestampProvider(timezone.utc, "s", epoch=True)() == _BEFORE_DST
+        assert TimestampProvider(timezone.utc, "ms", epoch=True)() == 1_615_705_199.123
+        assert (
+            TimestampProvider(timezone.utc, "us", epoch=True)() == 1_615_705_199.123456
+        )
+
+    def test_epoch_repr(self, clock):
+        clock[0] += 120_000_000
+        assert repr(TimestampProvider(timezone.utc, "us", epoch=True)()) == (
+            "1615705199.12"
+        )
+
+    def test_unknown_precision(self):
+        with pytest.raises(ValueError):
+            TimestampProvider(timezone.utc, precision="ns")
+
+
+class TestGetTimestampProvider:
+    def test_shared(self):
+        assert get_timestamp_provider(timezone.utc) is get_timestamp_provider(
+            timezone.utc
+        )
+
+    def test_distinct_formats(self):
+        assert get_timestamp_provider(timezone.utc) is not get_timestamp_provider(
+            timezone.utc, precision="ms"
+        )
@@ -0,0 +1,115 @@
+import traceback
+
+from logging2.tracebacks import TracebackRenderer, get_exception
+
+
+def _fail(key: str) -> None:
+    {}[key]
+
+
+def _fail_from(key: str) -> None:
+    try:
+        _fail(key)
+    except KeyError as error:
+        raise ValueError(f"bad\nkey {key}") from error
+
+
+def _capture(function, *args) -> BaseException:
+    try:
+        function(*args)
+    except Exception as error:
+        return error
+
+
+class TestTracebackRenderer:
+    def test_same_as_format_exc(self):
+        renderer = TracebackRenderer()
+        for function in (_fail, _fail_from):
+            try:
+                try:
+                    function("id")
+                except Exception:
+                    raise RuntimeError("while handling")
+            except RuntimeError:
+                assert renderer.render() == traceback.format_exc()
+
+    def test_cached_per_location(self):
+        renderer = TracebackRenderer()
+        first = renderer.render(_capture(_fail, "a"))
+        second = renderer.render(_capture(_fail, "b"))
+
+        assert len(renderer._cache) == 1
+        assert first.replace("'a'", "'b'") == second
+
+        renderer.render(_capture(_fail_from, "a"))
+        assert len(renderer._cache) == 3
+
+    def test_cache_size(self):
+        renderer = TracebackRenderer(cache_size=1)
+        renderer.render(_capture(_fail, "a"))
+        renderer.render(_capture(_fail_from, "a"))
+
+        assert len(renderer._cache) == 1
+
+    def test_max_depth(self):
+        renderer = TracebackRenderer(max_depth=1)
+        rendered = renderer.render(_capture(_fail, "a"))
+
+        assert rendered.splitlines()[:2] == [
+            "Traceback (most recent call last):",
+            "  ... 1 outer frames omitted",
+        ]
+        assert "in _fail\n" in rendered
+        assert "in _capture\n" not in rendered
+
+    def test_max_bytes(self):
+        renderer = TracebackRenderer(max_bytes=64)
+        rendered = renderer.render(_capture(_fail, "안녕"))
+
+        assert len(rendered.encode("utf8")) <= 64
+        assert rendered.startswith("[")
+        assert rendered.endswith("KeyError: '안녕'\n")
+
+        assert renderer.render(ValueError("short")) == "ValueError: short\n"
+
+    def test_compact(self):
+        renderer = TracebackRenderer(compact=True, max_depth=2)
+        rendered = renderer.render(_capture(_fail_from, "a"))
+
+        assert rendered == (
+            f"ValueError: bad\\nkey a [{__file__}:14 in _fail_from, {__file__}:19 in _capture] "
+            f"from KeyError: 'a' [{__file__}:7 in _fail, {__file__}:12 in _fail_from]\n"
+        )
+
+    def test_compact_context(self):
+        renderer = TracebackRenderer(compact=True, max_depth=1)
+        try:
+            try:
+                _fail("a")
+            except KeyError:
+                raise RuntimeError("oops")
+        except RuntimeError as error:
+            rendered = renderer.render(error)
+
+        assert rendered.startswith("RuntimeError: oops [")
+        assert " in test_compact_context] while handling KeyError: 'a' [" in rendered
+        assert rendered.endswith(":7 in _fail, ... 1 more]\n")
+        assert "\n" not in rendered.rstrip("\n")
+
+    def test_no_exception(self):
+        assert TracebackRenderer().render() == "NoneType: None\n"
+
+    def test_exception_group(self):
+        group = ExceptionGroup("many", [ValueError("a"), KeyError("b")])
+
+        assert TracebackRenderer().render(group) == "".join(
+            traceback.format_exception(group)
+        )
+
+
+def test_get_exception():
+    error = _capture(_fail, "a")
+
+    assert get_exception(error) is error
+    assert get_exception((KeyError, error, error.__traceback__)) is error
+    assert get_exception(True) is None
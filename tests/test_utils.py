@@ -0,0 +1,38 @@
+import os
+import sys
+
+from logging2.utils import get_code_info, get_pid
+
+
+def test_get_pid():
+    assert get_pid() == os.getpid()
+
+
+def test_get_pid_after_fork():
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.close(read_fd)
+        os.write(write_fd, str(get_pid()).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as fh:
+        child_pid = int(fh.read())
+
+    assert child_pid == pid
+    assert get_pid() == os.getpid()
+
+
+def test_get_code_info():
+    source, function = get_code_info(sys._getframe().f_code)
+
+    assert source == __file__
+    assert function == "test_get_code_info"
+
+
+def test_get_code_info_module():
+    code = compile("pass", "<string>", "exec")
+
+    assert get_code_info(code) == ("<string>", "__main__")